@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Set
+
+import yaml
+
+from dotenv import load_dotenv
+
+from niche.tools.dataforseo_client import DataForSEOClient
+from niche.tools.keyword_store import KeywordStore
+from niche.tools.metrics import get_metrics
+
+REPORT_FILENAME = 'blog_strategy_report.md'
+STATE_FILENAME = 'batch_state.jsonl'
+
+
+def load_topics(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads the topics of a batch from a YAML, JSON, JSON-lines or plain text file.
+
+    Each entry is either a topic string or a mapping of crew inputs that
+    contains at least 'initial_topic'.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            entries = yaml.safe_load(f) or []
+        elif path.endswith('.jsonl'):
+            entries = [json.loads(line) for line in f if line.strip()]
+        elif path.endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    topics = []
+    for entry in entries:
+        inputs = {'initial_topic': entry} if isinstance(entry, str) else dict(entry)
+        if not inputs.get('initial_topic'):
+            raise ValueError(f"Batch entry without initial_topic: {entry!r}")
+        topics.append(inputs)
+    return topics
+
+
+def topic_slug(topic: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-') or 'topic'
+
+
+def topic_slugs(topics: List[Dict[str, Any]]) -> List[str]:
+    """
+    Slug of each topic, unique within the batch. Topics whose slugs collide
+    ("Desk Setup" and "desk-setup") get a short hash of the topic appended, so
+    each keeps its own report directory and resume entry whatever their order.
+    """
+    names = [inputs['initial_topic'] for inputs in topics]
+    topics_by_slug: Dict[str, Set[str]] = {}
+    for name in names:
+        topics_by_slug.setdefault(topic_slug(name), set()).add(name)
+    slugs = []
+    for name in names:
+        slug = topic_slug(name)
+        if len(topics_by_slug[slug]) > 1:
+            slug = f"{slug}-{hashlib.sha1(name.encode()).hexdigest()[:8]}"
+        slugs.append(slug)
+    return slugs
+
+
+class BatchRunner:
+    """
+    Researches many niches across a bounded pool of crews.
+
+    All crews share one DataForSEO client (and with it one response cache and
+    rate limiter) and one keyword store. Each report is written under
+    <output_dir>/<topic-slug>/, and finished topics are recorded in a state file
+    so an interrupted batch resumes where it stopped.
+    """
+
+    def __init__(self, topics: List[Dict[str, Any]], output_dir: str = 'output', max_workers: int = 2):
+        self.topics = topics
+        self.slugs = topic_slugs(topics)
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.state_path = os.path.join(output_dir, STATE_FILENAME)
+        load_dotenv()
+        self.client = DataForSEOClient()
+        self.store = KeywordStore()
+        self._state_lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def completed_topics(self) -> Set[str]:
+        if not os.path.exists(self.state_path):
+            return set()
+        completed = set()
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get('status') == 'completed':
+                        completed.add(record['slug'])
+        return completed
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        with self._state_lock:
+            with open(self.state_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def _run_topic(self, inputs: Dict[str, Any], slug: str) -> bool:
+        topic = inputs['initial_topic']
+        report_path = os.path.join(self.output_dir, slug, REPORT_FILENAME)
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        start = time.time()
+        try:
+            from niche.crew import BlogContentResearchCrew
+            BlogContentResearchCrew(
+                topic=topic,
+                dataforseo_client=self.client,
+                keyword_store=self.store,
+                report_path=report_path,
+                emit_metrics=False,
+                # Concurrent crews would interleave their streams on stdout.
+                stream=False,
+            ).kickoff(inputs=inputs)
+        except Exception as e:
+            print(f"Batch topic '{topic}' failed: {e}")
+            self._record({'slug': slug, 'topic': topic, 'status': 'failed', 'error': str(e)})
+            return False
+        self._record({
+            'slug': slug,
+            'topic': topic,
+            'status': 'completed',
+            'report': report_path,
+            'seconds': round(time.time() - start, 1),
+        })
+        return True
+
+    def run(self) -> Dict[str, float]:
+        completed = self.completed_topics()
+        todo = [(inputs, slug) for inputs, slug in zip(self.topics, self.slugs) if slug not in completed]
+        print(f"Batch: {len(self.topics)} topics, {len(self.topics) - len(todo)} already done, {len(todo)} to run")
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda job: self._run_topic(*job), todo))
+        elapsed = time.time() - start
+
+        succeeded = sum(results)
+        summary = {
+            'topics_run': len(todo),
+            'topics_succeeded': succeeded,
+            'elapsed_seconds': round(elapsed, 1),
+            'topics_per_hour': round(succeeded / elapsed * 3600, 2) if elapsed and succeeded else 0.0,
+            'api_calls': self.client.api_call_count,
+            'api_calls_per_topic': round(self.client.api_call_count / succeeded, 1) if succeeded else 0.0,
+            'cache_hits': self.client.cache_hit_count,
+        }
+        print("Batch summary: " + ", ".join(f"{key}={value}" for key, value in summary.items()))
+        json_path, prom_path = get_metrics().write(self.output_dir, 'batch_metrics')
+        print(f"Batch metrics written to {json_path} and {prom_path}")
+        return summary
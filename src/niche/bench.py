@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""
+Offline benchmarks for the crew and its tools.
+
+Record a cassette once with live credentials, then replay it on any machine:
+
+    bench record benchmarks/desk-setup.json
+    bench crew benchmarks/desk-setup.json
+    bench tools benchmarks/desk-setup.json
+
+Replays report wall time, API calls, LLM calls and tokens per task, so
+throughput regressions show up without network access. `bench startup`
+measures how long a fresh interpreter takes to import and build the crew.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from niche.stub_llm import StubLLMServer
+from niche.tools.cassette import Cassette
+from niche.tools.output_format import estimate_tokens
+from niche.tools.transport import get_transport
+
+DEFAULT_TOPIC = 'Desk Setup'
+# Fixed inputs for the per-tool benchmarks; change them only together with the fixtures.
+TOOL_INPUTS = {
+    'KeywordExpansionTool': 'desk setup, standing desk, home office desk, gaming desk setup, minimalist desk setup',
+    'GoogleTrendsDataForSEOTool': 'standing desk, desk setup, home office desk',
+    'SerperDevScraper': 'best standing desk for home office',
+    'AIWebSearch': 'home office desk setup trends',
+    'BulkKeywordResearchTool': 'standing desk, monitor arm, cable management',
+}
+# Placeholders so the tools construct in replay mode; credentials never reach the cassette.
+REPLAY_CREDENTIALS = {
+    'DATAFORSEO_LOGIN': 'replay',
+    'DATAFORSEO_PASSWORD': 'replay',
+    'SERPER_API_KEY': 'replay',
+    'TAVILY_API_KEY': 'replay',
+    'OPENAI_API_KEY': 'replay',
+    'OPENAI_MODEL_NAME': 'gpt-4o-mini',
+}
+
+
+# Snippets timed in a fresh interpreter by `bench startup`.
+STARTUP_PROBES = {
+    'import niche.main': 'import niche.main',
+    'import niche.batch': 'import niche.batch',
+    'import niche.crew': 'import niche.crew',
+    'construct crew': 'from niche.crew import BlogContentResearchCrew; BlogContentResearchCrew()',
+    'build crew with tools': 'from niche.crew import BlogContentResearchCrew; BlogContentResearchCrew().crew()',
+}
+
+
+def _api_calls() -> int:
+    return sum(host['requests'] for host in get_transport().stats().values())
+
+
+def _isolate_state(mode: str, scratch_dir: str) -> None:
+    """Keeps caches and the keyword database from short-circuiting recorded calls."""
+    os.environ['NICHE_CACHE_PATH'] = ''
+    os.environ['NICHE_KEYWORD_DB'] = os.path.join(scratch_dir, 'keywords.sqlite3')
+    os.environ['NICHE_LLM_CACHE'] = 'bypass'
+    os.environ['NICHE_CHECKPOINTS'] = 'off'
+    # Every LLM call goes to the stub server behind OPENAI_API_BASE.
+    os.environ['NICHE_MODEL_ROUTING'] = 'off'
+    os.environ['NICHE_STREAM_REPORT'] = 'off'
+    if mode == 'replay':
+        # Recorded responses need no pacing.
+        os.environ['DATAFORSEO_RATE_LIMIT'] = '1000000'
+        for name, value in REPLAY_CREDENTIALS.items():
+            os.environ.setdefault(name, value)
+
+
+def _use_cassette(path: str, mode: str) -> Cassette:
+    cassette = Cassette(path, mode=mode)
+    transport = get_transport()
+    transport.cassette = cassette
+    transport.reset_stats()
+    return cassette
+
+
+def _tool_runners(store_path: str) -> Dict[str, Callable[[str], str]]:
+    from niche.tools.DataForSEOTools import GoogleTrendsDataForSEOTool, KeywordExpansionTool
+    from niche.tools.dataforseo_client import DataForSEOClient
+    from niche.tools.SerperDevTools import SerperDevScraper
+    from niche.tools.TavilyTools import AIWebSearch
+    from niche.tools.BulkResearchTools import BulkKeywordResearchTool
+    from niche.tools.cache import ResponseCache
+    from niche.tools.keyword_store import KeywordStore
+
+    # Fresh caches per round so repeated rounds measure the same calls.
+    client = DataForSEOClient(cache=ResponseCache(path=''))
+    store = KeywordStore(path=store_path)
+    tools = [
+        KeywordExpansionTool(client=client, debug=False, store=store, topic=DEFAULT_TOPIC, output_format='tsv'),
+        GoogleTrendsDataForSEOTool(client=client, debug=False, store=store, output_format='tsv'),
+        SerperDevScraper(output_format='tsv'),
+        AIWebSearch(compact=True),
+        BulkKeywordResearchTool(),
+    ]
+    return {tool.name: tool._run for tool in tools}
+
+
+def bench_tools(cassette_path: str, mode: str = 'replay', repeat: int = 1) -> List[Dict[str, Any]]:
+    """Runs every tool on its own against the cassette, reporting the fastest of `repeat` rounds."""
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        _isolate_state(mode, scratch_dir)
+        cassette = _use_cassette(cassette_path, mode)
+        rounds = repeat if cassette.replaying else 1
+        samples: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TOOL_INPUTS}
+        for index in range(rounds):
+            runners = _tool_runners(os.path.join(scratch_dir, f"tools-{index}.sqlite3"))
+            for name, tool_input in TOOL_INPUTS.items():
+                calls_before = _api_calls()
+                start = time.perf_counter()
+                output = runners[name](tool_input)
+                samples[name].append({
+                    'tool': name,
+                    'wall_seconds': round(time.perf_counter() - start, 4),
+                    'api_calls': _api_calls() - calls_before,
+                    'output_tokens': estimate_tokens(output),
+                })
+        cassette.save()
+    return [min(runs, key=lambda run: run['wall_seconds']) for runs in samples.values()]
+
+
+def bench_crew(
+    cassette_path: str,
+    mode: str = 'replay',
+    topic: str = DEFAULT_TOPIC,
+    process: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs the full crew against the cassette with the LLM behind the stub server.
+
+    Per-task numbers are the calls made between consecutive task completions,
+    so with the 'dag' process overlapping tasks share their counts.
+    """
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        _isolate_state(mode, scratch_dir)
+        cassette = _use_cassette(cassette_path, mode)
+        with StubLLMServer(cassette=cassette) as stub:
+            # The crew's LLM talks to the stub, which replays or forwards to the real API.
+            os.environ['OPENAI_API_BASE'] = stub.base_url
+            from niche.crew import BlogContentResearchCrew
+
+            research = BlogContentResearchCrew(topic=topic, process=process)
+            crew = research.crew()
+            tasks: List[Dict[str, Any]] = []
+            started_at = time.perf_counter()
+            last = {'time': started_at, 'api_calls': 0, **stub.stats()}
+
+            def on_task_done(output) -> None:
+                now, llm = time.perf_counter(), stub.stats()
+                api_calls = _api_calls()
+                tasks.append({
+                    'task': output.name or output.summary,
+                    'agent': output.agent,
+                    'wall_seconds': round(now - last['time'], 3),
+                    'api_calls': api_calls - last['api_calls'],
+                    'llm_calls': llm['llm_calls'] - last['llm_calls'],
+                    'prompt_tokens': llm['prompt_tokens'] - last['prompt_tokens'],
+                    'completion_tokens': llm['completion_tokens'] - last['completion_tokens'],
+                })
+                last.update(time=now, api_calls=api_calls, **llm)
+
+            for task in crew.tasks:
+                task.callback = on_task_done
+            if research.process == 'dag':
+                from niche.scheduler import DagScheduler
+                DagScheduler(crew, research.task_dependencies()).kickoff(inputs={'initial_topic': topic})
+            else:
+                crew.kickoff(inputs={'initial_topic': topic})
+            wall_seconds = time.perf_counter() - started_at
+            llm = stub.stats()
+        cassette.save()
+
+    return {
+        'topic': topic,
+        'process': research.process,
+        'wall_seconds': round(wall_seconds, 3),
+        'api_calls': _api_calls(),
+        **llm,
+        'tasks': tasks,
+    }
+
+
+def bench_startup(repeat: int = 5) -> List[Dict[str, Any]]:
+    """Times each startup probe in a fresh interpreter, `repeat` times."""
+    env = {**os.environ, **{k: v for k, v in REPLAY_CREDENTIALS.items() if k not in os.environ}}
+    results = []
+    for name, code in STARTUP_PROBES.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+            timings.append(time.perf_counter() - start)
+            if completed.returncode != 0:
+                error = (completed.stderr.strip().splitlines() or ['unknown error'])[-1]
+                results.append({'probe': name, 'min_seconds': None, 'median_seconds': None, 'error': error})
+                break
+        else:
+            results.append({
+                'probe': name,
+                'min_seconds': round(min(timings), 3),
+                'median_seconds': round(statistics.median(timings), 3),
+            })
+    return results
+
+
+def print_startup_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'startup probe':<28} {'min s':>8} {'median s':>9}")
+    for row in results:
+        if row.get('error'):
+            print(f"{row['probe']:<28} failed: {row['error']}")
+        else:
+            print(f"{row['probe']:<28} {row['min_seconds']:>8.3f} {row['median_seconds']:>9.3f}")
+
+
+def print_tool_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'tool':<28} {'wall s':>9} {'api calls':>10} {'out tokens':>11}")
+    for row in results:
+        print(f"{row['tool']:<28} {row['wall_seconds']:>9.4f} {row['api_calls']:>10} {row['output_tokens']:>11}")
+
+
+def print_crew_results(result: Dict[str, Any]) -> None:
+    print(f"{'task':<45} {'wall s':>8} {'api':>5} {'llm':>5} {'prompt tok':>11} {'compl tok':>10}")
+    for row in result['tasks']:
+        print(f"{row['task'][:45]:<45} {row['wall_seconds']:>8.2f} {row['api_calls']:>5} {row['llm_calls']:>5} "
+              f"{row['prompt_tokens']:>11} {row['completion_tokens']:>10}")
+    print(f"Total: {result['wall_seconds']:.2f}s, {result['api_calls']} API calls, {result['llm_calls']} LLM calls "
+          f"({result['llm_misses']} unrecorded), {result['total_tokens']} tokens")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='bench', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=('crew', 'tools', 'record', 'startup'))
+    parser.add_argument('cassette', nargs='?', help='cassette file with the recorded API and LLM traffic')
+    parser.add_argument('--topic', default=DEFAULT_TOPIC)
+    parser.add_argument('--process', choices=('hierarchical', 'dag'), default=None)
+    parser.add_argument('--repeat', type=int, default=3, help='rounds per tool or startup probe')
+    parser.add_argument('--json', dest='json_path', help='also write the results to this file')
+    args = parser.parse_args(argv)
+    if args.command != 'startup' and not args.cassette:
+        parser.error(f"'{args.command}' needs a cassette file")
+
+    if args.command == 'startup':
+        results = bench_startup(repeat=args.repeat)
+        print_startup_results(results)
+    elif args.command == 'record':
+        results = {
+            'crew': bench_crew(args.cassette, mode='record', topic=args.topic, process=args.process),
+            'tools': bench_tools(args.cassette, mode='record'),
+        }
+        print_crew_results(results['crew'])
+        print_tool_results(results['tools'])
+        print(f"Cassette written to {args.cassette}")
+    elif args.command == 'crew':
+        results = bench_crew(args.cassette, topic=args.topic, process=args.process)
+        print_crew_results(results)
+    else:
+        results = bench_tools(args.cassette, repeat=args.repeat)
+        print_tool_results(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
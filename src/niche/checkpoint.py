@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+DEFAULT_CHECKPOINT_PATH = os.path.join('.niche_cache', 'checkpoints.sqlite3')
+CHECKPOINT_MODES = ('on', 'off', 'refresh')
+
+
+class CheckpointStore:
+    """
+    Durable store of task outputs, keyed by a hash of everything a task's output
+    depends on. Pass path='' to keep checkpoints in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.getenv('NICHE_CHECKPOINT_PATH', DEFAULT_CHECKPOINT_PATH)
+        self.path = path
+        self._lock = threading.Lock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints ('
+            'key TEXT PRIMARY KEY, task TEXT NOT NULL, agent TEXT NOT NULL, '
+            'raw TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS checkpoints_task ON checkpoints (task)')
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT task, agent, raw, created_at FROM checkpoints WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'task': row[0], 'agent': row[1], 'raw': row[2], 'created_at': row[3]}
+
+    def put(self, key: str, task: str, agent: str, raw: str) -> None:
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO checkpoints (key, task, agent, raw, created_at) VALUES (?, ?, ?, ?, ?)',
+                (key, task, agent, raw, time.time())
+            )
+            self._db.commit()
+
+    def clear(self, task: Optional[str] = None) -> None:
+        with self._lock:
+            if task is None:
+                self._db.execute('DELETE FROM checkpoints')
+            else:
+                self._db.execute('DELETE FROM checkpoints WHERE task = ?', (task,))
+            self._db.commit()
+
+
+class TaskCheckpointer:
+    """
+    Saves every finished task of a run and restores it on the next run.
+
+    A task's key hashes its config, its agent's config, the run inputs and the
+    outputs of the tasks it depends on, so a task is reused only while nothing
+    it was built from has changed; when an upstream task re-runs with a new
+    output, every task downstream of it re-runs too.
+
+    tasks_config and agents_config are the specs as written in the YAML, with
+    agent names rather than Agent objects, so the keys are stable across runs.
+
+    In 'refresh' mode a checkpoint older than its task's `refresh_after` (hours,
+    in tasks.yaml) is stale and the task runs again: an incremental refresh
+    re-fetches the market data and rebuilds only what depends on it.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        tasks_config: Dict[str, Dict[str, Any]],
+        agents_config: Dict[str, Dict[str, Any]],
+        inputs: Optional[Dict[str, Any]] = None,
+        refresh: bool = False,
+    ):
+        self.store = store
+        self.tasks_config = tasks_config
+        self.agents_config = agents_config
+        self.inputs = dict(inputs or {})
+        self.refresh = refresh
+        self.restored: List[str] = []
+
+    def key(self, name: str, upstream_outputs: List[str]) -> str:
+        config = self.tasks_config.get(name) or {}
+        canonical = json.dumps(
+            {
+                'task': name,
+                # Changing how often a task is refreshed does not change its output.
+                'config': {k: v for k, v in config.items() if k != 'refresh_after'},
+                'agent': self.agents_config.get(config.get('agent')) or {},
+                'inputs': self.inputs,
+                'upstream': upstream_outputs,
+            },
+            sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _stale(self, name: str, created_at: float) -> bool:
+        refresh_after = (self.tasks_config.get(name) or {}).get('refresh_after')
+        if not self.refresh or refresh_after is None:
+            return False
+        return time.time() - created_at > float(refresh_after) * 3600
+
+    def restore(self, name: str, task: Task, upstream_outputs: List[str]) -> Optional[TaskOutput]:
+        """Returns the checkpointed output of the task, or None if it has to run."""
+        checkpoint = self.store.get(self.key(name, upstream_outputs))
+        if checkpoint is None:
+            return None
+        if self._stale(name, checkpoint['created_at']):
+            print(f"Checkpoint of {name} is stale, running it again")
+            return None
+        output = TaskOutput(
+            description=task.description,
+            name=name,
+            expected_output=task.expected_output,
+            raw=checkpoint['raw'],
+            agent=checkpoint['agent'],
+        )
+        task.output = output
+        if task.output_file:
+            # The report file is normally written by the task itself.
+            with open(task.output_file, 'w', encoding='utf-8') as f:
+                f.write(output.raw)
+        self.restored.append(name)
+        print(f"Reusing checkpoint of {name} from {time.ctime(checkpoint['created_at'])}")
+        return output
+
+    def save(self, name: str, upstream_outputs: List[str], output: TaskOutput) -> None:
+        self.store.put(self.key(name, upstream_outputs), name, output.agent, output.raw)
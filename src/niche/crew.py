@@ -1,11 +1,42 @@
 import os
+import yaml
+from dotenv import load_dotenv
 from crewai import Agent, Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
 from crewai.project import CrewBase, agent, crew, task
-from langchain_openai import ChatOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
-from niche.tools.DataForSEOTools import KeywordExpansionTool, GoogleTrendsDataForSEOTool, DataForSEOClient
-from niche.tools.TavilyTools import AIWebSearch
-from niche.tools.SerperDevTools import SerperDevScraper
+from niche.checkpoint import CHECKPOINT_MODES, CheckpointStore, TaskCheckpointer
+from niche.tools.governor import BudgetGovernor
+from niche.scheduler import DagScheduler, usage_metrics
+from niche.instrumentation import LLMUsageHandler, TaskTracker
+from niche.report_stream import ReportStream, ReportTokenHandler
+from niche.tools.metrics import get_metrics
+
+# Output token budget per tool, keeping tool results from flooding the LLM context.
+TOOL_TOKEN_BUDGETS = {
+    'KeywordExpansionTool': 8000,
+    'GoogleTrendsDataForSEOTool': 1500,
+    'SerperDevScraper': 1500,
+    'AIWebSearch': 2000,
+    'BulkKeywordResearchTool': 12000,
+}
+
+REPORT_TASK = 'compile_comprehensive_blog_strategy_report'
+
+# Tools of each agent, attached when the crew is built (see crew()).
+AGENT_TOOLS = {
+    'keyword_research_agent': (
+        'KeywordExpansionTool', 'GoogleTrendsDataForSEOTool', 'BulkKeywordResearchTool', 'AIWebSearch',
+        'SerperDevScraper',
+    ),
+    'content_ideation_agent': ('AIWebSearch',),
+    'trend_analysis_agent': ('AIWebSearch',),
+}
+
+
+def _load_config(path: str) -> dict:
+    with open(os.path.join(os.path.dirname(__file__), path), 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
 
 @CrewBase
 class BlogContentResearchCrew:
@@ -13,31 +44,137 @@ class BlogContentResearchCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL_NAME"),
-        base_url=os.getenv("OPENAI_API_BASE"),
-        api_key=os.getenv("OPENAI_API_KEY")
-    )
- 
-    def __init__(self):
-        self.dataforseo_client = DataForSEOClient()
-        self.keyword_expansion_tool = KeywordExpansionTool(client=self.dataforseo_client)
-        self.google_trends_tool = GoogleTrendsDataForSEOTool(client=self.dataforseo_client)
-        self.ai_web_search = AIWebSearch()
-        self.serper_dev_scraper = SerperDevScraper()
+    # The API clients and the tools are built on first use, not here: CrewBase
+    # reads every attribute and calls every @agent method while initialising,
+    # so they are plain methods rather than properties, and the agents only
+    # get their tools in crew().
+    def __init__(
+        self,
+        topic: str = '',
+        process: str = None,
+        dataforseo_client=None,
+        keyword_store=None,
+        report_path: str = None,
+        emit_metrics: bool = True,
+        governor: BudgetGovernor = None,
+        checkpoints: str = None,
+        stream: bool = None,
+    ):
+        load_dotenv()
+        self.topic = topic
+        # 'hierarchical' lets the manager agent run every task in turn; 'dag' runs
+        # tasks concurrently following the depends_on lists in tasks.yaml.
+        self.process = process or os.getenv('NICHE_PROCESS', 'hierarchical')
+        # 'json' restores the verbose pre-compaction tool output.
+        self.output_format = os.getenv('NICHE_TOOL_OUTPUT_FORMAT', 'tsv')
+        # Google Trends as locally computed features ranked by momentum; 'series' sends the raw points.
+        self.trends_view = os.getenv('NICHE_TRENDS_VIEW', 'ranking')
+        # Batch runs pass a shared client and store so crews share one cache and rate limiter.
+        self._dataforseo_client = dataforseo_client
+        self._keyword_store = keyword_store
+        self.report_path = report_path
+        # Batch runs write one aggregate metrics file instead of one per crew.
+        self.emit_metrics = emit_metrics
+        self.task_tracker = TaskTracker()
+        # Call, spend and time budgets from config/budgets.yaml, enforced on every tool call.
+        self.governor = governor or BudgetGovernor.from_config()
+        # 'on' reuses the saved output of every task whose inputs are unchanged,
+        # 'refresh' also re-runs tasks older than their refresh_after, 'off' runs everything.
+        self.checkpoints = checkpoints or os.getenv('NICHE_CHECKPOINTS', 'on')
+        if self.checkpoints not in CHECKPOINT_MODES:
+            raise ValueError(f"Unknown checkpoint mode: {self.checkpoints}")
+        self._model_router = None
+        self._tools = {}
+        # CrewBase loads tasks_config only after this __init__ returns, and then replaces
+        # the agent names in it with Agent objects; keep the task and agent specs as written.
+        self.task_specs = _load_config(self.tasks_config)
+        self.agent_specs = _load_config(self.agents_config)
+        # Streams finished tasks and the report as it is written to <report file>.partial and stdout.
+        if stream is None:
+            stream = os.getenv('NICHE_STREAM_REPORT', 'on') != 'off'
+        report_file = self.report_path or self.task_specs[REPORT_TASK].get('output_file')
+        self.report_stream = ReportStream(report_file, REPORT_TASK) if stream and report_file else None
         super().__init__()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def _execute_task_with_retry(self, task: Task) -> str:
-        try:
-            return task.execute()
-        except Exception as e:
-            print(f"Error executing task: {str(e)}")
-            raise
+    def model_router(self):
+        if self._model_router is None:
+            from niche.llm_router import ModelRouter
+            task_tiers = {
+                name: config['model_tier'] for name, config in self.tasks_config.items() if config.get('model_tier')
+            }
+            self._model_router = ModelRouter.from_config(task_tiers=task_tiers, tracker=self.task_tracker)
+        return self._model_router
+
+    def dataforseo_client(self):
+        if self._dataforseo_client is None:
+            from niche.tools.dataforseo_client import DataForSEOClient
+            self._dataforseo_client = DataForSEOClient()
+        return self._dataforseo_client
+
+    def keyword_store(self):
+        if self._keyword_store is None:
+            from niche.tools.keyword_store import KeywordStore
+            self._keyword_store = KeywordStore()
+        return self._keyword_store
+
+    def tool(self, name: str):
+        """Returns the named tool, building it (and its API client) on first use."""
+        if name not in self._tools:
+            self._tools[name] = self._build_tool(name)
+        return self._tools[name]
+
+    def _build_tool(self, name: str):
+        budget = TOOL_TOKEN_BUDGETS.get(name)
+        if name == 'KeywordExpansionTool':
+            from niche.tools.DataForSEOTools import KeywordExpansionTool
+            return KeywordExpansionTool(
+                client=self.dataforseo_client(), store=self.keyword_store(), topic=self.topic,
+                output_format=self.output_format, token_budget=budget, governor=self.governor, cluster=True
+            )
+        if name == 'GoogleTrendsDataForSEOTool':
+            from niche.tools.DataForSEOTools import GoogleTrendsDataForSEOTool
+            return GoogleTrendsDataForSEOTool(
+                client=self.dataforseo_client(), store=self.keyword_store(), output_format=self.output_format,
+                token_budget=budget, governor=self.governor, view=self.trends_view
+            )
+        if name == 'AIWebSearch':
+            from niche.tools.TavilyTools import AIWebSearch
+            return AIWebSearch(compact=self.output_format != 'json', token_budget=budget, governor=self.governor)
+        if name == 'SerperDevScraper':
+            from niche.tools.SerperDevTools import SerperDevScraper
+            return SerperDevScraper(output_format=self.output_format, token_budget=budget, governor=self.governor)
+        if name == 'BulkKeywordResearchTool':
+            from niche.tools.BulkResearchTools import BulkKeywordResearchTool
+            return BulkKeywordResearchTool(token_budget=budget, governor=self.governor)
+        raise ValueError(f"Unknown tool: {name}")
+
+    def _agent_llm(self, agent_name: str, follow_task: bool = True):
+        # One LLM instance per agent so its token usage can be attributed and its
+        # calls routed to the model tier of the agent or of its current task.
+        from niche.llm_router import RoutedChatModel
+        config = self.agents_config[agent_name]
+        router = self.model_router()
+        tier = config.get('model_tier') or router.default_tier
+        callbacks = [LLMUsageHandler(config['role'], self.task_tracker)]
+        # The report agent streams its tokens so the report can be written as it is generated.
+        streaming = self.report_stream is not None and agent_name == self.task_specs[REPORT_TASK]['agent']
+        if streaming:
+            callbacks.append(ReportTokenHandler(self.report_stream, config['role'], self.task_tracker))
+        return RoutedChatModel(
+            router=router,
+            agent=config['role'],
+            agent_tier=tier,
+            follow_task=follow_task,
+            streaming=streaming,
+            model_name=router.tiers[tier].model or '',
+            callbacks=callbacks,
+            cache=False,
+        )
 
     def manager_agent(self) -> Agent:
         return Agent(
-            llm=self.llm,
+            # The manager plans the whole run, so it stays on its own tier for every task.
+            llm=self._agent_llm('manager_agent', follow_task=False),
             config=self.agents_config['manager_agent'],
             verbose=True
         )
@@ -45,34 +182,31 @@ class BlogContentResearchCrew:
     @agent
     def keyword_research_agent(self) -> Agent:
         return Agent(
-            llm=self.llm,
+            llm=self._agent_llm('keyword_research_agent'),
             config=self.agents_config['keyword_research_agent'],
-            tools=[self.keyword_expansion_tool, self.google_trends_tool, self.ai_web_search, self.serper_dev_scraper],
             verbose=True
         )
 
     @agent
     def content_ideation_agent(self) -> Agent:
         return Agent(
-            llm=self.llm,
+            llm=self._agent_llm('content_ideation_agent'),
             config=self.agents_config['content_ideation_agent'],
-            tools=[self.ai_web_search],
             verbose=True
         )
 
     @agent
     def trend_analysis_agent(self) -> Agent:
         return Agent(
-            llm=self.llm,
+            llm=self._agent_llm('trend_analysis_agent'),
             config=self.agents_config['trend_analysis_agent'],
-            tools=[self.ai_web_search],
             verbose=True
         )
 
     @agent
     def report_generation_agent(self) -> Agent:
         return Agent(
-            llm=self.llm,
+            llm=self._agent_llm('report_generation_agent'),
             config=self.agents_config['report_generation_agent'],
             verbose=True
         )
@@ -99,11 +233,21 @@ class BlogContentResearchCrew:
 
     @task
     def compile_comprehensive_blog_strategy_report(self) -> Task:
-        return Task(config=self.tasks_config['compile_comprehensive_blog_strategy_report'])
+        report = Task(
+            config=self.tasks_config[REPORT_TASK],
+            output_file=self.report_path
+        )
+        if self.report_stream:
+            # The report stream writes the file atomically once the run completes.
+            report.output_file = None
+        return report
 
     @crew
     def crew(self) -> Crew:
         """Creates the Blog Content Research Crew"""
+        # The @agent methods are memoized, so this equips the agents in self.agents.
+        for agent_name, tool_names in AGENT_TOOLS.items():
+            getattr(self, agent_name)().tools = [self.tool(name) for name in tool_names]
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
@@ -112,9 +256,106 @@ class BlogContentResearchCrew:
             verbose=True,
         )
 
+    def task_dependencies(self) -> dict:
+        return {name: list(config.get('depends_on') or []) for name, config in self.tasks_config.items()}
+
+    def checkpointer(self, inputs: dict = None):
+        if self.checkpoints == 'off':
+            return None
+        return TaskCheckpointer(
+            # Keys are built from the YAML as written: the Agent objects CrewBase puts in
+            # tasks_config have a new random id on every run.
+            CheckpointStore(), self.task_specs, self.agent_specs,
+            inputs=inputs, refresh=self.checkpoints == 'refresh'
+        )
+
+    def _restore_checkpoints(self, research_crew: Crew, checkpointer: TaskCheckpointer) -> None:
+        """
+        Restores the tasks of a hierarchical run whose dependencies were all
+        restored too, and drops them from the crew. The remaining tasks get
+        exactly their dependencies as context, restored or not.
+        """
+        tasks = {crew_task.name: crew_task for crew_task in research_crew.tasks}
+        dependencies = self.task_dependencies()
+        restored = set()
+        # tasks.yaml lists every task after the tasks it depends on.
+        for name, crew_task in tasks.items():
+            upstream = dependencies.get(name, [])
+            if all(dependency in restored for dependency in upstream):
+                outputs = [tasks[dependency].output.raw for dependency in upstream]
+                if checkpointer.restore(name, crew_task, outputs) is not None:
+                    restored.add(name)
+        if restored:
+            research_crew.tasks = [crew_task for crew_task in research_crew.tasks if crew_task.name not in restored]
+            for crew_task in research_crew.tasks:
+                crew_task.context = [tasks[dependency] for dependency in dependencies.get(crew_task.name, [])] or None
+
+    def _task_finished(self, output, checkpointer: TaskCheckpointer, tasks: dict) -> None:
+        self.task_tracker.finish(output.name)
+        if self.report_stream:
+            self.report_stream.task_finished(output.name, output.raw)
+        if checkpointer:
+            upstream = [tasks[dependency].output.raw for dependency in self.task_dependencies().get(output.name, [])]
+            checkpointer.save(output.name, upstream, output)
+
+    def _dag_task_ended(self, name: str, crew_task: Task) -> None:
+        self.task_tracker.finish(name, crew_task.agent.role)
+        # A failed task has no output to stream.
+        if self.report_stream and crew_task.output is not None:
+            self.report_stream.task_finished(name, crew_task.output.raw)
+
+    def kickoff(self, inputs: dict = None):
+        """Runs the crew with the configured process."""
+        self.task_tracker.task_names = list(self.tasks_config)
+        self.governor.start_run()
+        if self.report_stream:
+            self.report_stream.open()
+            print(f"Streaming the run to {self.report_stream.partial_path}")
+        try:
+            result = self._kickoff(inputs)
+            if self.report_stream:
+                self.report_stream.finalize(result.raw)
+                print(f"\nReport written to {self.report_stream.path}")
+            return result
+        finally:
+            if self.report_stream:
+                # After a failure the partial file keeps what was produced.
+                self.report_stream.close()
+            if self.emit_metrics:
+                json_path, prom_path = get_metrics().write()
+                print(f"Run metrics written to {json_path} and {prom_path}")
+
+    def _kickoff(self, inputs: dict = None):
+        checkpointer = self.checkpointer(inputs)
+        if self.process == 'dag':
+            return DagScheduler(
+                self.crew(), self.task_dependencies(),
+                on_task_start=lambda name, crew_task: self.task_tracker.start(name, crew_task.agent.role),
+                on_task_end=self._dag_task_ended,
+                checkpointer=checkpointer,
+            ).kickoff(inputs=inputs)
+        research_crew = self.crew()
+        tasks = {crew_task.name: crew_task for crew_task in research_crew.tasks}
+        if checkpointer:
+            self._restore_checkpoints(research_crew, checkpointer)
+            if not research_crew.tasks:
+                final_output = list(tasks.values())[-1].output
+                return CrewOutput(
+                    raw=final_output.raw,
+                    tasks_output=[crew_task.output for crew_task in tasks.values()],
+                    token_usage=usage_metrics(research_crew),
+                )
+        for crew_task in research_crew.tasks:
+            crew_task.callback = lambda output: self._task_finished(output, checkpointer, tasks)
+        # The tracker moves on to the next task that actually runs, never to a restored one.
+        self.task_tracker.task_names = [crew_task.name for crew_task in research_crew.tasks]
+        self.task_tracker.start(research_crew.tasks[0].name)
+        return research_crew.kickoff(inputs=inputs)
+
 if __name__ == "__main__":
-    blog_content_research = BlogContentResearchCrew()
-    result = blog_content_research.crew.kickoff()
-    with open('final_blog_strategy_report.md', 'w') as f:
-        f.write(result)
-    print("Report generated: final_blog_strategy_report.md")
\ No newline at end of file
+    blog_content_research = BlogContentResearchCrew(report_path='final_blog_strategy_report.md')
+    result = blog_content_research.kickoff(inputs={'initial_topic': 'Desk Setup'})
+    if blog_content_research.report_stream is None:
+        # Nothing was streamed; the report task has written the file itself.
+        print(result.raw)
+    print("Report generated: final_blog_strategy_report.md")
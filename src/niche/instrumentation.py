@@ -0,0 +1,65 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from niche.tools.metrics import get_metrics
+
+UNASSIGNED_TASK = 'unassigned'
+
+
+class TaskTracker:
+    """
+    Knows which task each agent is working on, so LLM usage can be attributed.
+
+    The DAG scheduler reports the task of every agent; sequential and
+    hierarchical runs report one active task that all agents work towards.
+    """
+
+    def __init__(self, task_names: Optional[List[str]] = None):
+        self.task_names = list(task_names or [])
+        self._agent_tasks: Dict[str, str] = {}
+        self._active_task: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def start(self, task: str, agent: Optional[str] = None) -> None:
+        with self._lock:
+            if agent is None:
+                self._active_task = task
+            else:
+                self._agent_tasks[agent] = task
+
+    def finish(self, task: str, agent: Optional[str] = None) -> None:
+        with self._lock:
+            if agent is not None and self._agent_tasks.get(agent) == task:
+                del self._agent_tasks[agent]
+            if agent is None and self._active_task == task:
+                # Sequential runs move straight on to the next task in the list.
+                index = self.task_names.index(task) if task in self.task_names else -1
+                following = self.task_names[index + 1:index + 2] if index >= 0 else []
+                self._active_task = following[0] if following else None
+
+    def task_for(self, agent: str) -> str:
+        with self._lock:
+            return self._agent_tasks.get(agent) or self._active_task or UNASSIGNED_TASK
+
+
+class LLMUsageHandler(BaseCallbackHandler):
+    """Records prompt and completion tokens of one agent's LLM calls in the metrics registry."""
+
+    def __init__(self, agent: str, tracker: TaskTracker):
+        self.agent = agent
+        self.tracker = tracker
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        # Completions served from the LLM cache carry no usage and cost nothing.
+        usage = (response.llm_output or {}).get('token_usage')
+        if not usage:
+            return
+        get_metrics().observe_llm_call(
+            self.tracker.task_for(self.agent),
+            self.agent,
+            usage.get('prompt_tokens', 0),
+            usage.get('completion_tokens', 0),
+        )
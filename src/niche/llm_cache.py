@@ -0,0 +1,68 @@
+import os
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from niche.tools.cache import ResponseCache
+
+LLM_CACHE_MODES = ('read_write', 'read_only', 'bypass')
+DEFAULT_LLM_CACHE_PATH = os.path.join('.niche_cache', 'llm.sqlite3')
+
+
+class CompletionCache(BaseCache):
+    """
+    On-disk cache of chat completions for the crew's LLM.
+
+    Entries are keyed by the serialized model and call parameters plus the
+    full message list, so a completion is only reused for an identical call.
+    Modes:
+      bypass     - always call the model (default), so normal runs never
+                   replay stale completions
+      read_write - serve hits and store new completions
+      read_only  - serve hits but never store, e.g. to replay a fixed set
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        path: Optional[str] = None,
+        max_entries: int = 20000,
+        ttl: int = 30 * 24 * 3600,
+    ):
+        self.mode = mode or os.getenv('NICHE_LLM_CACHE', 'bypass')
+        if self.mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{self.mode}', expected one of {LLM_CACHE_MODES}")
+        if path is None:
+            path = os.getenv('NICHE_LLM_CACHE_PATH', DEFAULT_LLM_CACHE_PATH)
+        self._store = ResponseCache(
+            path=path if self.mode != 'bypass' else '',
+            ttls={},
+            default_ttl=ttl,
+            max_memory_entries=256,
+            max_disk_entries=max_entries,
+            name='llm',
+        )
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> dict:
+        return {'llm': llm_string, 'prompt': prompt}
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.mode == 'bypass':
+            return None
+        generations = self._store.get('llm', self._key(prompt, llm_string))
+        if generations is None:
+            return None
+        return [loads(generation) for generation in generations]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode != 'read_write':
+            return
+        self._store.set('llm', self._key(prompt, llm_string), [dumps(generation) for generation in return_val])
+
+    def clear(self, **kwargs: Any) -> None:
+        self._store.clear()
+
+    def stats(self) -> dict:
+        return {'mode': self.mode, **self._store.stats()}
@@ -0,0 +1,252 @@
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+import yaml
+from langchain_core.callbacks import BaseCallbackHandler, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_openai import ChatOpenAI
+from openai import APIConnectionError
+
+from niche.instrumentation import TaskTracker
+from niche.llm_cache import CompletionCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS_PATH = os.path.join(os.path.dirname(__file__), 'config', 'models.yaml')
+_ENV_PATTERN = re.compile(r'\$\{(\w+)(?::-([^}]*))?\}')
+
+
+def _expand(value: Any) -> Any:
+    """Expands ${VAR} and ${VAR:-default}; a value that expands to '' becomes None."""
+    if not isinstance(value, str):
+        return value
+    expanded = _ENV_PATTERN.sub(lambda m: os.getenv(m.group(1)) or m.group(2) or '', value)
+    return expanded or None
+
+
+class ModelTier:
+    """One model endpoint with its own connection pool, concurrency cap and timeout."""
+
+    __slots__ = ('name', 'model', 'base_url', 'api_key', 'max_concurrency', 'timeout', 'fallback', 'semaphore')
+
+    def __init__(
+        self,
+        name: str,
+        model: Optional[str],
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        timeout: float = 120.0,
+        fallback: Optional[str] = None,
+    ):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.fallback = fallback
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @classmethod
+    def from_dict(cls, name: str, config: Dict[str, Any]) -> 'ModelTier':
+        return cls(
+            name,
+            model=_expand(config.get('model')),
+            base_url=_expand(config.get('base_url')),
+            api_key=_expand(config.get('api_key')),
+            max_concurrency=int(config.get('max_concurrency', 4)),
+            timeout=float(config.get('timeout', 120)),
+            fallback=config.get('fallback'),
+        )
+
+
+def _check_fallbacks(tiers: Dict[str, 'ModelTier']) -> None:
+    """Rejects fallbacks to unknown tiers and chains that lead back to a tier, which would never end."""
+    for tier in tiers.values():
+        chain = [tier.name]
+        fallback = tier.fallback
+        while fallback:
+            if fallback not in tiers:
+                raise ValueError(f"Unknown fallback model tier of {chain[-1]}: {fallback}")
+            if fallback in chain:
+                raise ValueError(f"Model tier fallbacks form a cycle: {' -> '.join(chain + [fallback])}")
+            chain.append(fallback)
+            fallback = tiers[fallback].fallback
+
+
+class ModelRouter:
+    """
+    Sends each LLM call to a model tier (config/models.yaml).
+
+    A call goes to the tier of the task the agent is working on (`model_tier`
+    in tasks.yaml), else to the agent's tier (`model_tier` in agents.yaml),
+    else to the default tier. Every tier has its own HTTP connection pool and
+    a cap on concurrent calls; a call that cannot get a slot in time, times
+    out or cannot connect is retried once on the tier's fallback.
+    """
+
+    def __init__(
+        self,
+        tiers: Dict[str, ModelTier],
+        default_tier: str,
+        task_tiers: Optional[Dict[str, str]] = None,
+        tracker: Optional[TaskTracker] = None,
+        enabled: bool = True,
+    ):
+        if default_tier not in tiers:
+            raise ValueError(f"Unknown default model tier: {default_tier}")
+        _check_fallbacks(tiers)
+        self.tiers = tiers
+        self.default_tier = default_tier
+        self.task_tiers = dict(task_tiers or {})
+        self.tracker = tracker or TaskTracker()
+        # With routing off every call goes to the default tier.
+        self.enabled = enabled
+        self._models: Dict[str, ChatOpenAI] = {}
+        self._cache = CompletionCache()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        path: Optional[str] = None,
+        task_tiers: Optional[Dict[str, str]] = None,
+        tracker: Optional[TaskTracker] = None,
+    ) -> 'ModelRouter':
+        """Loads the tiers from YAML (default: config/models.yaml, or NICHE_MODELS)."""
+        path = path or os.getenv('NICHE_MODELS', DEFAULT_MODELS_PATH)
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+        tiers = {name: ModelTier.from_dict(name, c or {}) for name, c in (config.get('tiers') or {}).items()}
+        return cls(
+            tiers,
+            default_tier=config.get('default_tier', 'remote'),
+            task_tiers=task_tiers,
+            tracker=tracker,
+            enabled=os.getenv('NICHE_MODEL_ROUTING', 'on') != 'off',
+        )
+
+    def model(self, tier_name: str) -> ChatOpenAI:
+        with self._lock:
+            if tier_name not in self._models:
+                tier = self.tiers[tier_name]
+                self._models[tier_name] = ChatOpenAI(
+                    model=tier.model,
+                    base_url=tier.base_url,
+                    api_key=tier.api_key or 'NA',
+                    timeout=tier.timeout,
+                    # Fall back instead of retrying a slow or unreachable endpoint.
+                    max_retries=0 if tier.fallback else 2,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=tier.max_concurrency, max_keepalive_connections=tier.max_concurrency
+                        ),
+                        timeout=tier.timeout,
+                    ),
+                    cache=self._cache,
+                )
+            return self._models[tier_name]
+
+    def tier_for(self, agent: str, agent_tier: Optional[str] = None, follow_task: bool = True) -> str:
+        if not self.enabled:
+            return self.default_tier
+        task_tier = self.task_tiers.get(self.tracker.task_for(agent)) if follow_task else None
+        tier = task_tier or agent_tier or self.default_tier
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown model tier: {tier}")
+        return tier
+
+    def generate(self, tier_name: str, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs) -> ChatResult:
+        tier = self.tiers[tier_name]
+        # Without a fallback a call waits for a free slot however long it takes.
+        if not tier.semaphore.acquire(timeout=tier.timeout if tier.fallback else None):
+            return self._fall_back(tier, 'no free slot', messages, stop, **kwargs)
+        try:
+            result = self.model(tier_name).generate([messages], stop=stop, **kwargs)
+        except APIConnectionError as e:
+            # Covers timeouts as well as an endpoint that is not running.
+            if not tier.fallback:
+                raise
+            error = e
+        else:
+            generations = result.generations[0]
+            return ChatResult(generations=generations, llm_output=_with_token_usage(result.llm_output, generations))
+        finally:
+            tier.semaphore.release()
+        return self._fall_back(tier, str(error) or type(error).__name__, messages, stop, **kwargs)
+
+    def _fall_back(self, tier: ModelTier, reason: str, messages: List[BaseMessage], stop, **kwargs) -> ChatResult:
+        logger.warning("Model tier %s failed (%s), using %s", tier.name, reason, tier.fallback)
+        return self.generate(tier.fallback, messages, stop, **kwargs)
+
+
+def _with_token_usage(llm_output: Optional[dict], generations: List[Any]) -> Optional[dict]:
+    """Streamed completions report their usage on the message instead of in llm_output."""
+    if (llm_output or {}).get('token_usage'):
+        return llm_output
+    usage = [getattr(g.message, 'usage_metadata', None) for g in generations if hasattr(g, 'message')]
+    usage = [u for u in usage if u]
+    if not usage:
+        return llm_output
+    return {
+        **(llm_output or {}),
+        'token_usage': {
+            'prompt_tokens': sum(u.get('input_tokens', 0) for u in usage),
+            'completion_tokens': sum(u.get('output_tokens', 0) for u in usage),
+            'total_tokens': sum(u.get('total_tokens', 0) for u in usage),
+        },
+    }
+
+
+class _TokenRelay(BaseCallbackHandler):
+    """Hands the tokens of a routed call on to the callbacks of the calling model."""
+
+    def __init__(self, run_manager: CallbackManagerForLLMRun):
+        self.run_manager = run_manager
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.run_manager.on_llm_new_token(token)
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model of one agent that sends every call through the model router."""
+
+    router: Any
+    agent: str
+    agent_tier: Optional[str] = None
+    follow_task: bool = True
+    # Stream completions so callbacks see every token as it arrives.
+    streaming: bool = False
+    # crewai reads the model name to set up its token counting.
+    model_name: str = ''
+
+    @property
+    def _llm_type(self) -> str:
+        return 'niche-routed-chat'
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tier = self.router.tier_for(self.agent, self.agent_tier, self.follow_task)
+        if self.streaming and run_manager:
+            kwargs.update(stream=True, stream_usage=True, callbacks=[_TokenRelay(run_manager)])
+        return self.router.generate(tier, messages, stop, **kwargs)
+
+    def _combine_llm_outputs(self, llm_outputs: List[Optional[dict]]) -> dict:
+        token_usage: Dict[str, int] = {}
+        for output in llm_outputs:
+            for key, value in ((output or {}).get('token_usage') or {}).items():
+                if isinstance(value, int):
+                    token_usage[key] = token_usage.get(key, 0) + value
+        return {'token_usage': token_usage, 'model_name': self.model_name}
@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 import sys
-from niche.crew import BlogContentResearchCrew
 
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding necessary logic into this file.
@@ -11,15 +10,64 @@ def run():
     """
     Run the crew.
     """
+    from niche.crew import BlogContentResearchCrew
     inputs = {
         'initial_topic': 'Desk Setup'
     }
-    BlogContentResearchCrew().crew().kickoff(inputs=inputs)
+    research = BlogContentResearchCrew(topic=inputs['initial_topic'])
+    result = research.kickoff(inputs=inputs)
+    if research.report_stream is None:
+        # A streamed run has already printed the report as it was written.
+        print(result.raw)
+    return result
+
+def refresh():
+    """
+    Re-run the crew, reusing checkpointed tasks and re-running only those whose
+    market data is older than their refresh_after in tasks.yaml.
+    """
+    from niche.crew import BlogContentResearchCrew
+    inputs = {
+        'initial_topic': 'Desk Setup'
+    }
+    BlogContentResearchCrew(topic=inputs['initial_topic'], checkpoints='refresh').kickoff(inputs=inputs)
+
+def batch():
+    """
+    Run the crew for every topic in a file, e.g. `batch topics.yaml output 4`.
+    """
+    from niche.batch import BatchRunner, load_topics
+    args = sys.argv[2:] if sys.argv[1:2] == ["batch"] else sys.argv[1:]
+    try:
+        BatchRunner(
+            load_topics(args[0]),
+            output_dir=args[1] if len(args) > 1 else 'output',
+            max_workers=int(args[2]) if len(args) > 2 else 2
+        ).run()
+    except Exception as e:
+        raise Exception(f"An error occurred while running the batch: {e}")
+
+def sweep():
+    """
+    Prefetch keyword and trend data for many markets through the DataForSEO
+    task queue, e.g. `sweep seeds.txt 2840:en,2826:en,2276:de`.
+    """
+    from niche.tools.dataforseo_queue import parse_markets, run_sweep
+    args = sys.argv[2:] if sys.argv[1:2] == ["sweep"] else sys.argv[1:]
+    try:
+        with open(args[0], 'r', encoding='utf-8') as f:
+            seeds = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        markets = parse_markets(args[1] if len(args) > 1 else '2840:en')
+        summary = run_sweep(seeds, markets)
+    except Exception as e:
+        raise Exception(f"An error occurred while running the sweep: {e}")
+    print(f"Sweep finished: {summary}")
 
 def train():
     """
     Train the crew for a given number of iterations.
     """
+    from niche.crew import BlogContentResearchCrew
     inputs = {
         'initial_topic': 'technology trends',
         'target_audience': 'tech-savvy professionals',
@@ -34,6 +82,7 @@ def replay():
     """
     Replay the crew execution from a specific task.
     """
+    from niche.crew import BlogContentResearchCrew
     try:
         BlogContentResearchCrew().crew().replay(task_id=sys.argv[1])
     except Exception as e:
@@ -43,6 +92,7 @@ def test():
     """
     Test the crew execution and returns the results.
     """
+    from niche.crew import BlogContentResearchCrew
     inputs = {
         'initial_topic': 'technology trends',
         'target_audience': 'tech-savvy professionals'
@@ -60,5 +110,11 @@ if __name__ == "__main__":
             replay()
         elif sys.argv[1] == "test":
             test()
+        elif sys.argv[1] == "batch":
+            batch()
+        elif sys.argv[1] == "refresh":
+            refresh()
+        elif sys.argv[1] == "sweep":
+            sweep()
     else:
         run()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from niche.instrumentation import TaskTracker
+
+# crewai agents end their last LLM completion with "Final Answer:" followed by the answer.
+FINAL_ANSWER_MARKER = 'Final Answer:'
+
+
+class ReportStream:
+    """
+    Writes the run's output while the crew is still working.
+
+    Every finished task is appended to <path>.partial and echoed to stdout as
+    soon as it is done, and the final answer of the report task is appended
+    token by token while the LLM writes it. When the run completes, the report
+    is written to <path> in one atomic rename and the partial file is removed;
+    if the run fails, the partial file keeps everything produced so far.
+    """
+
+    def __init__(self, path: str, report_task: str, echo: bool = True):
+        self.path = path
+        self.partial_path = f"{path}.partial"
+        self.report_task = report_task
+        self.echo = echo
+        # Whether report tokens were streamed, so the finished report is not written twice.
+        self.streamed = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.streamed = False
+        self._file = open(self.partial_path, 'w', encoding='utf-8')
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(text)
+            self._file.flush()
+            if self.echo:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+
+    def report_token(self, token: str) -> None:
+        if not self.streamed:
+            self.streamed = True
+            self.write(f"\n\n## {self.report_task}\n\n")
+        self.write(token)
+
+    def task_finished(self, name: str, raw: str) -> None:
+        if name == self.report_task and self.streamed:
+            self.write('\n')
+        else:
+            self.write(f"\n\n## {name}\n\n{raw}\n")
+
+    def finalize(self, report: str) -> None:
+        """Writes the finished report to the output file atomically and drops the partial file."""
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(report)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.close()
+        os.remove(self.partial_path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ReportTokenHandler(BaseCallbackHandler):
+    """
+    Passes the tokens of an agent's LLM calls on the report task to the report
+    stream, starting after the "Final Answer:" marker so the agent's reasoning
+    stays out of the report.
+    """
+
+    def __init__(self, stream: ReportStream, agent: str, tracker: TaskTracker):
+        self.stream = stream
+        self.agent = agent
+        self.tracker = tracker
+        self._buffer = ''
+        self._answering = False
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self._buffer = ''
+        self._answering = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if not self.stream.is_open or self.tracker.task_for(self.agent) != self.stream.report_task:
+            return
+        if self._answering:
+            self.stream.report_token(token)
+            return
+        self._buffer += token
+        _, marker, answer = self._buffer.partition(FINAL_ANSWER_MARKER)
+        if marker:
+            self._answering = True
+            self._buffer = ''
+            if answer.strip():
+                self.stream.report_token(answer.lstrip())
+
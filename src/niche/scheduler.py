@@ -0,0 +1,205 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from niche.checkpoint import TaskCheckpointer
+
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+
+
+def topological_order(dependencies: Dict[str, List[str]]) -> List[str]:
+    """Orders task names so every task comes after its dependencies."""
+    for name, upstream in dependencies.items():
+        for dependency in upstream:
+            if dependency not in dependencies:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dependency}'")
+
+    remaining = {name: set(upstream) for name, upstream in dependencies.items()}
+    order = []
+    while remaining:
+        ready = [name for name, upstream in remaining.items() if not upstream]
+        if not ready:
+            raise ValueError(f"Task dependencies contain a cycle: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for upstream in remaining.values():
+            upstream.difference_update(ready)
+    return order
+
+
+def usage_metrics(crew: Crew) -> Any:
+    """
+    Token usage of the crew's agents and manager. Crew.calculate_usage_metrics
+    only exists from crewai 0.60; on older releases the agents' token counters
+    are summed here.
+    """
+    if hasattr(crew, 'calculate_usage_metrics'):
+        return crew.calculate_usage_metrics()
+    totals: Dict[str, int] = {}
+    for member in [*crew.agents, crew.manager_agent]:
+        if member is None or not hasattr(member, '_token_process'):
+            continue
+        summary = member._token_process.get_summary()
+        if hasattr(summary, 'model_dump'):
+            summary = summary.model_dump()
+        for key, value in summary.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+class TaskTiming:
+    __slots__ = ('name', 'start', 'end')
+
+    def __init__(self, name: str, start: float, end: float):
+        self.name = name
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class DagScheduler:
+    """
+    Runs the tasks of a crew as a dependency graph instead of one after another.
+
+    Each task starts as soon as all tasks it depends on have finished and gets
+    only their outputs as context. Independent tasks run concurrently; tasks of
+    the same agent never overlap. With a checkpointer, tasks whose checkpoint is
+    still valid are restored instead of run, and every finished task is saved.
+    """
+
+    def __init__(
+        self,
+        crew: Crew,
+        dependencies: Dict[str, List[str]],
+        max_workers: int = 4,
+        on_task_start: Optional[Callable[[str, Task], None]] = None,
+        on_task_end: Optional[Callable[[str, Task], None]] = None,
+        checkpointer: Optional[TaskCheckpointer] = None,
+    ):
+        self.crew = crew
+        self.tasks: Dict[str, Task] = {task.name: task for task in crew.tasks}
+        missing = set(self.tasks) - set(dependencies)
+        self.dependencies = {**dependencies, **{name: [] for name in missing}}
+        self.order = topological_order(self.dependencies)
+        self.max_workers = max_workers
+        self.on_task_start = on_task_start
+        self.on_task_end = on_task_end
+        self.checkpointer = checkpointer
+        self.timings: Dict[str, TaskTiming] = {}
+        self._agent_locks: Dict[str, threading.Lock] = {}
+
+    def _prepare(self, inputs: Optional[Dict[str, Any]]) -> None:
+        if inputs:
+            for task in self.tasks.values():
+                task.interpolate_inputs(inputs)
+            for agent in self.crew.agents:
+                agent.interpolate_inputs(inputs)
+        for agent in self.crew.agents:
+            agent.crew = self.crew
+            agent.create_agent_executor()
+            self._agent_locks.setdefault(agent.role, threading.Lock())
+
+    def _upstream(self, name: str, outputs: Dict[str, TaskOutput]) -> List[str]:
+        return [outputs[dependency].raw for dependency in self.dependencies[name]]
+
+    def _execute(self, name: str, upstream: List[str], started_at: float) -> TaskOutput:
+        task = self.tasks[name]
+        agent = task.agent
+        if agent is None:
+            raise ValueError(f"Task '{name}' has no agent assigned")
+        with self._agent_locks.setdefault(agent.role, threading.Lock()):
+            start = time.perf_counter() - started_at
+            if self.on_task_start:
+                self.on_task_start(name, task)
+            try:
+                output = task.execute_sync(agent=agent, context=CONTEXT_DIVIDER.join(upstream), tools=agent.tools)
+            finally:
+                if self.on_task_end:
+                    self.on_task_end(name, task)
+            self.timings[name] = TaskTiming(name, start, time.perf_counter() - started_at)
+        if self.checkpointer:
+            self.checkpointer.save(name, upstream, output)
+        return output
+
+    def kickoff(self, inputs: Optional[Dict[str, Any]] = None) -> CrewOutput:
+        self._prepare(inputs)
+        started_at = time.perf_counter()
+        outputs: Dict[str, TaskOutput] = {}
+        pending = {name: set(upstream) for name, upstream in self.dependencies.items()}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                ready = [name for name in self.order if name in pending and not pending[name]]
+                for name in ready:
+                    del pending[name]
+                    upstream = self._upstream(name, outputs)
+                    restored = self.checkpointer.restore(name, self.tasks[name], upstream) if self.checkpointer else None
+                    if restored is not None:
+                        self._complete(name, restored, outputs, pending)
+                        continue
+                    running[executor.submit(self._execute, name, upstream, started_at)] = name
+                if not running:
+                    # Restored tasks may have unblocked others without anything running.
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self._complete(name, future.result(), outputs, pending)
+
+        self.print_timings(time.perf_counter() - started_at)
+        tasks_output = [outputs[name] for name in self.order]
+        final_output = outputs[self.order[-1]]
+        return CrewOutput(
+            raw=final_output.raw,
+            pydantic=final_output.pydantic,
+            json_dict=final_output.json_dict,
+            tasks_output=tasks_output,
+            token_usage=usage_metrics(self.crew),
+        )
+
+    @staticmethod
+    def _complete(name: str, output: TaskOutput, outputs: Dict[str, TaskOutput], pending: Dict[str, set]) -> None:
+        outputs[name] = output
+        for upstream in pending.values():
+            upstream.discard(name)
+
+    def critical_path(self) -> List[str]:
+        """Longest chain of dependent tasks by measured duration."""
+        best: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self.order:
+            upstream = [d for d in self.dependencies[name] if d in best]
+            parent = max(upstream, key=lambda d: best[d], default=None)
+            duration = self.timings[name].duration if name in self.timings else 0.0
+            best[name] = duration + (best[parent] if parent else 0.0)
+            previous[name] = parent
+        if not best:
+            return []
+        path = [max(best, key=best.get)]
+        while previous[path[-1]]:
+            path.append(previous[path[-1]])
+        return list(reversed(path))
+
+    def print_timings(self, wall_time: float) -> None:
+        serial = sum(timing.duration for timing in self.timings.values())
+        critical = self.critical_path()
+        critical_time = sum(self.timings[name].duration for name in critical if name in self.timings)
+        print("Task timings (seconds):")
+        for name in self.order:
+            timing = self.timings.get(name)
+            if timing:
+                print(f"  {name:<45} start {timing.start:8.1f}  end {timing.end:8.1f}  took {timing.duration:8.1f}")
+            elif self.checkpointer and name in self.checkpointer.restored:
+                print(f"  {name:<45} restored from checkpoint")
+        print(f"  Sequential total: {serial:.1f}s | critical path: {critical_time:.1f}s | wall time: {wall_time:.1f}s")
+        print(f"  Critical path: {' -> '.join(critical)}")
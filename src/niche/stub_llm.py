@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from niche.tools.cassette import Cassette, CassetteMiss
+from niche.tools.output_format import estimate_tokens
+from niche.tools.transport import HttpTransport
+
+# Cassette key for chat completions, independent of which upstream was recorded.
+LLM_ENDPOINT = 'llm://chat/completions'
+STUB_ANSWER = "Thought: I now know the final answer\nFinal Answer: Stub answer for offline runs."
+
+
+class StubLLMServer:
+    """
+    Local OpenAI-compatible chat completions server for offline runs.
+
+    Without a cassette every request gets a canned final answer. With a replay
+    cassette recorded completions are served for matching requests, falling
+    back to the canned answer on a miss. With a record cassette requests are
+    forwarded to the upstream API and the responses stored.
+    """
+
+    def __init__(
+        self,
+        cassette: Optional[Cassette] = None,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        upstream_base: Optional[str] = None,
+        upstream_key: Optional[str] = None,
+    ):
+        self.cassette = cassette
+        self.upstream_base = (upstream_base or os.getenv('OPENAI_API_BASE') or 'https://api.openai.com/v1').rstrip('/')
+        self.upstream_key = upstream_key or os.getenv('OPENAI_API_KEY')
+        self.calls = 0
+        self.misses = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._transport = HttpTransport()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                status, payload = stub.complete(body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _canned(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        prompt_tokens = sum(estimate_tokens(str(m.get('content') or '')) for m in body.get('messages', []))
+        completion_tokens = estimate_tokens(STUB_ANSWER)
+        return {
+            'id': f"stub-{self.calls}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model') or 'stub',
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': STUB_ANSWER},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+    def complete(self, body: Dict[str, Any]):
+        with self._lock:
+            self.calls += 1
+        status, payload = 200, None
+        if self.cassette is not None and self.cassette.recording:
+            response = self._transport.post(
+                f"{self.upstream_base}/chat/completions",
+                json=body,
+                headers={'Authorization': f"Bearer {self.upstream_key}"},
+            )
+            self.cassette.record('POST', LLM_ENDPOINT, response, json=body)
+            status, payload = response.status_code, response.json()
+        elif self.cassette is not None:
+            try:
+                response = self.cassette.play('POST', LLM_ENDPOINT, json=body)
+                status, payload = response.status_code, response.json()
+            except CassetteMiss:
+                with self._lock:
+                    self.misses += 1
+        if payload is None:
+            payload = self._canned(body)
+        usage = payload.get('usage') or {}
+        with self._lock:
+            self.prompt_tokens += usage.get('prompt_tokens', 0)
+            self.completion_tokens += usage.get('completion_tokens', 0)
+        return status, payload
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'llm_calls': self.calls,
+                'llm_misses': self.misses,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'total_tokens': self.prompt_tokens + self.completion_tokens,
+            }
+
+    def start(self) -> 'StubLLMServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
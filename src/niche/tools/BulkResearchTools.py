@@ -0,0 +1,174 @@
+# niche/tools/BulkResearchTools.py
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from crewai_tools import BaseTool
+from pydantic import PrivateAttr
+from niche.tools.governor import BudgetGovernor, governed_tool_call
+from niche.tools.metrics import enable_debug_logging, instrumented_tool_call
+from niche.tools.output_format import dedupe_snippets, estimate_tokens, render_rows, truncate
+from niche.tools.SerperDevTools import SERP_COLUMNS, serper_headers, serper_search
+from niche.tools.TavilyTools import TavilySearchClient
+
+logger = logging.getLogger(__name__)
+
+# Serper answers a JSON array of queries in one request, up to 100 queries.
+MAX_SERPER_BATCH = 100
+
+
+class BulkKeywordResearchTool(BaseTool):
+    name: str = "BulkKeywordResearchTool"
+    description: str = """
+    Researches a whole list of keywords in one call: fetches the top Google results
+    (via Serper) and an AI web search (via Tavily) for every keyword concurrently.
+
+    Input: A string of comma-separated keywords. Pass all keywords at once.
+    Example: "standing desk, cable management, monitor arm"
+
+    Output: One compact bundle per keyword with:
+    - the top ranking pages (position, title, link, snippet)
+    - a short web-search answer and the most relevant source snippets
+
+    Use this instead of calling SerperDevScraper and AIWebSearch once per keyword.
+    """
+    _tavily_search: TavilySearchClient = PrivateAttr()
+    _debug: bool = PrivateAttr(default=False)
+    _serp_results: int = PrivateAttr(default=5)
+    _web_results: int = PrivateAttr(default=3)
+    _max_workers: int = PrivateAttr(default=5)
+    _snippet_chars: int = PrivateAttr(default=200)
+    _token_budget: Optional[int] = PrivateAttr(default=None)
+    _governor: Optional[BudgetGovernor] = PrivateAttr(default=None)
+    _last_output_stats: dict = PrivateAttr(default_factory=dict)
+
+    def __init__(
+        self,
+        debug: bool = False,
+        serp_results: int = 5,
+        web_results: int = 3,
+        max_workers: int = 5,
+        snippet_chars: int = 200,
+        token_budget: Optional[int] = None,
+        governor: Optional[BudgetGovernor] = None,
+    ):
+        super().__init__()
+        self._debug = debug
+        if debug:
+            enable_debug_logging()
+        self._serp_results = serp_results
+        self._web_results = web_results
+        self._max_workers = max_workers
+        self._snippet_chars = snippet_chars
+        self._token_budget = token_budget
+        self._governor = governor
+        self._tavily_search = TavilySearchClient(
+            api_key=os.getenv('TAVILY_API_KEY'), tool=self.name, governor=governor
+        )
+
+    @property
+    def last_output_stats(self) -> dict:
+        return self._last_output_stats
+
+    @instrumented_tool_call
+    @governed_tool_call
+    def _run(self, keywords: str) -> str:
+        try:
+            keyword_list, seen = [], set()
+            for keyword in keywords.split(','):
+                keyword = keyword.strip()
+                if keyword and keyword.lower() not in seen:
+                    seen.add(keyword.lower())
+                    keyword_list.append(keyword)
+            logger.debug("BulkKeywordResearchTool input keywords: %s", keyword_list)
+            if not keyword_list:
+                return "Error: no keywords given"
+
+            headers = serper_headers()
+            with ThreadPoolExecutor(max_workers=max(1, self._max_workers)) as executor:
+                serp_future = executor.submit(self._search_serper, keyword_list, headers)
+                web_futures = {k: executor.submit(self._search_web, k) for k in keyword_list}
+                serp = serp_future.result()
+                web = {k: future.result() for k, future in web_futures.items()}
+
+            return self._render(keyword_list, serp, web)
+        except Exception as e:
+            logger.debug("BulkKeywordResearchTool error: %s", e, exc_info=True)
+            return f"Error: {str(e)}"
+
+    def _search_serper(self, keywords: List[str], headers: Dict[str, str]) -> Dict[str, List[Dict]]:
+        results: Dict[str, List[Dict]] = {}
+        for start in range(0, len(keywords), MAX_SERPER_BATCH):
+            batch = keywords[start:start + MAX_SERPER_BATCH]
+            payload = [{"q": keyword, "gl": "us", "hl": "en", "num": 10} for keyword in batch]
+            data = serper_search(payload, headers, self.name, 'batch', self._governor)
+            # A batch request returns one result object per query, in order.
+            for keyword, item in zip(batch, data if isinstance(data, list) else [data]):
+                results[keyword] = [
+                    {
+                        'position': result.get('position'),
+                        'title': result.get('title'),
+                        'link': result.get('link'),
+                        'snippet': result.get('snippet'),
+                    }
+                    for result in (item.get('organic') or [])[:self._serp_results]
+                ]
+        return results
+
+    def _search_web(self, keyword: str) -> Dict:
+        try:
+            return self._tavily_search.raw_results(
+                keyword, max_results=self._web_results, search_depth="advanced", include_answer=True
+            )
+        except Exception as e:
+            # One failed search should not sink the whole bundle.
+            logger.warning("AI web search failed for %s: %s", keyword, e)
+            return {'error': str(e)}
+
+    def _render(self, keywords: List[str], serp: Dict[str, List[Dict]], web: Dict[str, Dict]) -> str:
+        per_keyword_budget = self._token_budget // len(keywords) if self._token_budget else None
+        sections = []
+        tokens_before = 0
+        for keyword in keywords:
+            lines = [f"## {keyword}"]
+            serp_rows = dedupe_snippets(serp.get(keyword, []), 'snippet', self._snippet_chars)
+            table, stats = render_rows(serp_rows, SERP_COLUMNS, 'tsv')
+            tokens_before += stats['tokens_before']
+            lines.append("SERP:")
+            lines.append(table if serp_rows else "(no results)")
+
+            search = web.get(keyword) or {}
+            lines.append("Web:")
+            if search.get('error'):
+                lines.append(f"(search failed: {search['error']})")
+            else:
+                if search.get('answer'):
+                    lines.append(f"Answer: {truncate(search['answer'], self._snippet_chars * 2)}")
+                sources = dedupe_snippets(search.get('results') or [], 'content', self._snippet_chars)
+                tokens_before += sum(estimate_tokens(r.get('content') or '') for r in search.get('results') or [])
+                for i, source in enumerate(sources, 1):
+                    lines.append(f"{i}. {source['content']} - {source.get('url')}")
+
+            section = "\n".join(lines)
+            if per_keyword_budget is not None and estimate_tokens(section) > per_keyword_budget:
+                # Keep the section under its share of the budget, dropping whole trailing lines.
+                kept, used = [], 0
+                for line in lines:
+                    used += estimate_tokens(line) + 1
+                    if used > per_keyword_budget:
+                        break
+                    kept.append(line)
+                section = "\n".join(kept + ["# more results omitted to fit the output budget"])
+            sections.append(section)
+
+        output = "\n\n".join(sections)
+        self._last_output_stats = {
+            'rows': len(keywords),
+            'rows_omitted': 0,
+            'tokens_before': tokens_before,
+            'tokens_after': estimate_tokens(output),
+        }
+        logger.debug("BulkKeywordResearchTool output stats: %s", self._last_output_stats)
+        return output
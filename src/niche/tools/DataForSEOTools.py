@@ -1,147 +1,255 @@
 # niche/tools/DataForSEOTools.py
 
-import requests
 import json
-import os
-import base64
-from typing import List, Dict
+import logging
+from typing import List, Dict, Optional, Set, Tuple
+import numpy as np
 from crewai_tools import BaseTool
-from dotenv import load_dotenv
 from pydantic import PrivateAttr
+from niche.tools.dataforseo_client import DataForSEOClient
+from niche.tools.governor import BudgetGovernor, governed_tool_call
+from niche.tools.keyword_clustering import cluster_keyword_rows
+from niche.tools.keyword_store import KeywordRow, KeywordStore, attribute_seeds
+from niche.tools.metrics import enable_debug_logging, get_metrics, instrumented_tool_call
+from niche.tools.output_format import estimate_tokens, render_rows, summarize_series
+from niche.tools.scoring import CompSWeights, DEFAULT_WEIGHTS, calculate_comps, calculate_comps_array, top_n_indices
+from niche.tools.trend_analytics import (
+    TREND_FEATURE_COLUMNS, TREND_RANKING_COLUMNS, TREND_VIEWS, momentum_ranking, trend_feature_rows
+)
 
-# Load environment variables
-load_dotenv()
-
-# Load DataForSEO credentials from environment variables
-DATAFORSEO_LOGIN = os.getenv('DATAFORSEO_LOGIN')
-DATAFORSEO_PASSWORD = os.getenv('DATAFORSEO_PASSWORD')
-
-class DataForSEOClient:
-    def __init__(self, debug: bool = False):
-        self.base_url = 'https://api.dataforseo.com/v3/'
-        self.credentials = base64.b64encode(f"{DATAFORSEO_LOGIN}:{DATAFORSEO_PASSWORD}".encode()).decode()
-        self.headers = {
-            'Authorization': f'Basic {self.credentials}',
-            'Content-Type': 'application/json'
-        }
-        self.cache = {}
-        self.api_call_count = 0
-        self.debug = debug
-
-    def get_keywords_for_keywords(self, keywords: List[str]) -> Dict[str, Dict]:
-        payload = [{
-            "keywords": keywords,
-            "language_code": "en",
-            "location_code": 2840  # USA
-        }]
-        url = self.base_url + 'keywords_data/google_ads/keywords_for_keywords/live'
-        response = requests.post(url, headers=self.headers, data=json.dumps(payload))
-        self.api_call_count += 1
-        return response.json()
-
-    def get_google_trends_data(self, keywords: List[str]) -> Dict[str, Dict]:
-        results = {}
-        for i in range(0, len(keywords), 5):
-            batch = keywords[i:i+5]
-            payload = {
-                "keywords": batch
-            }
-            url = self.base_url + 'keywords_data/google_trends/explore/live'
-            if self.debug:
-                print(f"[DEBUG-API-INPUT] get_google_trends_data payload: {json.dumps(payload, indent=2)}")
-            try:
-                response = requests.post(url, headers=self.headers, data=json.dumps(payload))
-                self.api_call_count += 1
-                data = response.json()
-                if self.debug:
-                    print(f"[DEBUG-API-OUTPUT] get_google_trends_data response: {json.dumps(data, indent=2)}")
-                if 'tasks' in data:
-                    for task in data.get('tasks', []):
-                        if 'result' in task:
-                            for result in task.get('result', []):
-                                for keyword in result.get('keywords', []):
-                                    results[keyword] = result
-                else:
-                    print(f"API error: {data.get('status_message')}")
-            except requests.exceptions.RequestException as e:
-                print(f"Request failed: {e}")
-        return results
+logger = logging.getLogger(__name__)
+
+KEYWORD_COLUMNS = ('keyword', 'search_volume', 'competition', 'competition_index', 'cpc', 'compS', 'seeds')
+CLUSTERED_KEYWORD_COLUMNS = KEYWORD_COLUMNS + ('cluster_size', 'variants')
+TRENDS_SUMMARY_COLUMNS = ('keyword', 'points', 'first', 'last', 'min', 'max', 'mean', 'peak_date', 'change_pct')
 
 class KeywordExpansionTool(BaseTool):
     name: str = "KeywordExpansionTool"
     description: str = """
     Expands a set of seed keywords using the Google Ads keywords_for_keywords API.
-    Calculates CompS score and returns up to the top 1000 keywords based on this score.
+    All seeds are expanded in a single call: they are packed into as few API requests
+    as possible, sent in parallel, and the results are merged and de-duplicated.
+    Calculates CompS score and returns the top keywords based on this score.
 
-    Input: A string of comma-separated keywords.
+    Input: A string of comma-separated seed keywords. Pass all seed keywords at once.
     Example: "desk gadgets, office accessories, workplace tech"
 
-    Output: A JSON string containing expanded keywords with their CompS scores.
+    Output: Expanded keywords with their CompS scores and the seed keywords each one
+    was expanded from, as JSON or as a table with one header line. With clustering,
+    plurals, word-order variants and near-duplicates are merged into one row per
+    cluster: the representative keyword with the cluster's total search volume,
+    its CompS and a few of its variants.
     """
     _client: DataForSEOClient = PrivateAttr()
-    _debug: bool = PrivateAttr(default=True)
+    _debug: bool = PrivateAttr(default=False)
+    _top_n_per_seed: int = PrivateAttr(default=40)
+    _max_workers: Optional[int] = PrivateAttr(default=None)
+    _weights: CompSWeights = PrivateAttr(default=DEFAULT_WEIGHTS)
+    _store: Optional[KeywordStore] = PrivateAttr(default=None)
+    _topic: str = PrivateAttr(default='')
+    _output_format: str = PrivateAttr(default='json')
+    _token_budget: Optional[int] = PrivateAttr(default=None)
+    _governor: Optional[BudgetGovernor] = PrivateAttr(default=None)
+    _cluster: bool = PrivateAttr(default=False)
+    _last_output_stats: Dict = PrivateAttr(default_factory=dict)
 
-    def __init__(self, client: DataForSEOClient, debug: bool = True):
+    def __init__(
+        self,
+        client: DataForSEOClient,
+        debug: bool = False,
+        top_n_per_seed: int = 40,
+        max_workers: Optional[int] = None,
+        weights: Optional[CompSWeights] = None,
+        store: Optional[KeywordStore] = None,
+        topic: str = '',
+        output_format: str = 'json',
+        token_budget: Optional[int] = None,
+        governor: Optional[BudgetGovernor] = None,
+        cluster: bool = False,
+    ):
         super().__init__()
+        self._governor = governor
+        self._cluster = cluster
+        self._output_format = output_format
+        self._token_budget = token_budget
         self._client = client
         self._debug = debug
+        if debug:
+            enable_debug_logging()
+        self._top_n_per_seed = top_n_per_seed
+        self._max_workers = max_workers
+        self._weights = weights or DEFAULT_WEIGHTS
+        self._store = store
+        self._topic = topic
+
+    def set_topic(self, topic: str) -> None:
+        self._topic = topic
+
+    @property
+    def last_output_stats(self) -> Dict:
+        return self._last_output_stats
 
+    def _api_call_count(self) -> int:
+        # Calls answered from the response cache or the keyword store are refunded by the governor.
+        return self._client.api_call_count
+
+    @instrumented_tool_call
+    @governed_tool_call
     def _run(self, keywords: str) -> str:
         try:
-            keyword_list = [k.strip() for k in keywords.split(',')]
-            
-            if self._debug:
-                print(f"[DEBUG-API-INPUT] KeywordExpansionTool input keywords: {keyword_list}")
+            seed_list = self._parse_seeds(keywords)
 
-            data = self._client.get_keywords_for_keywords(keyword_list)
-            
-            if self._debug:
-                total_objects = sum(len(task.get('result', [])) for task in data.get('tasks', []))
-                print(f"[DEBUG-API-OUTPUT] KeywordExpansionTool total objects received: {total_objects}")
+            logger.debug("KeywordExpansionTool input keywords: %s", seed_list)
+
+            known_rows = self._known_rows(seed_list)
+            known_seeds = {row.seed.lower() for row in known_rows} | self._fetched_seeds(seed_list)
+            missing_seeds = [seed for seed in seed_list if seed.lower() not in known_seeds]
+            if self._store is not None:
+                get_metrics().observe_cache('keyword_store', True, len(seed_list) - len(missing_seeds))
+                get_metrics().observe_cache('keyword_store', False, len(missing_seeds))
+
+            responses = self._client.get_keywords_for_keywords_bulk(missing_seeds, max_workers=self._max_workers)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                total_objects = sum(
+                    len(task.get('result') or []) for _, data in responses for task in data.get('tasks', [])
+                )
+                logger.debug(
+                    "KeywordExpansionTool total objects received: %d in %d request(s), %d seed(s) from the keyword store",
+                    total_objects, len(responses), len(seed_list) - len(missing_seeds)
+                )
 
-            processed_data = self._process_keyword_data(data)
-            top_keywords = self._select_top_keywords(processed_data, 40)
+            fetched_data = self._merge_keyword_data(responses)
+            self._save_rows(fetched_data)
+            self._mark_fetched(responses)
+            processed_data = self._merge_rows(fetched_data + [row.to_dict() for row in known_rows])
+            expanded_count = len(processed_data)
+            if self._cluster:
+                processed_data = cluster_keyword_rows(processed_data, weights=self._weights)
+            top_keywords = self._select_top_keywords(processed_data, self._top_n_per_seed * len(seed_list))
 
-            return json.dumps(top_keywords, indent=2)
+            output, self._last_output_stats = render_rows(
+                top_keywords, CLUSTERED_KEYWORD_COLUMNS if self._cluster else KEYWORD_COLUMNS,
+                self._output_format, self._token_budget
+            )
+            self._last_output_stats['keywords_expanded'] = expanded_count
+            self._last_output_stats['keywords_after_clustering'] = len(processed_data)
+            logger.debug("KeywordExpansionTool output stats: %s", self._last_output_stats)
+            return output
         except Exception as e:
             error_message = f"Error in KeywordExpansionTool: {str(e)}"
-            if self._debug:
-                print(f"[DEBUG-ERROR] {error_message}")
+            logger.debug(error_message, exc_info=True)
             return error_message
 
+    @staticmethod
+    def _parse_seeds(keywords: str) -> List[str]:
+        seeds = []
+        seen = set()
+        for keyword in keywords.split(','):
+            keyword = keyword.strip()
+            if keyword and keyword.lower() not in seen:
+                seen.add(keyword.lower())
+                seeds.append(keyword)
+        return seeds
+
+    def _known_rows(self, seeds: List[str]) -> List[KeywordRow]:
+        if self._store is None:
+            return []
+        return self._store.fresh_keywords_for_seeds(
+            seeds, self._client.location_code, self._client.language_code
+        )
+
+    def _fetched_seeds(self, seeds: List[str]) -> Set[str]:
+        if self._store is None:
+            return set()
+        return self._store.fresh_seeds(seeds, self._client.location_code, self._client.language_code)
+
+    def _mark_fetched(self, responses: List[Tuple[List[str], Dict]]) -> None:
+        # Seeds of successful requests count as fetched even without rows, so an
+        # empty result is not paid for again on the next run.
+        if self._store is None:
+            return
+        seeds = [seed for chunk, data in responses if self._client.is_successful(data) for seed in chunk]
+        if seeds:
+            self._store.mark_seeds_fetched(seeds, self._client.location_code, self._client.language_code)
+
+    def _save_rows(self, keywords: List[Dict]) -> None:
+        if self._store is None or not keywords:
+            return
+        self._store.upsert_keywords(
+            KeywordRow(
+                keyword=k['keyword'],
+                seed=seed,
+                topic=self._topic,
+                location_code=self._client.location_code,
+                language_code=self._client.language_code,
+                search_volume=k['search_volume'],
+                competition=k['competition'],
+                competition_index=k['competition_index'],
+                cpc=k['cpc'],
+                comps=k['compS'],
+            )
+            for k in keywords
+            for seed in k['seeds']
+        )
+
+    def _merge_keyword_data(self, responses: List[Tuple[List[str], Dict]]) -> List[Dict]:
+        rows = []
+        for chunk, data in responses:
+            for keyword_data in self._process_keyword_data(data):
+                if keyword_data['keyword']:
+                    keyword_data['seeds'] = attribute_seeds(keyword_data['keyword'], chunk)
+                    rows.append(keyword_data)
+        return self._merge_rows(rows)
+
+    @staticmethod
+    def _merge_rows(rows: List[Dict]) -> List[Dict]:
+        merged: Dict[str, Dict] = {}
+        for keyword_data in rows:
+            key = keyword_data['keyword'].lower()
+            if key in merged:
+                seeds = merged[key]['seeds']
+                seeds.extend(s for s in keyword_data['seeds'] if s not in seeds)
+            else:
+                merged[key] = keyword_data
+        return list(merged.values())
+
     def _process_keyword_data(self, data: Dict) -> List[Dict]:
         processed_data = []
         if 'tasks' in data:
             for task in data.get('tasks', []):
                 if 'result' in task:
-                    for item in task.get('result', []):
-                        keyword_data = {
+                    for item in task.get('result') or []:
+                        processed_data.append({
                             'keyword': item.get('keyword'),
                             'competition': item.get('competition'),
                             'competition_index': item.get('competition_index'),
                             'search_volume': item.get('search_volume'),
                             'cpc': item.get('cpc')
-                        }
-                        keyword_data['compS'] = self._calculate_compS(keyword_data)
-                        processed_data.append(keyword_data)
+                        })
+
+        # Score every row in one vectorized pass.
+        scores = calculate_comps_array(
+            [k['search_volume'] for k in processed_data],
+            [k['competition_index'] for k in processed_data],
+            [k['cpc'] for k in processed_data],
+            self._weights
+        )
+        for keyword_data, score in zip(processed_data, scores.tolist()):
+            keyword_data['compS'] = score
         return processed_data
 
     def _calculate_compS(self, keyword_data: Dict) -> float:
-        # Normalize scores
-        sv_norm = min(keyword_data['search_volume'] / 1000, 100) if keyword_data['search_volume'] else 0
-        ics_norm = 100 - keyword_data['competition_index'] if keyword_data['competition_index'] is not None else 0
-        ms_norm = min(keyword_data['cpc'] * 10, 100) if keyword_data['cpc'] else 0
-
-        # Weights (adjust as needed)
-        w_sv, w_ics, w_ms = 0.4, 0.4, 0.2
-
-        # Calculate CompS
-        compS = (w_sv * sv_norm) + (w_ics * ics_norm) + (w_ms * ms_norm)
-        return round(compS, 2)
+        return calculate_comps(
+            keyword_data['search_volume'],
+            keyword_data['competition_index'],
+            keyword_data['cpc'],
+            self._weights
+        )
 
     def _select_top_keywords(self, keywords: List[Dict], top_n: int = 1000) -> List[Dict]:
-        sorted_keywords = sorted(keywords, key=lambda x: x['compS'], reverse=True)
-        return sorted_keywords[:top_n]
+        scores = np.fromiter((k['compS'] for k in keywords), dtype=float, count=len(keywords))
+        return [keywords[i] for i in top_n_indices(scores, top_n)]
 
 class GoogleTrendsDataForSEOTool(BaseTool):
     name: str = "GoogleTrendsDataForSEOTool"
@@ -151,63 +259,150 @@ class GoogleTrendsDataForSEOTool(BaseTool):
     Input: A string of comma-separated keywords (up to 5 keywords).
     Example: "desk gadgets, MOFT, Microsoft Surface, ergonomic accessories, smart office"
 
-    Output: A JSON string containing trend data for each keyword.
+    Output: Trend data for each keyword: the full time series, a one-line summary
+    per keyword, or computed trend features (recent slope, year-over-year growth,
+    seasonality, peak month, volatility), optionally ranked by momentum.
+    slope_pct is the recent change in % of the keyword's mean per week, yoy_pct the
+    growth against the same weeks a year earlier, seasonality 0-1.
 
     IMPORTANT USAGE GUIDELINES:
     1. You can specify up to 5 keywords per API call.
     2. Keywords should be separated by commas.
-    3. Limit the total number of calls to this tool to the allowed API call limits.
+    3. Calls are limited by a budget; the remaining budget is shown after each result. Stop calling when it runs out.
     """
     _client: DataForSEOClient = PrivateAttr()
-    _debug: bool = PrivateAttr(default=True)
+    _debug: bool = PrivateAttr(default=False)
+    _store: Optional[KeywordStore] = PrivateAttr(default=None)
+    _output_format: str = PrivateAttr(default='json')
+    _token_budget: Optional[int] = PrivateAttr(default=None)
+    _governor: Optional[BudgetGovernor] = PrivateAttr(default=None)
+    _view: str = PrivateAttr(default='series')
+    _last_output_stats: Dict = PrivateAttr(default_factory=dict)
 
-    def __init__(self, client: DataForSEOClient, debug: bool = True):
+    def __init__(
+        self,
+        client: DataForSEOClient,
+        debug: bool = False,
+        store: Optional[KeywordStore] = None,
+        output_format: str = 'json',
+        token_budget: Optional[int] = None,
+        governor: Optional[BudgetGovernor] = None,
+        view: str = 'series',
+    ):
         super().__init__()
+        if view not in TREND_VIEWS:
+            raise ValueError(f"Unknown trends view: {view}")
+        self._governor = governor
+        self._view = view
         self._client = client
         self._debug = debug
+        if debug:
+            enable_debug_logging()
+        self._store = store
+        self._output_format = output_format
+        self._token_budget = token_budget
+
+    @property
+    def last_output_stats(self) -> Dict:
+        return self._last_output_stats
 
+    def _api_call_count(self) -> int:
+        # Calls answered from the response cache or the keyword store are refunded by the governor.
+        return self._client.api_call_count
+
+    @instrumented_tool_call
+    @governed_tool_call
     def _run(self, keywords: str) -> str:
         try:
             keyword_list = [k.strip() for k in keywords.split(',')]
             
-            if self._debug:
-                print(f"[DEBUG-API-INPUT] GoogleTrendsDataForSEOTool input keywords: {keyword_list}")
+            logger.debug("GoogleTrendsDataForSEOTool input keywords: %s", keyword_list)
 
-            data = self._client.get_google_trends_data(keyword_list)
+            data = self._get_trends(keyword_list)
             
-            if self._debug:
-                total_objects = len(data)
-                print(f"[DEBUG-API-OUTPUT] GoogleTrendsDataForSEOTool total objects received: {total_objects}")
+            logger.debug("GoogleTrendsDataForSEOTool total objects received: %d", len(data))
 
             processed_data = self.process_results(data)
 
-            if self._debug:
-                print("[DEBUG-TOOL-OUTPUT] GoogleTrendsDataForSEOTool top 5 processed results:")
+            if logger.isEnabledFor(logging.DEBUG):
                 for keyword, result in list(processed_data.items())[:5]:
-                    print(f"Keyword: {keyword}")
-                    print(json.dumps(result, indent=2))
-                    print()
+                    logger.debug("GoogleTrendsDataForSEOTool result for %s: %s", keyword, json.dumps(result, indent=2))
 
-            return json.dumps(processed_data, indent=2)
+            return self._render(processed_data)
         except Exception as e:
             error_message = f"Error in GoogleTrendsDataForSEOTool: {str(e)}"
-            if self._debug:
-                print(f"[DEBUG-ERROR] {error_message}")
+            logger.debug(error_message, exc_info=True)
             return error_message
 
+    def _render(self, processed_data: Dict[str, Dict]) -> str:
+        if self._view != 'series':
+            # Features are computed locally, so the LLM never sees the raw points.
+            series = {keyword: result['trends_data'] for keyword, result in processed_data.items()}
+            if self._view == 'ranking':
+                rows, columns = momentum_ranking(series), TREND_RANKING_COLUMNS
+            else:
+                rows, columns = trend_feature_rows(series), TREND_FEATURE_COLUMNS
+            output, self._last_output_stats = render_rows(rows, columns, self._output_format, self._token_budget)
+            self._last_output_stats['tokens_before'] = estimate_tokens(json.dumps(processed_data, indent=2))
+        elif self._output_format == 'json':
+            output, self._last_output_stats = render_rows(
+                [{'keyword': k, **v} for k, v in processed_data.items()], (), 'json', self._token_budget
+            )
+            # Keep the keyword-keyed layout of the full time series.
+            kept = self._last_output_stats['rows'] - self._last_output_stats['rows_omitted']
+            output = json.dumps(dict(list(processed_data.items())[:kept]), indent=2)
+        else:
+            summaries = [
+                {'keyword': keyword, **summarize_series(result['trends_data'])}
+                for keyword, result in processed_data.items()
+            ]
+            output, self._last_output_stats = render_rows(
+                summaries, TRENDS_SUMMARY_COLUMNS, self._output_format, self._token_budget
+            )
+            # Compare against the full time series the tool used to return.
+            self._last_output_stats['tokens_before'] = estimate_tokens(json.dumps(processed_data, indent=2))
+        logger.debug("GoogleTrendsDataForSEOTool output stats: %s", self._last_output_stats)
+        return output
+
+    def _get_trends(self, keyword_list: List[str]) -> Dict[str, Dict]:
+        time_range = self._client.trends_time_range_for(self._view)
+        if self._store is None:
+            return self._client.get_google_trends_data(keyword_list, time_range=time_range)
+
+        location_code, language_code = self._client.location_code, self._client.language_code
+        known = self._store.fresh_trends(keyword_list, location_code, language_code, time_range=time_range)
+        known_lower = {keyword.lower(): result for keyword, result in known.items()}
+        missing = [k for k in keyword_list if k.lower() not in known_lower]
+        get_metrics().observe_cache('keyword_store', True, len(keyword_list) - len(missing))
+        get_metrics().observe_cache('keyword_store', False, len(missing))
+        fetched = self._client.get_google_trends_data(missing, time_range=time_range) if missing else {}
+        self._store.upsert_trends(fetched, location_code, language_code, time_range)
+
+        fetched_lower = {keyword.lower(): result for keyword, result in fetched.items()}
+        data = {}
+        for keyword in keyword_list:
+            result = fetched_lower.get(keyword.lower()) or known_lower.get(keyword.lower())
+            if result is not None:
+                data[keyword] = result
+        return data
+
     def process_results(self, data: Dict[str, Dict]) -> Dict[str, Dict]:
         processed = {}
         for keyword, result in data.items():
             items = result.get('items', [])
             trends_data = []
-            for item in items:
+            for item in items or []:
                 if item.get('type') == 'google_trends_graph':
-                    for data_point in item.get('data', []):
+                    # A graph compares up to 5 keywords; each point carries one value per keyword.
+                    item_keywords = [k.lower() for k in item.get('keywords') or []]
+                    index = item_keywords.index(keyword.lower()) if keyword.lower() in item_keywords else 0
+                    for data_point in item.get('data') or []:
+                        values = data_point.get('values')
                         trends_data.append({
                             'date_from': data_point.get('date_from'),
                             'date_to': data_point.get('date_to'),
                             'timestamp': data_point.get('timestamp'),
-                            'value': data_point.get('value')
+                            'value': values[index] if values and index < len(values) else data_point.get('value')
                         })
             processed[keyword] = {
                 'trends_data': trends_data
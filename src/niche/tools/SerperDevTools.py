@@ -1,16 +1,52 @@
 # niche/tools/SerperDevTools.py
 
 import os
-import requests
 from crewai_tools import BaseTool
-import traceback
 import json
-from typing import List
-from dotenv import load_dotenv
+import logging
+from typing import List, Optional
 from pydantic import PrivateAttr
+from niche.tools.governor import BudgetGovernor, governed_tool_call
+from niche.tools.latency import get_latency_controller
+from niche.tools.metrics import enable_debug_logging, instrumented_tool_call
+from niche.tools.transport import get_transport
+from niche.tools.output_format import dedupe_snippets, estimate_tokens, render_rows
 
-# Load environment variables
-load_dotenv()
+SERP_COLUMNS = ('position', 'title', 'link', 'snippet')
+SERPER_SEARCH_URL = 'https://google.serper.dev/search'
+
+logger = logging.getLogger(__name__)
+
+
+def serper_headers() -> dict:
+    # Read on each call so the tools can be built, and the crew started, without the key.
+    api_key = os.getenv('SERPER_API_KEY')
+    if not api_key:
+        raise ValueError("SERPER_API_KEY environment variable is not set.")
+    return {
+        'X-API-KEY': api_key,
+        'Content-Type': 'application/json'
+    }
+
+
+def serper_search(payload, headers: dict, tool: str = 'SerperDevScraper', operation: str = 'search',
+                  governor: Optional[BudgetGovernor] = None):
+    """
+    Posts a query (or a list of queries) to Serper within the tool's latency
+    SLO. A batch of queries is never hedged with a duplicate, since Serper
+    charges every query again.
+    """
+    def request(timeout: float, max_retries: Optional[int] = None):
+        response = get_transport().post(
+            SERPER_SEARCH_URL, headers=headers, json=payload, idempotent=True, timeout=timeout,
+            max_retries=max_retries,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    return get_latency_controller().call(
+        tool, operation, request, duplicate=not isinstance(payload, list), governor=governor
+    )
 
 
 class SerperDevScraper(BaseTool):
@@ -21,60 +57,77 @@ class SerperDevScraper(BaseTool):
     Input: A single search query string.
     Example: "best hiking trails in California"
 
-    Output: A JSON string containing the top search results for the given query.
+    Output: The top search results for the given query (position, title, link, snippet),
+    as JSON or as a table with one header line.
 
     IMPORTANT USAGE GUIDELINES:
     1. Use this tool to get top search results for a given keyword or query.
     2. Provide only one search query at a time.
-    3. Limit the total number of API calls to stay within the allowed limits.
+    3. Calls are limited by a budget; the remaining budget is shown after each result. Stop calling when it runs out.
     """
-    _api_key: str = PrivateAttr()
-    _base_url: str = PrivateAttr()
-    _headers: dict = PrivateAttr()
     _debug: bool = PrivateAttr(default=False)
+    _output_format: str = PrivateAttr(default='json')
+    _token_budget: Optional[int] = PrivateAttr(default=None)
+    _snippet_chars: int = PrivateAttr(default=200)
+    _governor: Optional[BudgetGovernor] = PrivateAttr(default=None)
+    _last_output_stats: dict = PrivateAttr(default_factory=dict)
 
-    def __init__(self, debug: bool = False):
+    def __init__(
+        self,
+        debug: bool = False,
+        output_format: str = 'json',
+        token_budget: Optional[int] = None,
+        snippet_chars: int = 200,
+        governor: Optional[BudgetGovernor] = None,
+    ):
         super().__init__()
-        self._api_key = os.getenv('SERPER_API_KEY')
-        if not self._api_key:
-            raise ValueError("SERPER_API_KEY environment variable is not set.")
-        self._base_url = 'https://google.serper.dev/search'
-        self._headers = {
-            'X-API-KEY': self._api_key,
-            'Content-Type': 'application/json'
-        }
+        self._governor = governor
+        self._output_format = output_format
+        self._token_budget = token_budget
+        self._snippet_chars = snippet_chars
         self._debug = debug
+        if debug:
+            enable_debug_logging()
 
+    @instrumented_tool_call
+    @governed_tool_call
     def _run(self, query: str) -> str:
         try:
-            # Debug: Print input
-            if self._debug:
-                print(f"[DEBUG-API-INPUT] SerperDevScraper input query: {query}")
+            logger.debug("SerperDevScraper input query: %s", query)
 
             payload = {
                 "q": query,
                 "gl": "us",  # Geo location
                 "hl": "en"   # Language
             }
-            response = requests.post(self._base_url, headers=self._headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = serper_search(payload, serper_headers(), self.name, governor=self._governor)
 
-            # Debug: Print output
-            if self._debug:
-                print(f"[DEBUG-API-OUTPUT] SerperDevScraper response: {json.dumps(data, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("SerperDevScraper response: %s", json.dumps(data, indent=2))
 
             # Process the data to extract relevant information
             search_results = self.process_results(data)
-            output = json.dumps(search_results, indent=2)
-            return output
+            return self._render(search_results)
         except Exception as e:
-            # Debug: Print error
-            if self._debug:
-                error_message = f"SerperDevScraper error: {str(e)}\n{traceback.format_exc()}"
-                print(f"[DEBUG-ERROR] {error_message}")
+            logger.debug("SerperDevScraper error: %s", e, exc_info=True)
             return f"Error: {str(e)}"
 
+    @property
+    def last_output_stats(self) -> dict:
+        return self._last_output_stats
+
+    def _render(self, search_results: List[dict]) -> str:
+        if self._output_format == 'json':
+            output, self._last_output_stats = render_rows(search_results, SERP_COLUMNS, 'json', self._token_budget)
+        else:
+            compact = dedupe_snippets(search_results, 'snippet', self._snippet_chars)
+            output, self._last_output_stats = render_rows(
+                compact, SERP_COLUMNS, self._output_format, self._token_budget
+            )
+            self._last_output_stats['tokens_before'] = estimate_tokens(json.dumps(search_results, indent=2))
+        logger.debug("SerperDevScraper output stats: %s", self._last_output_stats)
+        return output
+
     def process_results(self, data) -> List[dict]:
         # Extract the organic search results
         organic_results = data.get('organic', [])
@@ -1,8 +1,63 @@
-from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
 from crewai_tools import BaseTool
+import logging
 import os
-import traceback
+from typing import Dict, List, Optional
 from pydantic import PrivateAttr
+from niche.tools.governor import BudgetGovernor, governed_tool_call
+from niche.tools.latency import get_latency_controller
+from niche.tools.metrics import enable_debug_logging, instrumented_tool_call
+from niche.tools.transport import get_transport
+from niche.tools.output_format import dedupe_snippets, estimate_tokens
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+logger = logging.getLogger(__name__)
+
+
+class TavilySearchClient:
+    """
+    Minimal Tavily Search API client that goes through the shared HTTP transport
+    and the latency SLO of the tool using it. Hedged searches are charged to
+    the tool's budget governor.
+    """
+
+    def __init__(self, api_key: str, tool: str = 'AIWebSearch', governor: Optional[BudgetGovernor] = None):
+        self.api_key = api_key
+        self.tool = tool
+        self.governor = governor
+
+    def raw_results(self, query: str, max_results: int = 5, search_depth: str = "advanced",
+                    include_answer: bool = False, **params) -> Dict:
+        def search(depth: str):
+            def request(timeout: float, max_retries: Optional[int] = None) -> Dict:
+                payload = {
+                    "api_key": self.api_key,
+                    "query": query,
+                    "max_results": max_results,
+                    "search_depth": depth,
+                    "include_answer": include_answer,
+                    **params,
+                }
+                # Searches are read-only, so transient failures are retried by the
+                # transport, unless the latency controller hedges them instead.
+                response = get_transport().post(
+                    f"{TAVILY_API_URL}/search", json=payload, idempotent=True, timeout=timeout,
+                    max_retries=max_retries,
+                )
+                response.raise_for_status()
+                return response.json()
+            return request
+
+        # A slow advanced search can fall back to the faster, cheaper basic depth.
+        fallback = "basic" if search_depth == "advanced" else None
+        return get_latency_controller().call(
+            self.tool, search_depth, search(search_depth),
+            hedge=search(fallback) if fallback else None, hedge_operation=fallback, governor=self.governor,
+        )
+
+    def results(self, query: str, **params) -> List[Dict]:
+        return self.raw_results(query, **params).get("results", [])
+
 
 class AIWebSearch(BaseTool):
     name: str = "AIWebSearch"
@@ -35,17 +90,38 @@ class AIWebSearch(BaseTool):
     Note: This tool is designed for factual information retrieval. For complex research tasks, consider using the results as a starting point and requesting additional searches if needed.
     """
     _debug: bool = PrivateAttr(default=False)
-    _tavily_search: TavilySearchAPIWrapper = PrivateAttr()
+    _tavily_search: TavilySearchClient = PrivateAttr()
+    _compact: bool = PrivateAttr(default=False)
+    _token_budget: Optional[int] = PrivateAttr(default=None)
+    _content_chars: int = PrivateAttr(default=400)
+    _governor: Optional[BudgetGovernor] = PrivateAttr(default=None)
+    _last_output_stats: dict = PrivateAttr(default_factory=dict)
 
-    def __init__(self, debug: bool = False):
+    def __init__(
+        self,
+        debug: bool = False,
+        compact: bool = False,
+        token_budget: Optional[int] = None,
+        content_chars: int = 400,
+        governor: Optional[BudgetGovernor] = None,
+    ):
         super().__init__()
+        self._governor = governor
         self._debug = debug
-        self._tavily_search = TavilySearchAPIWrapper(tavily_api_key=os.getenv('TAVILY_API_KEY'))
+        if debug:
+            enable_debug_logging()
+        self._compact = compact
+        self._token_budget = token_budget
+        self._content_chars = content_chars
+        self._tavily_search = TavilySearchClient(
+            api_key=os.getenv('TAVILY_API_KEY'), tool=self.name, governor=governor
+        )
 
+    @instrumented_tool_call
+    @governed_tool_call
     def _run(self, query: str) -> str:
         try:
-            if self._debug:
-                print(f"[DEBUG-TOOL-INPUT] AIWebSearch input: query={query}")
+            logger.debug("AIWebSearch input: query=%s", query)
 
             results = self._tavily_search.results(
                 query,
@@ -54,25 +130,50 @@ class AIWebSearch(BaseTool):
                 include_answer=True
             )
 
-            if self._debug:
-                total_objects = len(results)
-                print(f"[DEBUG-API-OUTPUT] AIWebSearch total objects received: {total_objects}")
-
-                print("[DEBUG-TOOL-OUTPUT] AIWebSearch top 5 results:")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("AIWebSearch total objects received: %d", len(results))
                 for i, result in enumerate(results[:5], 1):
-                    print(f"{i}. {result['title']}")
-                    print(f"   URL: {result['url']}")
-                    print(f"   Snippet: {result['content'][:100]}...")
-                    print()
-
-            output = f"Web search results for '{query}':\n" + "\n".join(
-                [f"{i+1}. {r['content']} - {r['url']}" for i, r in enumerate(results)]
-            )
+                    logger.debug("%d. %s | %s | %s...", i, result['title'], result['url'], result['content'][:100])
 
-            return output
+            return self._render(query, results)
 
         except Exception as e:
-            error_message = f"AIWebSearch error: {str(e)}\n{traceback.format_exc()}"
-            if self._debug:
-                print(f"[DEBUG-TOOL-ERROR] {error_message}")
-            return f"Error: {str(e)}"
\ No newline at end of file
+            logger.debug("AIWebSearch error: %s", e, exc_info=True)
+            return f"Error: {str(e)}"
+
+    @property
+    def last_output_stats(self) -> dict:
+        return self._last_output_stats
+
+    def _render(self, query: str, results: List[Dict]) -> str:
+        header = f"Web search results for '{query}':"
+        full_output = header + "\n" + "\n".join(
+            [f"{i+1}. {r['content']} - {r['url']}" for i, r in enumerate(results)]
+        )
+        if not self._compact and self._token_budget is None:
+            output = full_output
+            kept = len(results)
+        else:
+            if self._compact:
+                results = dedupe_snippets(results, 'content', self._content_chars)
+            lines = [header]
+            used = estimate_tokens(header)
+            for i, r in enumerate(results):
+                line = f"{i+1}. {r['content']} - {r['url']}"
+                used += estimate_tokens(line) + 1
+                if self._token_budget is not None and used > self._token_budget:
+                    break
+                lines.append(line)
+            kept = len(lines) - 1
+            if kept < len(results):
+                lines.append(f"# {len(results) - kept} more results omitted to fit the output budget")
+            output = "\n".join(lines)
+
+        self._last_output_stats = {
+            'rows': len(results),
+            'rows_omitted': len(results) - kept,
+            'tokens_before': estimate_tokens(full_output),
+            'tokens_after': estimate_tokens(output),
+        }
+        logger.debug("AIWebSearch output stats: %s", self._last_output_stats)
+        return output
@@ -0,0 +1,171 @@
+# niche/tools/cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from niche.tools.metrics import get_metrics
+
+DEFAULT_CACHE_PATH = os.path.join('.niche_cache', 'responses.sqlite3')
+
+# Time-to-live per endpoint prefix, in seconds. Keyword metrics move slowly,
+# trend curves are refreshed more often.
+DEFAULT_TTLS = {
+    'keywords_data/google_ads/keywords_for_keywords': 7 * 24 * 3600,
+    'keywords_data/google_trends/explore': 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+
+
+class ResponseCache:
+    """
+    Two-tier cache for API responses keyed by endpoint and canonical payload.
+
+    The first tier is an in-memory LRU, the second an SQLite file that survives
+    across runs. Both tiers are size-bounded and honour per-endpoint TTLs.
+    Pass path='' to keep the cache in memory only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = DEFAULT_TTL,
+        max_memory_entries: int = 512,
+        max_disk_entries: int = 50000,
+        name: str = 'responses',
+    ):
+        if path is None:
+            path = os.getenv('NICHE_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.path = path
+        self.name = name
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._db = self._open_db(path) if path else None
+
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, value TEXT NOT NULL, '
+            'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        db.execute('CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)')
+        db.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        db.commit()
+        return db
+
+    @staticmethod
+    def make_key(endpoint: str, payload: Any) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(f"{endpoint}\n{canonical}".encode()).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> int:
+        matches = [prefix for prefix in self.ttls if endpoint.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def get(self, endpoint: str, payload: Any) -> Optional[Any]:
+        value = self._lookup(self.make_key(endpoint, payload), time.time())
+        get_metrics().observe_cache(self.name, value is not None)
+        return value
+
+    def _lookup(self, key: str, now: float) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT value, expires_at FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                    self._db.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, endpoint: str, payload: Any, value: Any) -> None:
+        key = self.make_key(endpoint, payload)
+        now = time.time()
+        expires_at = now + self.ttl_for(endpoint)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is None:
+                return
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, value, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, endpoint, json.dumps(value), expires_at, now)
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 100:
+                self._prune(now)
+            self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _prune(self, now: float) -> None:
+        self._writes_since_prune = 0
+        self._db.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+        (count,) = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)',
+                (excess,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'memory_entries': len(self._memory),
+        }
@@ -0,0 +1,127 @@
+# niche/tools/cassette.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+CASSETTE_MODES = ('record', 'replay')
+# Request fields that carry credentials; they never reach the cassette or its keys.
+SECRET_FIELDS = ('api_key', 'Authorization', 'X-API-KEY')
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class CassetteResponse:
+    """Recorded HTTP response with the parts of requests.Response the tools use."""
+
+    def __init__(self, url: str, status_code: int, body: str, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.status_code = status_code
+        self.text = body
+        self.content = body.encode()
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _redact(v) for k, v in value.items() if k not in SECRET_FIELDS}
+    if isinstance(value, list):
+        return [_redact(v) for v in value]
+    return value
+
+
+def request_body(kwargs: Dict[str, Any]) -> Any:
+    if kwargs.get('json') is not None:
+        return _redact(kwargs['json'])
+    data = kwargs.get('data')
+    if isinstance(data, bytes):
+        data = data.decode()
+    if isinstance(data, str):
+        try:
+            return _redact(json.loads(data))
+        except ValueError:
+            return data
+    return data
+
+
+class Cassette:
+    """
+    Records HTTP interactions to a JSON file and replays them offline.
+
+    Requests are matched on method, URL and canonical body with credentials
+    removed. Repeated identical requests replay their recordings in order.
+    """
+
+    def __init__(self, path: str, mode: str = 'replay'):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {CASSETTE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.interactions: Dict[str, list] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.interactions = json.load(f)
+        elif mode == 'replay':
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @staticmethod
+    def key(method: str, url: str, body: Any) -> str:
+        canonical = json.dumps(body, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f"{method.upper()} {url}\n{canonical}".encode()).hexdigest()
+
+    def play(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        key = self.key(method, url, request_body(kwargs))
+        with self._lock:
+            recordings = self.interactions.get(key)
+            if not recordings:
+                raise CassetteMiss(f"No recorded response for {method.upper()} {url}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            recording = recordings[min(index, len(recordings) - 1)]
+        return CassetteResponse(url, recording['status_code'], recording['body'], recording.get('headers'))
+
+    def record(self, method: str, url: str, response: requests.Response, **kwargs) -> None:
+        body = request_body(kwargs)
+        key = self.key(method, url, body)
+        with self._lock:
+            self.interactions.setdefault(key, []).append({
+                'request': {'method': method.upper(), 'url': url, 'body': body},
+                'status_code': response.status_code,
+                'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+                'body': response.text,
+            })
+
+    def save(self) -> None:
+        if not self.recording:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.interactions, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,196 @@
+# niche/tools/dataforseo_client.py
+
+import base64
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from niche.tools.cache import ResponseCache
+from niche.tools.metrics import enable_debug_logging
+from niche.tools.ratelimit import TokenBucket
+from niche.tools.transport import HttpTransport, get_transport
+
+logger = logging.getLogger(__name__)
+
+# keywords_for_keywords accepts at most 20 keywords per task, one task per live request.
+MAX_KEYWORDS_PER_TASK = 20
+# Google Trends explore compares at most 5 keywords per task.
+MAX_TRENDS_KEYWORDS_PER_TASK = 5
+# Year-over-year growth and seasonality need several years of Google Trends history.
+FEATURES_TRENDS_TIME_RANGE = 'past_5_years'
+
+
+class DataForSEOClient:
+    def __init__(
+        self,
+        debug: bool = False,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[HttpTransport] = None,
+        location_code: Optional[int] = None,
+        language_code: Optional[str] = None,
+    ):
+        self.base_url = 'https://api.dataforseo.com/v3/'
+        # Market of every request; defaults to the USA in English.
+        self.location_code = location_code or int(os.getenv('DATAFORSEO_LOCATION_CODE', '2840'))
+        self.language_code = language_code or os.getenv('DATAFORSEO_LANGUAGE_CODE', 'en')
+        # Credentials are read when the client is built, not at import time.
+        login, password = os.getenv('DATAFORSEO_LOGIN'), os.getenv('DATAFORSEO_PASSWORD')
+        self.credentials = base64.b64encode(f"{login}:{password}".encode()).decode()
+        self.headers = {
+            'Authorization': f'Basic {self.credentials}',
+            'Content-Type': 'application/json'
+        }
+        self.cache = cache if cache is not None else ResponseCache()
+        self.transport = transport or get_transport()
+        self.rate_limiter = rate_limiter or TokenBucket(float(os.getenv('DATAFORSEO_RATE_LIMIT', '5')))
+        self.timeout = timeout if timeout is not None else float(os.getenv('DATAFORSEO_TIMEOUT', '60'))
+        self.max_concurrency = max_concurrency or int(os.getenv('DATAFORSEO_MAX_CONCURRENCY', '4'))
+        # Time range of every trends request, e.g. 'past_12_months'; see trends_time_range_for().
+        self.trends_time_range = os.getenv('DATAFORSEO_TRENDS_TIME_RANGE') or None
+        self.api_call_count = 0
+        self.cache_hit_count = 0
+        self.cache_miss_count = 0
+        self.debug = debug
+        if debug:
+            enable_debug_logging()
+        self._count_lock = threading.Lock()
+
+    def _post(self, endpoint: str, payload) -> Dict:
+        cached = self.cache.get(endpoint, payload)
+        if cached is not None:
+            with self._count_lock:
+                self.cache_hit_count += 1
+            logger.debug("Cache hit for %s", endpoint)
+            return cached
+        with self._count_lock:
+            self.cache_miss_count += 1
+
+        # Live endpoints are read-only lookups, so they are safe to retry.
+        data = self.send('POST', endpoint, payload, idempotent=True)
+        if self.is_successful(data):
+            self.cache.set(endpoint, payload, data)
+        return data
+
+    def send(self, method: str, endpoint: str, payload=None, idempotent: bool = True) -> Dict:
+        """Sends one uncached request through the rate limiter."""
+        self.rate_limiter.acquire()
+        kwargs = {'data': json.dumps(payload)} if payload is not None else {}
+        response = self.transport.request(
+            method, self.base_url + endpoint, headers=self.headers,
+            timeout=self.timeout, idempotent=idempotent, **kwargs
+        )
+        with self._count_lock:
+            self.api_call_count += 1
+        return response.json()
+
+    @staticmethod
+    def is_successful(data: Dict) -> bool:
+        # Only successful responses are cached; DataForSEO reports errors per task as well.
+        if data.get('status_code') != 20000:
+            return False
+        return all(task.get('status_code') == 20000 for task in data.get('tasks') or [])
+
+    def keywords_task(self, keywords: List[str], location_code: Optional[int] = None, language_code: Optional[str] = None) -> Dict:
+        return {
+            "keywords": keywords,
+            "language_code": language_code or self.language_code,
+            "location_code": location_code or self.location_code
+        }
+
+    def trends_time_range_for(self, view: str) -> Optional[str]:
+        """
+        Time range of the trends requests behind a trends view. The raw series
+        keeps the API default unless DATAFORSEO_TRENDS_TIME_RANGE is set; the
+        computed features need several years.
+        """
+        if self.trends_time_range or view == 'series':
+            return self.trends_time_range
+        return FEATURES_TRENDS_TIME_RANGE
+
+    def trends_task(
+        self,
+        keywords: List[str],
+        location_code: Optional[int] = None,
+        language_code: Optional[str] = None,
+        time_range: Optional[str] = None,
+    ) -> Dict:
+        task = {
+            "keywords": keywords,
+            "language_code": language_code or self.language_code,
+            "location_code": location_code or self.location_code
+        }
+        time_range = time_range or self.trends_time_range
+        if time_range:
+            task["time_range"] = time_range
+        return task
+
+    def get_keywords_for_keywords(self, keywords: List[str]) -> Dict[str, Dict]:
+        payload = [self.keywords_task(keywords)]
+        return self._post('keywords_data/google_ads/keywords_for_keywords/live', payload)
+
+    def get_keywords_for_keywords_bulk(self, seeds: List[str], max_workers: Optional[int] = None) -> List[Tuple[List[str], Dict]]:
+        """
+        Packs seeds into as few keywords_for_keywords requests as the API allows
+        and sends them in parallel. Returns (seed chunk, response) pairs.
+        """
+        chunks = [seeds[i:i + MAX_KEYWORDS_PER_TASK] for i in range(0, len(seeds), MAX_KEYWORDS_PER_TASK)]
+        if not chunks:
+            return []
+        max_workers = max_workers or self.max_concurrency
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            responses = list(executor.map(self.get_keywords_for_keywords, chunks))
+        return list(zip(chunks, responses))
+
+    def get_google_trends_data(
+        self, keywords: List[str], max_workers: Optional[int] = None, time_range: Optional[str] = None
+    ) -> Dict[str, Dict]:
+        batches = [
+            keywords[i:i + MAX_TRENDS_KEYWORDS_PER_TASK]
+            for i in range(0, len(keywords), MAX_TRENDS_KEYWORDS_PER_TASK)
+        ]
+        if not batches:
+            return {}
+        max_workers = max_workers or self.max_concurrency
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            batch_results = list(executor.map(lambda batch: self._get_google_trends_batch(batch, time_range), batches))
+
+        # Merge in batch order so the keyword-to-result mapping matches the serial path.
+        results = {}
+        for batch_result in batch_results:
+            results.update(batch_result)
+        return results
+
+    def _get_google_trends_batch(self, batch: List[str], time_range: Optional[str] = None) -> Dict[str, Dict]:
+        results = {}
+        payload = self.trends_task(batch, time_range=time_range)
+        logger.debug("get_google_trends_data payload: %s", payload)
+        try:
+            data = self._post('keywords_data/google_trends/explore/live', payload)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("get_google_trends_data response: %s", json.dumps(data, indent=2))
+            if 'tasks' in data:
+                results = self.trends_by_keyword(data)
+            else:
+                logger.warning("API error: %s", data.get('status_message'))
+        except requests.exceptions.RequestException as e:
+            logger.warning("Request failed: %s", e)
+        return results
+
+    @staticmethod
+    def trends_by_keyword(data: Dict) -> Dict[str, Dict]:
+        """Maps every keyword of a Google Trends response to the result that contains it."""
+        results = {}
+        for task in data.get('tasks', []):
+            if 'result' in task:
+                for result in task.get('result') or []:
+                    for keyword in result.get('keywords', []):
+                        results[keyword] = result
+        return results
@@ -0,0 +1,300 @@
+# niche/tools/dataforseo_queue.py
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from niche.tools.dataforseo_client import (
+    MAX_KEYWORDS_PER_TASK, MAX_TRENDS_KEYWORDS_PER_TASK, DataForSEOClient
+)
+from niche.tools.keyword_store import KeywordRow, KeywordStore, attribute_seeds
+from niche.tools.scoring import calculate_comps_array
+
+logger = logging.getLogger(__name__)
+
+# task_post accepts up to 100 tasks per request.
+MAX_TASKS_PER_POST = 100
+
+KEYWORDS_ENDPOINT = 'keywords_data/google_ads/keywords_for_keywords'
+TRENDS_ENDPOINT = 'keywords_data/google_trends/explore'
+
+# (location_code, language_code)
+Market = Tuple[int, str]
+
+
+def parse_markets(text: str) -> List[Market]:
+    """Parses "2840:en,2826:en" into [(2840, 'en'), (2826, 'en')]."""
+    markets = []
+    for item in text.split(','):
+        item = item.strip()
+        if item:
+            location_code, _, language_code = item.partition(':')
+            markets.append((int(location_code), language_code or 'en'))
+    return markets
+
+
+class QueueJob:
+    __slots__ = ('endpoint', 'task', 'market', 'task_id', 'result', 'error')
+
+    def __init__(self, endpoint: str, task: Dict, market: Market):
+        self.endpoint = endpoint
+        self.task = task
+        self.market = market
+        self.task_id: Optional[str] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+
+class DataForSEOQueue:
+    """
+    Runs keyword expansion and Google Trends jobs through DataForSEO's standard
+    queue (task_post, tasks_ready, task_get) instead of the live endpoints.
+
+    Queued tasks cost less than live ones and can be posted 100 at a time for
+    any number of markets. Finished results are written into the client's
+    response cache under the request the live endpoint would have made and
+    into the keyword store, so later crew runs in the same market reuse them.
+    Posted task IDs are kept in the keyword store until their results are
+    fetched, so tasks a crashed or timed-out run left behind are resumed
+    instead of posted and paid for again.
+    """
+
+    def __init__(
+        self,
+        client: DataForSEOClient,
+        store: Optional[KeywordStore] = None,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        timeout: float = 1800.0,
+        max_workers: Optional[int] = None,
+    ):
+        self.client = client
+        self.store = store
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.max_workers = max_workers or client.max_concurrency
+
+    def keyword_jobs(self, seeds: Sequence[str], markets: Iterable[Market]) -> List[QueueJob]:
+        chunks = [list(seeds[i:i + MAX_KEYWORDS_PER_TASK]) for i in range(0, len(seeds), MAX_KEYWORDS_PER_TASK)]
+        return [
+            QueueJob(KEYWORDS_ENDPOINT, self.client.keywords_task(chunk, *market), market)
+            for market in markets for chunk in chunks
+        ]
+
+    def trends_jobs(
+        self, keywords: Sequence[str], markets: Iterable[Market], time_range: Optional[str] = None
+    ) -> List[QueueJob]:
+        chunks = [
+            list(keywords[i:i + MAX_TRENDS_KEYWORDS_PER_TASK])
+            for i in range(0, len(keywords), MAX_TRENDS_KEYWORDS_PER_TASK)
+        ]
+        return [
+            QueueJob(TRENDS_ENDPOINT, self.client.trends_task(chunk, *market, time_range=time_range), market)
+            for market in markets for chunk in chunks
+        ]
+
+    def run(self, jobs: List[QueueJob]) -> List[QueueJob]:
+        """
+        Posts the jobs that are neither cached nor queued by an earlier run,
+        waits for them and stores their results.
+        """
+        pending = []
+        for job in jobs:
+            cached = self.client.cache.get(*self._live_request(job))
+            if cached is not None:
+                job.result = cached
+            else:
+                pending.append(job)
+        logger.info("%d of %d queue jobs served from the cache", len(jobs) - len(pending), len(jobs))
+        resumed = self.resume(pending)
+        if resumed:
+            logger.info("Resuming %d queue tasks posted by an earlier run", len(resumed))
+            # Tasks of an earlier run have usually finished; the rest wait for tasks_ready.
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                list(executor.map(lambda job: self._fetch(job, finished=False), resumed))
+        self.post([job for job in pending if not job.task_id])
+        self.wait([job for job in pending + resumed if job.task_id and job.result is None])
+        return jobs
+
+    def resume(self, jobs: List[QueueJob]) -> List[QueueJob]:
+        """
+        Attaches the tasks an earlier run posted but never fetched to the
+        matching jobs, so they are not posted and paid for again. Returns the
+        resumed jobs, including new ones for tasks no job asked for.
+        """
+        if self.store is None:
+            return []
+        by_request = {self._request_key(job.endpoint, job.task): job for job in jobs}
+        resumed = []
+        for task_id, endpoint, task in self.store.pending_queue_tasks():
+            job = by_request.pop(self._request_key(endpoint, task), None)
+            if job is None:
+                job = QueueJob(endpoint, task, (task['location_code'], task['language_code']))
+            job.task_id = task_id
+            resumed.append(job)
+        return resumed
+
+    def post(self, jobs: List[QueueJob]) -> None:
+        by_endpoint: Dict[str, List[QueueJob]] = {}
+        for job in jobs:
+            by_endpoint.setdefault(job.endpoint, []).append(job)
+        for endpoint, endpoint_jobs in by_endpoint.items():
+            for start in range(0, len(endpoint_jobs), MAX_TASKS_PER_POST):
+                batch = endpoint_jobs[start:start + MAX_TASKS_PER_POST]
+                # Posting creates paid tasks, so a failed post is not retried blindly.
+                data = self.client.send('POST', f"{endpoint}/task_post", [job.task for job in batch], idempotent=False)
+                # Tasks come back in the order they were posted.
+                for job, task in zip(batch, data.get('tasks') or []):
+                    if task.get('status_code') == 20100:
+                        job.task_id = task.get('id')
+                    else:
+                        job.error = task.get('status_message') or 'task_post failed'
+                for job in batch:
+                    if not job.task_id and not job.error:
+                        job.error = data.get('status_message') or 'task_post failed'
+                if self.store is not None:
+                    # Recorded before waiting, so a crash or timeout does not lose paid tasks.
+                    self.store.add_queue_tasks((job.task_id, job.endpoint, job.task) for job in batch if job.task_id)
+
+    def _ready_ids(self, endpoint: str) -> set:
+        data = self.client.send('GET', f"{endpoint}/tasks_ready")
+        return {
+            result.get('id')
+            for task in data.get('tasks') or []
+            for result in task.get('result') or []
+        }
+
+    def wait(self, jobs: List[QueueJob]) -> None:
+        """Polls tasks_ready with backoff and fetches finished tasks concurrently."""
+        waiting = {job.task_id: job for job in jobs}
+        deadline = time.monotonic() + self.timeout
+        interval = self.poll_interval
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            while waiting:
+                ready_ids = set()
+                for endpoint in {job.endpoint for job in waiting.values()}:
+                    try:
+                        ready_ids |= self._ready_ids(endpoint)
+                    except Exception as e:
+                        # A failed poll is retried in the next round; the tasks are still queued.
+                        logger.warning("Polling %s failed: %s", endpoint, e)
+                ready = [waiting.pop(task_id) for task_id in ready_ids if task_id in waiting]
+                list(executor.map(self._fetch, ready))
+                if not waiting:
+                    break
+                if time.monotonic() + interval > deadline:
+                    for job in waiting.values():
+                        job.error = f"not ready after {self.timeout:.0f}s"
+                    logger.warning(
+                        "%d queue jobs did not finish in time%s", len(waiting),
+                        ", the next run resumes them" if self.store is not None else ""
+                    )
+                    break
+                # Poll quickly while tasks keep finishing, back off while none do.
+                interval = self.poll_interval if ready else min(interval * 2, self.max_poll_interval)
+                logger.debug("%d queue jobs waiting, next poll in %.0fs", len(waiting), interval)
+                time.sleep(interval)
+
+    def _fetch(self, job: QueueJob, finished: bool = True) -> None:
+        """
+        Fetches the result of a task. A finished task is forgotten once
+        task_get answers; a resumed task that fails may just not be ready yet.
+        """
+        try:
+            data = self.client.send('GET', f"{job.endpoint}/task_get/{job.task_id}")
+        except Exception as e:
+            job.error = str(e)
+            return
+        if not self.client.is_successful(data):
+            if finished:
+                job.error = data.get('status_message') or 'task_get failed'
+                self._forget(job)
+            return
+        job.error = None
+        job.result = data
+        self.client.cache.set(*self._live_request(job), data)
+        if self.store is not None:
+            if job.endpoint == TRENDS_ENDPOINT:
+                self.store.upsert_trends(self.client.trends_by_keyword(data), *job.market, job.task.get('time_range'))
+            else:
+                self.store.upsert_keywords(self._keyword_rows(job, data))
+        self._forget(job)
+
+    def _forget(self, job: QueueJob) -> None:
+        if self.store is not None:
+            self.store.remove_queue_tasks([job.task_id])
+
+    @staticmethod
+    def _request_key(endpoint: str, task: Dict) -> str:
+        return f"{endpoint} {json.dumps(task, sort_keys=True)}"
+
+    @staticmethod
+    def _keyword_rows(job: QueueJob, data: Dict) -> List[KeywordRow]:
+        items = [
+            item for task in data.get('tasks') or [] for item in task.get('result') or [] if item.get('keyword')
+        ]
+        scores = calculate_comps_array(
+            [item.get('search_volume') for item in items],
+            [item.get('competition_index') for item in items],
+            [item.get('cpc') for item in items],
+        )
+        location_code, language_code = job.market
+        return [
+            KeywordRow(
+                keyword=item['keyword'],
+                seed=seed,
+                location_code=location_code,
+                language_code=language_code,
+                search_volume=item.get('search_volume'),
+                competition=item.get('competition'),
+                competition_index=item.get('competition_index'),
+                cpc=item.get('cpc'),
+                comps=score,
+            )
+            for item, score in zip(items, scores.tolist())
+            for seed in attribute_seeds(item['keyword'], job.task['keywords'])
+        ]
+
+    @staticmethod
+    def _live_request(job: QueueJob) -> Tuple[str, object]:
+        # The live endpoints take the same task; keywords_for_keywords wraps it in a list.
+        if job.endpoint == KEYWORDS_ENDPOINT:
+            return f"{KEYWORDS_ENDPOINT}/live", [job.task]
+        return f"{TRENDS_ENDPOINT}/live", job.task
+
+
+def run_sweep(
+    seeds: Sequence[str],
+    markets: Sequence[Market],
+    trends: bool = True,
+    client: Optional[DataForSEOClient] = None,
+    store: Optional[KeywordStore] = None,
+    trends_view: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Prefetches keyword expansions (and Google Trends) for the seeds in every
+    market through the queue and returns a summary of the jobs. Trends are
+    fetched over the time range the crew's trends view will ask for.
+    """
+    client = client or DataForSEOClient()
+    queue = DataForSEOQueue(client, store=store if store is not None else KeywordStore())
+    jobs = queue.keyword_jobs(list(seeds), markets)
+    if trends:
+        time_range = client.trends_time_range_for(trends_view or os.getenv('NICHE_TRENDS_VIEW', 'ranking'))
+        jobs += queue.trends_jobs(list(seeds), markets, time_range)
+    started = time.perf_counter()
+    queue.run(jobs)
+    failed = [job for job in jobs if job.error]
+    for job in failed:
+        logger.warning("Queue job %s %s failed: %s", job.endpoint, job.market, job.error)
+    return {
+        'jobs': len(jobs),
+        'completed': sum(job.result is not None for job in jobs),
+        'failed': len(failed),
+        'api_calls': client.api_call_count,
+        'seconds': round(time.perf_counter() - started, 1),
+    }
@@ -0,0 +1,239 @@
+# niche/tools/governor.py
+
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import yaml
+
+from niche.tools.metrics import get_metrics
+from niche.tools.ratelimit import TokenBucket
+
+DEFAULT_BUDGETS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'budgets.yaml')
+
+
+class Budget:
+    """Limits on calls, estimated spend in USD and wall time; None means unlimited."""
+
+    __slots__ = ('max_calls', 'max_spend', 'max_seconds', 'cost_per_call')
+
+    def __init__(
+        self,
+        max_calls: Optional[int] = None,
+        max_spend: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+        cost_per_call: float = 0.0,
+    ):
+        self.max_calls = max_calls
+        self.max_spend = max_spend
+        self.max_seconds = max_seconds
+        self.cost_per_call = cost_per_call
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict[str, Any]]) -> 'Budget':
+        config = config or {}
+        return cls(
+            max_calls=config.get('max_calls'),
+            max_spend=config.get('max_spend'),
+            max_seconds=config.get('max_seconds'),
+            cost_per_call=config.get('cost_per_call', 0.0),
+        )
+
+
+class _Usage:
+    __slots__ = ('calls', 'spend', 'seconds', 'refused')
+
+    def __init__(self):
+        self.calls = 0
+        self.spend = 0.0
+        self.seconds = 0.0
+        self.refused = 0
+
+
+class BudgetGovernor:
+    """
+    Enforces per-run and per-tool budgets for every tool call.
+
+    A call is admitted only if neither the run nor the tool has used up its
+    calls, estimated spend or wall time; admitted calls also pass a global
+    rate limiter. The run's wall time counts from start_run(), a tool's wall
+    time is the time spent inside its calls.
+    """
+
+    def __init__(
+        self,
+        run_budget: Optional[Budget] = None,
+        tool_budgets: Optional[Dict[str, Budget]] = None,
+        rate_limit: Optional[float] = None,
+    ):
+        self.run_budget = run_budget or Budget()
+        self.tool_budgets = dict(tool_budgets or {})
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self._run = _Usage()
+        self._tools: Dict[str, _Usage] = {}
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, path: Optional[str] = None) -> 'BudgetGovernor':
+        """Loads budgets from YAML (default: config/budgets.yaml, or NICHE_BUDGETS)."""
+        path = path or os.getenv('NICHE_BUDGETS', DEFAULT_BUDGETS_PATH)
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+        return cls(
+            run_budget=Budget.from_dict(config.get('run')),
+            tool_budgets={name: Budget.from_dict(c) for name, c in (config.get('tools') or {}).items()},
+            rate_limit=config.get('rate_limit'),
+        )
+
+    def start_run(self) -> None:
+        with self._lock:
+            self._run = _Usage()
+            self._tools = {}
+            self._started_at = time.monotonic()
+
+    def _tool_budget(self, tool: str) -> Budget:
+        return self.tool_budgets.get(tool) or Budget()
+
+    def _exhausted(self, budget: Budget, usage: _Usage, seconds: float, cost: float) -> Optional[str]:
+        if budget.max_calls is not None and usage.calls >= budget.max_calls:
+            return f"all {budget.max_calls} calls used"
+        if budget.max_spend is not None and usage.spend + cost > budget.max_spend:
+            return f"spend limit of ${budget.max_spend:.2f} reached"
+        if budget.max_seconds is not None and seconds >= budget.max_seconds:
+            return f"time limit of {budget.max_seconds:.0f}s reached"
+        return None
+
+    def acquire(self, tool: str) -> Optional[str]:
+        """Admits a call of `tool`, or returns the reason it is refused."""
+        budget = self._tool_budget(tool)
+        with self._lock:
+            usage = self._tools.setdefault(tool, _Usage())
+            run_seconds = time.monotonic() - self._started_at
+            reason = self._exhausted(budget, usage, usage.seconds, budget.cost_per_call)
+            scope = tool
+            if reason is None:
+                reason = self._exhausted(self.run_budget, self._run, run_seconds, budget.cost_per_call)
+                scope = 'run'
+            if reason is not None:
+                usage.refused += 1
+                self._run.refused += 1
+                return f"{scope} budget exhausted: {reason}"
+            usage.calls += 1
+            usage.spend += budget.cost_per_call
+            self._run.calls += 1
+            self._run.spend += budget.cost_per_call
+            remaining_seconds = (self.run_budget.max_seconds - run_seconds
+                                 if self.run_budget.max_seconds is not None else None)
+
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=remaining_seconds):
+            return "run budget exhausted: time limit reached while waiting for the rate limiter"
+        return None
+
+    def charge(self, tool: str, cost: Optional[float] = None) -> Optional[str]:
+        """
+        Adds the spend of an extra request made within an admitted call of
+        `tool` (a hedge), or returns the reason it is refused. `cost` defaults
+        to the tool's cost_per_call. The call count is not changed.
+        """
+        budget = self._tool_budget(tool)
+        cost = budget.cost_per_call if cost is None else cost
+        with self._lock:
+            usage = self._tools.setdefault(tool, _Usage())
+            for scope, limit, used in ((tool, budget.max_spend, usage.spend),
+                                       ('run', self.run_budget.max_spend, self._run.spend)):
+                if limit is not None and used + cost > limit:
+                    return f"{scope} budget exhausted: spend limit of ${limit:.2f} reached"
+            usage.spend += cost
+            self._run.spend += cost
+        return None
+
+    def refund(self, tool: str) -> None:
+        """Takes back an admitted call of `tool` that was served without an upstream request."""
+        cost = self._tool_budget(tool).cost_per_call
+        with self._lock:
+            usage = self._tools.setdefault(tool, _Usage())
+            for scope in (usage, self._run):
+                scope.calls = max(0, scope.calls - 1)
+                scope.spend = max(0.0, scope.spend - cost)
+
+    def release(self, tool: str, seconds: float) -> None:
+        with self._lock:
+            self._tools.setdefault(tool, _Usage()).seconds += seconds
+
+    @staticmethod
+    def _remaining(budget: Budget, usage: _Usage, seconds: float) -> Dict[str, Optional[float]]:
+        return {
+            'calls': None if budget.max_calls is None else max(0, budget.max_calls - usage.calls),
+            'spend': None if budget.max_spend is None else round(max(0.0, budget.max_spend - usage.spend), 4),
+            'seconds': None if budget.max_seconds is None else round(max(0.0, budget.max_seconds - seconds), 1),
+        }
+
+    def remaining(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Remaining budget of the run and of every tool with a budget or calls."""
+        with self._lock:
+            result = {'run': self._remaining(self.run_budget, self._run, time.monotonic() - self._started_at)}
+            for tool in set(self.tool_budgets) | set(self._tools):
+                usage = self._tools.get(tool) or _Usage()
+                result[tool] = self._remaining(self._tool_budget(tool), usage, usage.seconds)
+            return result
+
+    def remaining_text(self, tool: str) -> str:
+        remaining = self.remaining()
+
+        def describe(values: Dict[str, Optional[float]]) -> str:
+            parts = []
+            if values['calls'] is not None:
+                parts.append(f"{values['calls']} calls")
+            if values['spend'] is not None:
+                parts.append(f"${values['spend']:.2f}")
+            if values['seconds'] is not None:
+                parts.append(f"{values['seconds']:.0f}s")
+            return ', '.join(parts) or 'unlimited'
+
+        return f"# Budget left: {tool} {describe(remaining[tool])}; run {describe(remaining['run'])}"
+
+    def usage(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            usage = {
+                scope: {'calls': u.calls, 'spend': round(u.spend, 4), 'seconds': round(u.seconds, 3), 'refused': u.refused}
+                for scope, u in {'run': self._run, **self._tools}.items()
+            }
+            usage['run']['seconds'] = round(time.monotonic() - self._started_at, 3)
+            return usage
+
+
+def governed_tool_call(run: Callable[..., str]) -> Callable[..., str]:
+    """
+    Wraps a tool's _run so every call goes through the tool's governor, if it has one.
+
+    Refused calls return a short message instead of calling the API; admitted
+    calls get the remaining budget appended to their output. Tools with a
+    response cache define _api_call_count(), the number of upstream requests
+    they have sent; a call that sent none is refunded, so answers from the
+    cache or the keyword store do not use up the budget.
+    """
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        governor: Optional[BudgetGovernor] = getattr(self, '_governor', None)
+        if governor is None:
+            return run(self, *args, **kwargs)
+        refusal = governor.acquire(self.name)
+        if refusal is not None:
+            get_metrics().observe_budget(governor.remaining(), governor.usage())
+            return (f"Budget exhausted: {self.name} was not called ({refusal}). "
+                    f"Continue with the data you already have.")
+        api_call_count = getattr(self, '_api_call_count', None)
+        calls_before = api_call_count() if api_call_count else None
+        start = time.perf_counter()
+        try:
+            output = run(self, *args, **kwargs)
+            if calls_before is not None and api_call_count() == calls_before:
+                governor.refund(self.name)
+        finally:
+            governor.release(self.name, time.perf_counter() - start)
+            get_metrics().observe_budget(governor.remaining(), governor.usage())
+        return f"{output}\n{governor.remaining_text(self.name)}"
+    return wrapper
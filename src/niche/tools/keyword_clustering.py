@@ -0,0 +1,244 @@
+# niche/tools/keyword_clustering.py
+
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from niche.tools.scoring import CompSWeights, DEFAULT_WEIGHTS, calculate_comps_array
+
+# MinHash signature length and LSH banding: 16 bands of 4 rows find pairs with a
+# Jaccard similarity of about 0.5 and above with high probability.
+NUM_PERM = 64
+BANDS = 16
+# Shingle similarity a typo candidate needs before its words are compared.
+DEFAULT_THRESHOLD = 0.5
+_PRIME = (1 << 31) - 1
+# Representatives compared per keyword; keeps huge LSH buckets from going quadratic.
+MAX_CANDIDATES = 20
+# Variants listed next to each representative.
+MAX_LISTED_VARIANTS = 3
+
+# Words dropped before comparing, so "desk for gaming" matches "gaming desk".
+STOPWORDS = frozenset({'a', 'an', 'and', 'at', 'by', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'})
+# Words ending in "s" that are not plurals.
+_NOT_PLURAL = frozenset({
+    'always', 'bus', 'does', 'gas', 'has', 'his', 'its', 'lens', 'news', 'series', 'species', 'this', 'was',
+    'windows', 'yes',
+})
+# Shortest word a typo is accepted in; "mat" and "map" are different words.
+MIN_TYPO_WORD = 5
+
+
+def _singular(token: str) -> str:
+    if token in _NOT_PLURAL or token.endswith(('ss', 'us', 'is', 'ews')):
+        return token
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 4 and token.endswith(('ches', 'shes', 'sses', 'xes')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s'):
+        return token[:-1]
+    return token
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    Lowercases, drops punctuation and stopwords, singularizes and sorts the
+    words, so plural, word-order and "for"/"the" variants get the same form.
+    """
+    tokens = re.findall(r'\w+', (keyword or '').lower())
+    tokens = [token for token in tokens if token not in STOPWORDS] or tokens
+    return ' '.join(sorted(_singular(token) for token in tokens))
+
+
+def shingles(normalized: str, n: int = 3) -> Set[str]:
+    """Word tokens plus character n-grams of a normalized keyword."""
+    padded = f" {normalized} "
+    grams = {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+    return grams | {f"w:{token}" for token in normalized.split()}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (edits and adjacent swaps), capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def is_near_variant(a: str, b: str) -> bool:
+    """
+    True if two normalized keywords have the same words except for one typo:
+    same word count, one differing word on each side, and that word at least
+    MIN_TYPO_WORD letters long and one edit (two from 9 letters) apart.
+    Keywords with an extra word ("gaming mouse pad") are a different intent.
+    """
+    if a == b:
+        return True
+    a_tokens, b_tokens = Counter(a.split()), Counter(b.split())
+    if sum(a_tokens.values()) != sum(b_tokens.values()):
+        return False
+    only_a, only_b = list((a_tokens - b_tokens).elements()), list((b_tokens - a_tokens).elements())
+    if len(only_a) != 1 or len(only_b) != 1:
+        return False
+    word_a, word_b = only_a[0], only_b[0]
+    if min(len(word_a), len(word_b)) < MIN_TYPO_WORD:
+        return False
+    limit = 2 if min(len(word_a), len(word_b)) >= 9 else 1
+    return _edit_distance(word_a, word_b, limit) <= limit
+
+
+def minhash_signatures(shingle_sets: Sequence[Set[str]], num_perm: int = NUM_PERM, block: int = 4096) -> np.ndarray:
+    """MinHash signatures (len(shingle_sets) x num_perm), computed in vectorized blocks of keywords."""
+    rng = np.random.default_rng(1)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)[:, None]
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)[:, None]
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.int64)
+    for start in range(0, len(shingle_sets), block):
+        chunk = shingle_sets[start:start + block]
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) % _PRIME for shingle_set in chunk for s in shingle_set), dtype=np.int64
+        )
+        offsets = np.cumsum([0] + [len(shingle_set) for shingle_set in chunk[:-1]])
+        permuted = (a * hashes[None, :] + b) % _PRIME
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def cluster_keywords(keywords: Sequence[str], threshold: float = DEFAULT_THRESHOLD) -> List[int]:
+    """
+    Groups near-variant keywords and returns a cluster id per keyword.
+
+    Keywords with the same normalized form (plurals, word order, stopwords)
+    share a cluster. Every other form is compared with the representatives of
+    the clusters found so far, in input order, so put the most important
+    keywords first: MinHash/LSH on word and character 3-gram shingles finds
+    candidate representatives, and a form joins the first one whose Jaccard
+    similarity reaches the threshold and that is a near-variant of it (see
+    is_near_variant). Forms are never merged through a chain of neighbours,
+    so "gaming mouse" and "gaming mouse pad" stay apart.
+    """
+    forms: Dict[str, int] = {}
+    form_ids = [forms.setdefault(normalize_keyword(keyword), len(forms)) for keyword in keywords]
+    form_list = list(forms)
+    cluster_of = list(range(len(form_list)))
+
+    if len(form_list) > 1:
+        shingle_sets = [shingles(form) for form in form_list]
+        signatures = minhash_signatures(shingle_sets)
+        rows = signatures.shape[1] // BANDS
+        band_keys = [
+            [signatures[form, band * rows:(band + 1) * rows].tobytes() for band in range(BANDS)]
+            for form in range(len(form_list))
+        ]
+        # Representatives per LSH bucket, per band.
+        buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+        for form, keys in enumerate(band_keys):
+            candidates: Dict[int, None] = {}
+            for band, key in enumerate(keys):
+                for representative in buckets[band].get(key, ()):
+                    candidates.setdefault(representative)
+                    if len(candidates) >= MAX_CANDIDATES:
+                        break
+            for representative in candidates:
+                if (jaccard(shingle_sets[form], shingle_sets[representative]) >= threshold
+                        and is_near_variant(form_list[form], form_list[representative])):
+                    cluster_of[form] = representative
+                    break
+            else:
+                for band, key in enumerate(keys):
+                    buckets[band].setdefault(key, []).append(form)
+
+    return [cluster_of[form_id] for form_id in form_ids]
+
+
+def _weighted_mean(values: np.ndarray, weights: np.ndarray) -> Optional[float]:
+    present = ~np.isnan(values)
+    if not present.any():
+        return None
+    w = np.where(present, weights, 0.0)
+    if w.sum() <= 0:
+        return float(np.nanmean(values))
+    return float(np.sum(np.where(present, values, 0.0) * w) / w.sum())
+
+
+def _to_array(rows: List[Dict], field: str) -> np.ndarray:
+    return np.fromiter((np.nan if row.get(field) is None else row[field] for row in rows), dtype=float, count=len(rows))
+
+
+def cluster_keyword_rows(
+    rows: List[Dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    weights: CompSWeights = DEFAULT_WEIGHTS,
+) -> List[Dict]:
+    """
+    Collapses expanded keyword rows into one row per cluster of near-variants
+    (see cluster_keywords).
+
+    The representative is the member with the highest search volume. Its row
+    carries the cluster's search volume, volume-weighted competition index and
+    CPC, a CompS recomputed from those, the union of the members' seeds and the
+    other members as `variants`.
+
+    Google Ads reports plurals and reordered keywords with the volume of the
+    form they share, so each normalized form counts once, with its highest
+    volume; only the volumes of different forms (typo variants) are summed.
+    """
+    if not rows:
+        return []
+    # Highest-volume keywords first, so they become the representatives others are compared with.
+    ordered = sorted(rows, key=lambda r: (-(r.get('search_volume') or 0), -(r.get('compS') or 0), len(r['keyword'])))
+    cluster_ids = cluster_keywords([row['keyword'] for row in ordered], threshold)
+    members: Dict[int, List[Dict]] = {}
+    for cluster_id, row in zip(cluster_ids, ordered):
+        members.setdefault(cluster_id, []).append(row)
+
+    clustered = []
+    for group in members.values():
+        volumes = _to_array(group, 'search_volume')
+        volume_weights = np.nan_to_num(volumes)
+        form_volumes: Dict[str, float] = {}
+        for row, volume in zip(group, volume_weights.tolist()):
+            form = normalize_keyword(row['keyword'])
+            form_volumes[form] = max(form_volumes.get(form, 0.0), volume)
+        seeds = []
+        for row in group:
+            seeds.extend(seed for seed in row.get('seeds') or [] if seed not in seeds)
+        variants = [row['keyword'] for row in group[1:]]
+        competition_index = _weighted_mean(_to_array(group, 'competition_index'), volume_weights)
+        cpc = _weighted_mean(_to_array(group, 'cpc'), volume_weights)
+        clustered.append({
+            **group[0],
+            'search_volume': int(sum(form_volumes.values())) if not np.isnan(volumes).all() else None,
+            'competition_index': None if competition_index is None else round(competition_index, 1),
+            'cpc': None if cpc is None else round(cpc, 2),
+            'seeds': seeds,
+            'cluster_size': len(group),
+            'variants': variants[:MAX_LISTED_VARIANTS] + ([f"+{len(variants) - MAX_LISTED_VARIANTS} more"]
+                                                          if len(variants) > MAX_LISTED_VARIANTS else []),
+        })
+
+    scores = calculate_comps_array(
+        [row['search_volume'] for row in clustered],
+        [row['competition_index'] for row in clustered],
+        [row['cpc'] for row in clustered],
+        weights,
+    )
+    for row, score in zip(clustered, scores.tolist()):
+        row['compS'] = score
+    return clustered
@@ -0,0 +1,325 @@
+# niche/tools/keyword_store.py
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_STORE_PATH = os.path.join('.niche_cache', 'keywords.sqlite3')
+DEFAULT_KEYWORD_MAX_AGE = 7 * 24 * 3600
+DEFAULT_TRENDS_MAX_AGE = 24 * 3600
+# DataForSEO keeps the results of queued tasks for 30 days.
+QUEUE_TASK_MAX_AGE = 30 * 24 * 3600
+
+KEYWORD_COLUMNS = (
+    'keyword', 'seed', 'topic', 'location_code', 'language_code',
+    'search_volume', 'competition', 'competition_index', 'cpc', 'comps', 'fetched_at',
+)
+
+
+def attribute_seeds(keyword: str, seeds: List[str]) -> List[str]:
+    # A packed request does not say which seed produced a result, so attribute it
+    # to the seeds sharing a word with it, or to all seeds of the request if none does.
+    tokens = set(re.findall(r'\w+', keyword.lower()))
+    matching = [seed for seed in seeds if tokens & set(re.findall(r'\w+', seed.lower()))]
+    return matching or list(seeds)
+
+
+class KeywordRow:
+    """One expanded keyword, as reached from one seed in one market."""
+    __slots__ = KEYWORD_COLUMNS
+
+    def __init__(
+        self,
+        keyword: str,
+        seed: str,
+        topic: str = '',
+        location_code: int = 2840,
+        language_code: str = 'en',
+        search_volume: Optional[int] = None,
+        competition: Optional[str] = None,
+        competition_index: Optional[float] = None,
+        cpc: Optional[float] = None,
+        comps: Optional[float] = None,
+        fetched_at: Optional[float] = None,
+    ):
+        self.keyword = keyword
+        self.seed = seed
+        self.topic = topic
+        self.location_code = location_code
+        self.language_code = language_code
+        self.search_volume = search_volume
+        self.competition = competition
+        self.competition_index = competition_index
+        self.cpc = cpc
+        self.comps = comps
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, column) for column in KEYWORD_COLUMNS)
+
+    def to_dict(self) -> Dict:
+        return {
+            'keyword': self.keyword,
+            'competition': self.competition,
+            'competition_index': self.competition_index,
+            'search_volume': self.search_volume,
+            'cpc': self.cpc,
+            'compS': self.comps,
+            'seeds': [self.seed],
+        }
+
+    def __repr__(self):
+        return f"KeywordRow({self.keyword!r}, seed={self.seed!r}, comps={self.comps!r})"
+
+
+class KeywordStore:
+    """
+    Embedded SQLite store for expanded keywords and Google Trends results.
+
+    Rows are indexed by keyword, seed, topic, location and fetch time so tools
+    can reuse fresh data across runs instead of calling the API again. Every
+    fetched seed is also recorded on its own, so a seed that returned no rows
+    is not fetched again either. Tasks posted to the DataForSEO queue are kept
+    until their results are fetched, so an interrupted sweep can resume them.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.getenv('NICHE_KEYWORD_DB', DEFAULT_STORE_PATH)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        trends_columns = {row[1] for row in self._db.execute('PRAGMA table_info(trends)')}
+        if trends_columns and 'time_range' not in trends_columns:
+            # Stores from before trends were keyed by time range; the rows expire within a day anyway.
+            self._db.execute('DROP TABLE trends')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT NOT NULL COLLATE NOCASE,
+                seed TEXT NOT NULL COLLATE NOCASE,
+                topic TEXT NOT NULL DEFAULT '',
+                location_code INTEGER NOT NULL,
+                language_code TEXT NOT NULL,
+                search_volume INTEGER,
+                competition TEXT,
+                competition_index REAL,
+                cpc REAL,
+                comps REAL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (keyword, seed, location_code, language_code)
+            );
+            CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword);
+            CREATE INDEX IF NOT EXISTS keywords_seed ON keywords (seed, location_code, language_code, fetched_at);
+            CREATE INDEX IF NOT EXISTS keywords_topic ON keywords (topic, comps);
+            CREATE INDEX IF NOT EXISTS keywords_location ON keywords (location_code, language_code);
+            CREATE INDEX IF NOT EXISTS keywords_fetched_at ON keywords (fetched_at);
+            CREATE INDEX IF NOT EXISTS keywords_comps ON keywords (comps);
+
+            CREATE TABLE IF NOT EXISTS seed_fetches (
+                seed TEXT NOT NULL COLLATE NOCASE,
+                location_code INTEGER NOT NULL,
+                language_code TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (seed, location_code, language_code)
+            );
+
+            CREATE TABLE IF NOT EXISTS trends (
+                keyword TEXT NOT NULL COLLATE NOCASE,
+                location_code INTEGER NOT NULL,
+                language_code TEXT NOT NULL,
+                time_range TEXT NOT NULL DEFAULT '',
+                result TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (keyword, location_code, language_code, time_range)
+            );
+            CREATE INDEX IF NOT EXISTS trends_fetched_at ON trends (fetched_at);
+
+            CREATE TABLE IF NOT EXISTS queue_tasks (
+                task_id TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                task TEXT NOT NULL,
+                posted_at REAL NOT NULL
+            );
+        ''')
+        self._db.commit()
+
+    def upsert_keywords(self, rows: Iterable[KeywordRow]) -> int:
+        columns = ', '.join(KEYWORD_COLUMNS)
+        placeholders = ', '.join('?' for _ in KEYWORD_COLUMNS)
+        updates = ', '.join(
+            f'{column} = excluded.{column}'
+            for column in KEYWORD_COLUMNS
+            if column not in ('keyword', 'seed', 'location_code', 'language_code')
+        )
+        values = [row.as_tuple() for row in rows]
+        with self._lock:
+            self._db.executemany(
+                f'INSERT INTO keywords ({columns}) VALUES ({placeholders}) '
+                f'ON CONFLICT (keyword, seed, location_code, language_code) DO UPDATE SET {updates}',
+                values
+            )
+            self._db.commit()
+        return len(values)
+
+    def _select(self, sql: str, params: Iterable) -> List[KeywordRow]:
+        with self._lock:
+            rows = self._db.execute(sql, tuple(params)).fetchall()
+        return [KeywordRow(*row) for row in rows]
+
+    def fresh_keywords_for_seeds(
+        self,
+        seeds: List[str],
+        location_code: int = 2840,
+        language_code: str = 'en',
+        max_age: float = DEFAULT_KEYWORD_MAX_AGE,
+    ) -> List[KeywordRow]:
+        """Rows already expanded from any of the seeds within max_age seconds."""
+        if not seeds:
+            return []
+        placeholders = ', '.join('?' for _ in seeds)
+        return self._select(
+            f'SELECT {", ".join(KEYWORD_COLUMNS)} FROM keywords '
+            f'WHERE seed IN ({placeholders}) AND location_code = ? AND language_code = ? AND fetched_at >= ?',
+            [*seeds, location_code, language_code, time.time() - max_age]
+        )
+
+    def mark_seeds_fetched(self, seeds: Iterable[str], location_code: int = 2840, language_code: str = 'en') -> None:
+        """Records that the seeds were expanded now, whether or not they returned rows."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO seed_fetches (seed, location_code, language_code, fetched_at) '
+                'VALUES (?, ?, ?, ?)',
+                [(seed, location_code, language_code, now) for seed in seeds]
+            )
+            self._db.commit()
+
+    def fresh_seeds(
+        self,
+        seeds: List[str],
+        location_code: int = 2840,
+        language_code: str = 'en',
+        max_age: float = DEFAULT_KEYWORD_MAX_AGE,
+    ) -> Set[str]:
+        """Lowercased seeds expanded within max_age seconds, including those that returned no rows."""
+        if not seeds:
+            return set()
+        placeholders = ', '.join('?' for _ in seeds)
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT seed FROM seed_fetches WHERE seed IN ({placeholders}) '
+                f'AND location_code = ? AND language_code = ? AND fetched_at >= ?',
+                (*seeds, location_code, language_code, time.time() - max_age)
+            ).fetchall()
+        return {seed.lower() for (seed,) in rows}
+
+    def top_by_comps(
+        self,
+        n: int,
+        topic: Optional[str] = None,
+        seeds: Optional[List[str]] = None,
+        location_code: Optional[int] = None,
+        language_code: Optional[str] = None,
+        max_age: Optional[float] = None,
+    ) -> List[KeywordRow]:
+        """Top n distinct keywords by CompS, keeping the best-scoring row of each."""
+        clauses, params = [], []
+        if topic is not None:
+            clauses.append('topic = ?')
+            params.append(topic)
+        if seeds:
+            clauses.append(f'seed IN ({", ".join("?" for _ in seeds)})')
+            params.extend(seeds)
+        if location_code is not None:
+            clauses.append('location_code = ?')
+            params.append(location_code)
+        if language_code is not None:
+            clauses.append('language_code = ?')
+            params.append(language_code)
+        if max_age is not None:
+            clauses.append('fetched_at >= ?')
+            params.append(time.time() - max_age)
+        where = f'WHERE {" AND ".join(clauses)} ' if clauses else ''
+        columns = ', '.join('MAX(comps)' if column == 'comps' else column for column in KEYWORD_COLUMNS)
+        # SQLite returns the bare columns of the row holding MAX(comps) in each group.
+        return self._select(
+            f'SELECT {columns} FROM keywords {where}'
+            f'GROUP BY keyword, location_code, language_code ORDER BY MAX(comps) DESC LIMIT ?',
+            [*params, n]
+        )
+
+    def upsert_trends(
+        self,
+        results: Dict[str, Dict],
+        location_code: int = 2840,
+        language_code: str = 'en',
+        time_range: Optional[str] = None,
+    ) -> int:
+        """Stores trends results under the time range they were requested for; None is the API default."""
+        now = time.time()
+        values = [
+            (keyword, location_code, language_code, time_range or '', json.dumps(result), now)
+            for keyword, result in results.items()
+        ]
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO trends (keyword, location_code, language_code, time_range, result, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                values
+            )
+            self._db.commit()
+        return len(values)
+
+    def fresh_trends(
+        self,
+        keywords: List[str],
+        location_code: int = 2840,
+        language_code: str = 'en',
+        max_age: float = DEFAULT_TRENDS_MAX_AGE,
+        time_range: Optional[str] = None,
+    ) -> Dict[str, Dict]:
+        if not keywords:
+            return {}
+        placeholders = ', '.join('?' for _ in keywords)
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT keyword, result FROM trends WHERE keyword IN ({placeholders}) '
+                f'AND location_code = ? AND language_code = ? AND time_range = ? AND fetched_at >= ?',
+                (*keywords, location_code, language_code, time_range or '', time.time() - max_age)
+            ).fetchall()
+        return {keyword: json.loads(result) for keyword, result in rows}
+
+    def add_queue_tasks(self, tasks: Iterable[Tuple[str, str, Dict]]) -> None:
+        """Records posted (task_id, endpoint, task) queue tasks until their results are fetched."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO queue_tasks (task_id, endpoint, task, posted_at) VALUES (?, ?, ?, ?)',
+                [(task_id, endpoint, json.dumps(task), now) for task_id, endpoint, task in tasks]
+            )
+            self._db.commit()
+
+    def pending_queue_tasks(self, max_age: float = QUEUE_TASK_MAX_AGE) -> List[Tuple[str, str, Dict]]:
+        """Posted queue tasks whose results have not been fetched yet, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT task_id, endpoint, task FROM queue_tasks WHERE posted_at >= ? ORDER BY posted_at',
+                (time.time() - max_age,)
+            ).fetchall()
+        return [(task_id, endpoint, json.loads(task)) for task_id, endpoint, task in rows]
+
+    def remove_queue_tasks(self, task_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._db.executemany('DELETE FROM queue_tasks WHERE task_id = ?', [(task_id,) for task_id in task_ids])
+            self._db.commit()
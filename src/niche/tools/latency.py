@@ -0,0 +1,238 @@
+# niche/tools/latency.py
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+import requests
+import yaml
+
+from niche.tools.governor import BudgetGovernor
+from niche.tools.metrics import get_metrics
+from niche.tools.transport import RETRY_STATUSES, HostStats, get_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'latency.yaml')
+# Completed requests needed before timeouts and hedge delays follow the observed latency.
+MIN_SAMPLES = 20
+# Floor of the hedge delay, so a burst of fast responses does not hedge every request.
+MIN_HEDGE_DELAY = 0.25
+# Failures of the first request that start the hedge early, besides the statuses the transport retries.
+HEDGED_ERRORS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+
+
+def _is_transient(error: Optional[BaseException]) -> bool:
+    """True for failures a second request may not hit: timeouts, connection errors, 429 and 5xx."""
+    if isinstance(error, requests.exceptions.HTTPError):
+        return getattr(error.response, 'status_code', None) in RETRY_STATUSES
+    return isinstance(error, HEDGED_ERRORS)
+
+
+class LatencySLO:
+    """
+    Latency objective of one tool's upstream requests.
+
+    target_seconds is the p95 the tool should meet; until enough requests have
+    been seen it is also the hedge delay. max_seconds bounds every timeout and
+    the whole call, hedge included. hedge_cost is the estimated spend of one
+    hedged request, charged to the budget governor; None charges the tool's
+    cost_per_call.
+    """
+
+    __slots__ = ('target_seconds', 'max_seconds', 'min_timeout', 'timeout_factor', 'hedge', 'fallback', 'hedge_cost')
+
+    def __init__(
+        self,
+        target_seconds: float = 10.0,
+        max_seconds: float = 60.0,
+        min_timeout: float = 2.0,
+        timeout_factor: float = 3.0,
+        hedge: bool = True,
+        fallback: bool = False,
+        hedge_cost: Optional[float] = None,
+    ):
+        self.target_seconds = target_seconds
+        self.max_seconds = max_seconds
+        self.min_timeout = min_timeout
+        self.timeout_factor = timeout_factor
+        self.hedge = hedge
+        # Hedge with the tool's cheaper fallback request instead of a duplicate.
+        self.fallback = fallback
+        self.hedge_cost = hedge_cost
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict[str, Any]]) -> 'LatencySLO':
+        config = config or {}
+        return cls(
+            target_seconds=float(config.get('target_seconds', 10.0)),
+            max_seconds=float(config.get('max_seconds', 60.0)),
+            min_timeout=float(config.get('min_timeout', 2.0)),
+            timeout_factor=float(config.get('timeout_factor', 3.0)),
+            hedge=bool(config.get('hedge', True)),
+            fallback=bool(config.get('fallback', False)),
+            hedge_cost=config.get('hedge_cost'),
+        )
+
+
+class LatencyController:
+    """
+    Keeps slow upstream responses from stalling the tools that wait for them.
+
+    Every request gets a timeout of timeout_factor times the observed p95 of
+    its operation, within [min_timeout, max_seconds]. An idempotent request
+    still running after the observed p95 gets a hedged second request, and the
+    first response wins; with `fallback` the hedge is the tool's cheaper
+    variant (Tavily's basic search depth for an advanced search). A request
+    that times out, cannot connect or gets a status the transport would retry
+    (429, 5xx) before the hedge delay starts the hedge at once.
+
+    Hedged requests are sent without transport retries, so each timed request
+    is one attempt and the hedge takes the place of the retry. Every hedge is
+    charged to the tool's budget governor and is skipped once the budget
+    cannot pay for it.
+    """
+
+    def __init__(self, slos: Optional[Dict[str, LatencySLO]] = None, default: Optional[LatencySLO] = None,
+                 enabled: bool = True, max_workers: int = 32):
+        self.slos = dict(slos or {})
+        self.default = default or LatencySLO()
+        # With hedging off requests still get adaptive timeouts.
+        self.enabled = enabled
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='niche-hedge')
+
+    @classmethod
+    def from_config(cls, path: Optional[str] = None) -> 'LatencyController':
+        """Loads the SLOs from YAML (default: config/latency.yaml, or NICHE_LATENCY_SLOS)."""
+        path = path or os.getenv('NICHE_LATENCY_SLOS', DEFAULT_LATENCY_PATH)
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+        return cls(
+            slos={tool: LatencySLO.from_dict(c) for tool, c in (config.get('tools') or {}).items()},
+            default=LatencySLO.from_dict(config.get('default')),
+            enabled=os.getenv('NICHE_HEDGING', 'on') != 'off',
+        )
+
+    def slo(self, tool: str) -> LatencySLO:
+        return self.slos.get(tool, self.default)
+
+    def _operation_stats(self, tool: str, operation: str) -> HostStats:
+        key = f"{tool}/{operation}"
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = HostStats()
+            return self._stats[key]
+
+    def _p95(self, tool: str, operation: str) -> Optional[float]:
+        stats = self._operation_stats(tool, operation)
+        return stats.percentile(95) if stats.requests >= MIN_SAMPLES else None
+
+    def timeout(self, tool: str, operation: str) -> float:
+        slo = self.slo(tool)
+        p95 = self._p95(tool, operation)
+        if p95 is None:
+            return slo.max_seconds
+        return min(slo.max_seconds, max(slo.min_timeout, p95 * slo.timeout_factor))
+
+    def hedge_delay(self, tool: str, operation: str) -> float:
+        p95 = self._p95(tool, operation)
+        return self.slo(tool).target_seconds if p95 is None else max(MIN_HEDGE_DELAY, p95)
+
+    def _timed(self, tool: str, operation: str, request: Callable[..., Any], **options) -> Callable[[], Any]:
+        timeout = self.timeout(tool, operation)
+
+        def run():
+            start = time.perf_counter()
+            try:
+                result = request(timeout, **options)
+            except requests.exceptions.Timeout:
+                # A timeout is the slowest kind of answer; it pushes the p95 up.
+                self._operation_stats(tool, operation).record(time.perf_counter() - start, error=True)
+                raise
+            self._operation_stats(tool, operation).record(time.perf_counter() - start)
+            return result
+
+        return run
+
+    def call(
+        self,
+        tool: str,
+        operation: str,
+        request: Callable[..., Any],
+        hedge: Optional[Callable[..., Any]] = None,
+        hedge_operation: Optional[str] = None,
+        duplicate: bool = True,
+        governor: Optional[BudgetGovernor] = None,
+    ) -> Any:
+        """
+        Runs request(timeout, max_retries=None) within the tool's SLO and
+        returns the first successful result. `hedge` is the tool's fallback
+        request, used when the SLO enables `fallback`; otherwise the hedge
+        duplicates `request`, unless `duplicate` is False (for large batches
+        too expensive to send twice). Only idempotent requests may be hedged.
+        """
+        slo = self.slo(tool)
+        if hedge is None or not slo.fallback:
+            hedge, hedge_operation = (request, operation) if duplicate else (None, None)
+        # Recorded and replayed runs must send exactly the requests of the run.
+        if hedge is None or not self.enabled or not slo.hedge or get_transport().cassette is not None:
+            return self._timed(tool, operation, request)()
+
+        deadline = time.monotonic() + slo.max_seconds
+        primary = self._executor.submit(self._timed(tool, operation, request, max_retries=0))
+        done, pending = wait([primary], timeout=self.hedge_delay(tool, operation))
+        if done and not _is_transient(primary.exception()):
+            # Answered in time, or failed in a way another request would not fix.
+            return primary.result()
+
+        refusal = governor.charge(tool, slo.hedge_cost) if governor is not None else None
+        if refusal is not None:
+            logger.info("%s %s is slow or failed, not hedging: %s", tool, operation, refusal)
+            get_metrics().observe_hedge(tool, 'refused')
+            return self._wait(tool, slo, primary, deadline)
+
+        logger.info("%s %s is slow or failed, hedging with %s", tool, operation, hedge_operation)
+        get_metrics().observe_hedge(tool, 'fallback' if hedge_operation != operation else 'duplicate')
+        pending.add(self._executor.submit(self._timed(tool, hedge_operation, hedge, max_retries=0)))
+        error = primary.exception() if done else None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        get_metrics().observe_hedge(tool, 'won')
+                    return future.result()
+                error = future.exception()
+        if pending:
+            # The requests still running are abandoned; their latency is still recorded.
+            raise requests.exceptions.Timeout(f"{tool} exceeded its latency budget of {slo.max_seconds:.0f}s")
+        raise error
+
+    @staticmethod
+    def _wait(tool: str, slo: LatencySLO, primary, deadline: float) -> Any:
+        """Waits for the primary request alone until the call's deadline."""
+        done, _ = wait([primary], timeout=max(0.0, deadline - time.monotonic()))
+        if not done:
+            raise requests.exceptions.Timeout(f"{tool} exceeded its latency budget of {slo.max_seconds:.0f}s")
+        return primary.result()
+
+
+_default_controller: Optional[LatencyController] = None
+_default_lock = threading.Lock()
+
+
+def get_latency_controller() -> LatencyController:
+    """Returns the process-wide latency controller shared by all tools."""
+    global _default_controller
+    with _default_lock:
+        if _default_controller is None:
+            _default_controller = LatencyController.from_config()
+        return _default_controller
@@ -0,0 +1,303 @@
+# niche/tools/metrics.py
+
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow live API calls.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_METRICS_DIR = 'metrics'
+# Tail-latency percentiles reported per tool and per API host.
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+# Latest latencies kept per series for the percentiles.
+LATENCY_WINDOW = 1000
+
+
+def percentile(samples: Iterable[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (0-100) of the samples, or None without samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, as in the Prometheus exposition format."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        result, running = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            result['+Inf' if bound == float('inf') else f"{bound:g}"] = running
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': round(self.sum, 6), 'buckets': self.cumulative()}
+
+
+class _Series:
+    __slots__ = ('latency', 'samples', 'calls', 'errors', 'retries', 'bytes_in', 'bytes_out')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        percentiles = {f"p{q}": percentile(self.samples, q) for q in LATENCY_PERCENTILES}
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'latency_seconds': self.latency.to_dict(),
+            'latency_percentiles': {
+                name: None if value is None else round(value, 6) for name, value in percentiles.items()
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters for one run: tool calls, API calls, cache lookups and
+    LLM token usage per task and agent.
+
+    Everything is kept in memory and written once at the end of the run as
+    JSON and as a Prometheus textfile (for node_exporter's textfile collector).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tools: Dict[str, _Series] = defaultdict(_Series)
+        self.apis: Dict[str, _Series] = defaultdict(_Series)
+        self.caches: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self.llm: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(
+            lambda: {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        )
+        self.budgets: Dict[str, Dict[str, Any]] = {}
+        self.hedges: Dict[str, Dict[str, int]] = defaultdict(lambda: {'duplicate': 0, 'fallback': 0, 'won': 0, 'refused': 0})
+        self.started_at = time.time()
+
+    def observe_tool_call(self, tool: str, seconds: float, bytes_in: int, bytes_out: int, error: bool = False) -> None:
+        with self._lock:
+            series = self.tools[tool]
+            series.latency.observe(seconds)
+            series.samples.append(seconds)
+            series.calls += 1
+            series.errors += error
+            series.bytes_in += bytes_in
+            series.bytes_out += bytes_out
+
+    def observe_api_call(
+        self,
+        host: str,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int,
+        error: bool = False,
+        retry: bool = False,
+    ) -> None:
+        with self._lock:
+            series = self.apis[host]
+            series.latency.observe(seconds)
+            series.samples.append(seconds)
+            series.calls += 1
+            series.errors += error
+            series.retries += retry
+            series.bytes_out += bytes_sent
+            series.bytes_in += bytes_received
+
+    def observe_cache(self, cache: str, hit: bool, count: int = 1) -> None:
+        with self._lock:
+            self.caches[cache]['hits' if hit else 'misses'] += count
+
+    def observe_llm_call(self, task: str, agent: str, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            usage = self.llm[(task, agent)]
+            usage['calls'] += 1
+            usage['prompt_tokens'] += prompt_tokens
+            usage['completion_tokens'] += completion_tokens
+
+    def observe_hedge(self, tool: str, kind: str) -> None:
+        """
+        Counts a hedged request ('duplicate' or 'fallback'), a hedge that
+        answered first ('won') or one the budget did not allow ('refused').
+        """
+        with self._lock:
+            self.hedges[tool][kind] += 1
+
+    def observe_budget(self, remaining: Dict[str, Dict[str, Any]], used: Dict[str, Dict[str, Any]]) -> None:
+        """Stores the latest remaining and used budget per scope ('run' or a tool name)."""
+        with self._lock:
+            self.budgets = {
+                scope: {'remaining': remaining.get(scope, {}), 'used': used.get(scope, {})}
+                for scope in set(remaining) | set(used)
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tools.clear()
+            self.apis.clear()
+            self.caches.clear()
+            self.llm.clear()
+            self.budgets = {}
+            self.hedges.clear()
+            self.started_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'elapsed_seconds': round(time.time() - self.started_at, 3),
+                'tools': {name: series.to_dict() for name, series in self.tools.items()},
+                'apis': {host: series.to_dict() for host, series in self.apis.items()},
+                'caches': {name: dict(counts) for name, counts in self.caches.items()},
+                'llm': [
+                    {'task': task, 'agent': agent, **usage}
+                    for (task, agent), usage in sorted(self.llm.items())
+                ],
+                'budgets': {scope: dict(values) for scope, values in sorted(self.budgets.items())},
+                'hedges': {tool: dict(counts) for tool, counts in sorted(self.hedges.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        snapshot = self.to_dict()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(**values: str) -> str:
+            return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in values.items()) + '}'
+
+        for prefix, label, group in (('niche_tool_call', 'tool', 'tools'), ('niche_api_request', 'host', 'apis')):
+            metric(f"{prefix}_seconds", 'histogram', f"Latency per {label}, in seconds.")
+            for name, series in snapshot[group].items():
+                histogram = series['latency_seconds']
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f"{prefix}_seconds_bucket{labels(**{label: name, 'le': bound})} {count}")
+                lines.append(f"{prefix}_seconds_sum{labels(**{label: name})} {histogram['sum']}")
+                lines.append(f"{prefix}_seconds_count{labels(**{label: name})} {histogram['count']}")
+            metric(f"{prefix}_seconds_quantile", 'gauge', f"Latency percentiles per {label} over the latest calls.")
+            for name, series in snapshot[group].items():
+                for q in LATENCY_PERCENTILES:
+                    value = series['latency_percentiles'][f"p{q}"]
+                    if value is not None:
+                        quantile_labels = labels(**{label: name, 'quantile': f"{q / 100:g}"})
+                        lines.append(f"{prefix}_seconds_quantile{quantile_labels} {value}")
+            for field in ('errors', 'retries', 'bytes_in', 'bytes_out'):
+                if group == 'tools' and field == 'retries':
+                    continue
+                metric(f"{prefix}_{field}_total", 'counter', f"Total {field.replace('_', ' ')} per {label}.")
+                for name, series in snapshot[group].items():
+                    lines.append(f"{prefix}_{field}_total{labels(**{label: name})} {series[field]}")
+
+        for field in ('hits', 'misses'):
+            metric(f"niche_cache_{field}_total", 'counter', f"Cache {field} per cache.")
+            for name, counts in snapshot['caches'].items():
+                lines.append(f"niche_cache_{field}_total{labels(cache=name)} {counts[field]}")
+
+        for field in ('calls', 'prompt_tokens', 'completion_tokens'):
+            metric(f"niche_llm_{field}_total", 'counter', f"LLM {field.replace('_', ' ')} per task and agent.")
+            for usage in snapshot['llm']:
+                lines.append(f"niche_llm_{field}_total{labels(task=usage['task'], agent=usage['agent'])} {usage[field]}")
+
+        for kind in ('remaining', 'used'):
+            metric(f"niche_budget_{kind}", 'gauge', f"Budget {kind} per scope (run or tool) and resource.")
+            for scope, values in snapshot['budgets'].items():
+                for resource, value in values[kind].items():
+                    if value is not None and resource != 'refused':
+                        lines.append(f"niche_budget_{kind}{labels(scope=scope, resource=resource)} {value}")
+        metric("niche_tool_hedges_total", 'counter', "Hedged requests per tool: duplicate, fallback, won or refused.")
+        for tool, counts in snapshot['hedges'].items():
+            for kind, count in counts.items():
+                lines.append(f"niche_tool_hedges_total{labels(tool=tool, kind=kind)} {count}")
+
+        metric("niche_budget_refused_total", 'counter', "Tool calls refused because a budget was exhausted.")
+        for scope, values in snapshot['budgets'].items():
+            lines.append(f"niche_budget_refused_total{labels(scope=scope)} {values['used'].get('refused', 0)}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory: Optional[str] = None, name: str = 'run_metrics') -> Tuple[str, str]:
+        """Writes <name>.json and <name>.prom atomically and returns their paths."""
+        directory = directory or os.getenv('NICHE_METRICS_DIR', DEFAULT_METRICS_DIR)
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{name}.json")
+        prom_path = os.path.join(directory, f"{name}.prom")
+        for path, content in ((json_path, json.dumps(self.to_dict(), indent=2)), (prom_path, self.to_prometheus())):
+            # Write-then-rename so a scraper never reads a half-written file.
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return json_path, prom_path
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Returns the process-wide metrics registry."""
+    return _registry
+
+
+def instrumented_tool_call(run: Callable[..., str]) -> Callable[..., str]:
+    """
+    Wraps a tool's _run to record its latency and the size of its input and output.
+
+    Tools report failures as text starting with 'Error', which is counted as an error.
+    """
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        output = run(self, *args, **kwargs)
+        bytes_in = sum(len(str(value).encode()) for value in (*args, *kwargs.values()))
+        get_metrics().observe_tool_call(
+            self.name,
+            time.perf_counter() - start,
+            bytes_in,
+            len(str(output).encode()),
+            error=str(output).startswith('Error'),
+        )
+        return output
+    return wrapper
+
+
+def enable_debug_logging() -> None:
+    """Sends the tools' debug logs to stderr; used by the tools' debug=True option."""
+    logger = logging.getLogger('niche')
+    logger.setLevel(logging.DEBUG)
+    if not any(getattr(handler, '_niche_debug', False) for handler in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('[%(levelname)s %(name)s] %(message)s'))
+        handler._niche_debug = True
+        logger.addHandler(handler)
@@ -0,0 +1,144 @@
+# niche/tools/output_format.py
+
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding('cl100k_base')
+except Exception:  # tiktoken is optional; fall back to a character heuristic
+    _ENCODING = None
+
+OUTPUT_FORMATS = ('json', 'tsv', 'csv')
+
+
+def estimate_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (list, tuple)):
+        return '|'.join(_cell(v) for v in value)
+    return str(value)
+
+
+def _render_lines(rows: List[Dict], columns: Sequence[str], output_format: str) -> List[str]:
+    if output_format == 'tsv':
+        lines = ['\t'.join(columns)]
+        for row in rows:
+            lines.append('\t'.join(_cell(row.get(c)).replace('\t', ' ').replace('\n', ' ') for c in columns))
+        return lines
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([_cell(row.get(c)) for c in columns])
+        return buffer.getvalue().rstrip('\n').split('\n')
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def render_rows(
+    rows: List[Dict],
+    columns: Sequence[str],
+    output_format: str = 'json',
+    token_budget: Optional[int] = None,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Renders keyword-style rows as pretty JSON or as a header-once TSV/CSV table,
+    dropping trailing rows that do not fit the token budget.
+
+    Returns the text and stats comparing it with the pretty-printed JSON.
+    """
+    full_json = json.dumps(rows, indent=2)
+    tokens_before = estimate_tokens(full_json)
+
+    if output_format == 'json':
+        kept = rows
+        if token_budget is not None and tokens_before > token_budget:
+            kept, used = [], 2
+            for row in rows:
+                used += estimate_tokens(json.dumps(row, indent=2)) + 1
+                if used > token_budget:
+                    break
+                kept.append(row)
+        text = full_json if kept is rows else json.dumps(kept, indent=2)
+        rows_kept = len(kept)
+    else:
+        lines = _render_lines(rows, columns, output_format)
+        rows_kept = len(rows)
+        if token_budget is not None:
+            used = estimate_tokens(lines[0])
+            for index, line in enumerate(lines[1:]):
+                used += estimate_tokens(line) + 1
+                if used > token_budget:
+                    rows_kept = index
+                    break
+        text = '\n'.join(lines[:rows_kept + 1])
+        if rows_kept < len(rows):
+            text += f"\n# {len(rows) - rows_kept} more rows omitted to fit the output budget"
+
+    stats = {
+        'rows': len(rows),
+        'rows_omitted': len(rows) - rows_kept,
+        'tokens_before': tokens_before,
+        'tokens_after': estimate_tokens(text),
+    }
+    return text, stats
+
+
+def summarize_series(points: List[Dict]) -> Dict[str, Any]:
+    """Condenses a trend time series into a handful of summary fields."""
+    values = [p['value'] for p in points if p.get('value') is not None]
+    if not values:
+        return {'points': len(points)}
+    peak = max((p for p in points if p.get('value') is not None), key=lambda p: p['value'])
+    first, last = values[0], values[-1]
+    return {
+        'points': len(points),
+        'first': first,
+        'last': last,
+        'min': min(values),
+        'max': max(values),
+        'mean': round(sum(values) / len(values), 1),
+        'peak_date': peak.get('date_from'),
+        'change_pct': round((last - first) / first * 100, 1) if first else None,
+    }
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\W+', ' ', text.lower()).strip()
+
+
+def truncate(text: str, max_chars: int) -> str:
+    text = ' '.join((text or '').split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(' ', 1)[0]
+    return cut + '…'
+
+
+def dedupe_snippets(items: List[Dict], key: str, max_chars: int) -> List[Dict]:
+    """Truncates items[key] and drops items whose text or link repeats an earlier one."""
+    seen = set()
+    unique = []
+    for item in items:
+        text = truncate(item.get(key) or '', max_chars)
+        fingerprints = {_normalize(text)} - {''}
+        link = item.get('link') or item.get('url')
+        if link:
+            fingerprints.add(link.rstrip('/'))
+        if fingerprints & seen:
+            continue
+        seen.update(fingerprints)
+        unique.append({**item, key: text})
+    return unique
@@ -0,0 +1,102 @@
+# niche/tools/scoring.py
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CompSWeights:
+    """Weights and normalization caps of the CompS score."""
+    w_sv: float = 0.4
+    w_ics: float = 0.4
+    w_ms: float = 0.2
+    sv_divisor: float = 1000
+    cpc_multiplier: float = 10
+    cap: float = 100
+    competition_max: float = 100
+
+
+DEFAULT_WEIGHTS = CompSWeights()
+
+
+def calculate_comps(
+    search_volume: Optional[float],
+    competition_index: Optional[float],
+    cpc: Optional[float],
+    weights: CompSWeights = DEFAULT_WEIGHTS,
+) -> float:
+    """Scores a single keyword. Reference implementation of calculate_comps_array."""
+    # Normalize scores
+    sv_norm = min(search_volume / weights.sv_divisor, weights.cap) if search_volume else 0
+    ics_norm = weights.competition_max - competition_index if competition_index is not None else 0
+    ms_norm = min(cpc * weights.cpc_multiplier, weights.cap) if cpc else 0
+
+    # Calculate CompS
+    compS = (weights.w_sv * sv_norm) + (weights.w_ics * ics_norm) + (weights.w_ms * ms_norm)
+    return round(compS, 2)
+
+
+def _to_array(values: Sequence[Optional[float]]) -> np.ndarray:
+    return np.fromiter((np.nan if v is None else v for v in values), dtype=float, count=len(values))
+
+
+def calculate_comps_array(
+    search_volume: Sequence[Optional[float]],
+    competition_index: Sequence[Optional[float]],
+    cpc: Sequence[Optional[float]],
+    weights: CompSWeights = DEFAULT_WEIGHTS,
+) -> np.ndarray:
+    """
+    Scores all keywords in one vectorized pass.
+
+    Missing values are passed as None. Results are bit-for-bit identical to
+    calculate_comps applied row by row.
+    """
+    sv = _to_array(search_volume)
+    ci = _to_array(competition_index)
+    cp = _to_array(cpc)
+
+    with np.errstate(invalid='ignore'):
+        sv_norm = np.where(np.isnan(sv) | (sv == 0), 0.0, np.minimum(sv / weights.sv_divisor, weights.cap))
+        ics_norm = np.where(np.isnan(ci), 0.0, weights.competition_max - ci)
+        ms_norm = np.where(np.isnan(cp) | (cp == 0), 0.0, np.minimum(cp * weights.cpc_multiplier, weights.cap))
+
+    raw = (weights.w_sv * sv_norm) + (weights.w_ics * ics_norm) + (weights.w_ms * ms_norm)
+    return round_half_even_2(raw)
+
+
+def round_half_even_2(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds to two decimals exactly like Python's round(x, 2).
+
+    np.round scales by 100 first, which can land on the other side of a tie
+    than the exact decimal rounding Python does. The few values that sit next
+    to a tie are re-rounded with Python.
+    """
+    scaled = values * 100
+    rounded = np.round(scaled) / 100
+    near_tie = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie):
+        rounded[index] = round(float(values[index]), 2)
+    return rounded
+
+
+def top_n_indices(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n highest scores in descending order, ties kept in input order.
+
+    Matches sorted(..., reverse=True)[:n] but only orders the candidates
+    picked by a partial selection instead of sorting every row.
+    """
+    size = len(scores)
+    if n <= 0 or size == 0:
+        return np.empty(0, dtype=int)
+    if n >= size:
+        candidates = np.arange(size)
+    else:
+        kth = np.partition(scores, size - n)[size - n]
+        candidates = np.flatnonzero(scores >= kth)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:n]
@@ -0,0 +1,191 @@
+# niche/tools/transport.py
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from niche.tools.metrics import get_metrics, percentile
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class HostStats:
+    """Latency and error counters for a single host."""
+
+    def __init__(self, window: int = 1000):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False, retry: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self.retries += retry
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples)
+        return percentile(samples, q)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'mean_seconds': self.total_seconds / self.requests if self.requests else 0.0,
+            'p50_seconds': self.percentile(50),
+            'p95_seconds': self.percentile(95),
+            'max_seconds': self.max_seconds,
+        }
+
+
+def _request_size(kwargs: Dict) -> int:
+    data = kwargs.get('data')
+    if data is None and kwargs.get('json') is not None:
+        data = json.dumps(kwargs['json'])
+    if data is None:
+        return 0
+    return len(data.encode() if isinstance(data, str) else data)
+
+
+class HttpTransport:
+    """
+    Shared HTTP transport for the niche tools.
+
+    Keeps a pooled keep-alive session per process, applies a default timeout to
+    every request, retries idempotent requests on connection errors and
+    retryable status codes with full-jitter exponential backoff, and collects
+    per-host latency statistics.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        pool_connections: int = 8,
+        pool_maxsize: int = 16,
+    ):
+        self.timeout = timeout if timeout is not None else float(os.getenv('NICHE_HTTP_TIMEOUT', '60'))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+        # Set by the record/replay harness (niche.tools.cassette.Cassette).
+        self.cassette = None
+
+    def _host_stats(self, url: str) -> HostStats:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._stats:
+                self._stats[host] = HostStats()
+            return self._stats[host]
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        **kwargs
+    ) -> requests.Response:
+        stats = self._host_stats(url)
+        host = urlsplit(url).netloc
+        metrics = get_metrics()
+        sent = _request_size(kwargs)
+        if self.cassette is not None and self.cassette.replaying:
+            start = time.perf_counter()
+            response = self.cassette.play(method, url, **kwargs)
+            seconds, failed = time.perf_counter() - start, response.status_code in RETRY_STATUSES
+            stats.record(seconds, error=failed)
+            metrics.observe_api_call(host, seconds, sent, len(response.content), error=failed)
+            return response
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempts = max_retries + 1 if idempotent else 1
+        timeout = timeout if timeout is not None else self.timeout
+
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                retry = attempt + 1 < attempts
+                seconds = time.perf_counter() - start
+                stats.record(seconds, error=True, retry=retry)
+                metrics.observe_api_call(host, seconds, sent, 0, error=True, retry=retry)
+                if not retry:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            failed = response.status_code in RETRY_STATUSES
+            retry = failed and attempt + 1 < attempts
+            seconds = time.perf_counter() - start
+            stats.record(seconds, error=failed, retry=retry)
+            metrics.observe_api_call(host, seconds, sent, len(response.content), error=failed, retry=retry)
+            if retry:
+                time.sleep(self._backoff(attempt, response))
+                continue
+            if self.cassette is not None and self.cassette.recording:
+                self.cassette.record(method, url, response, **kwargs)
+            return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {host: stats.summary() for host, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Returns the process-wide transport shared by all tools."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
@@ -0,0 +1,222 @@
+# niche/tools/trend_analytics.py
+
+import calendar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+WEEK_SECONDS = 7 * 24 * 3600
+YEAR_WEEKS = 52
+# Seasonality needs every month twice; monthly points of two full years span 23 months.
+SEASONALITY_MIN_WEEKS = 2 * YEAR_WEEKS - 5
+
+TREND_VIEWS = ('series', 'features', 'ranking')
+TREND_FEATURE_COLUMNS = (
+    'keyword', 'points', 'mean', 'last', 'slope_pct', 'yoy_pct', 'seasonality', 'peak_month', 'volatility'
+)
+TREND_RANKING_COLUMNS = ('rank', 'momentum') + TREND_FEATURE_COLUMNS
+
+
+@dataclass(frozen=True)
+class MomentumWeights:
+    """Windows of the trend features and weights of the momentum score."""
+    recent_weeks: int = 12
+    compare_weeks: int = 4
+    w_slope: float = 0.7
+    w_yoy: float = 0.3
+
+
+DEFAULT_MOMENTUM_WEIGHTS = MomentumWeights()
+
+
+def _point_time(point: Dict) -> Optional[float]:
+    if point.get('timestamp') is not None:
+        return float(point['timestamp'])
+    if point.get('date_from'):
+        return float(np.datetime64(point['date_from'], 's').astype(np.int64))
+    return None
+
+
+def build_trend_matrix(series: Dict[str, List[Dict]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Aligns the trend points of every keyword on one time axis.
+
+    Returns the keywords, the sorted timestamps (seconds) and a keywords x
+    timestamps matrix of values, NaN where a keyword has no point.
+    """
+    keywords = list(series)
+    parsed = []
+    for keyword in keywords:
+        points = [(_point_time(p), p.get('value')) for p in series[keyword] or []]
+        parsed.append([(t, v) for t, v in points if t is not None and v is not None])
+    times = np.unique(np.fromiter((t for points in parsed for t, _ in points), dtype=float))
+    values = np.full((len(keywords), len(times)), np.nan)
+    for row, points in enumerate(parsed):
+        if points:
+            point_times, point_values = zip(*points)
+            values[row, np.searchsorted(times, point_times)] = point_values
+    return keywords, times, values
+
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    counts = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, np.where(mask, values, 0.0).sum(axis=1) / counts, np.nan)
+
+
+def _masked_var(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    mean = _masked_mean(values, mask)
+    deviations = np.where(mask, values - mean[:, None], 0.0)
+    return _masked_mean(deviations ** 2, mask)
+
+
+def _masked_span(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Distance between the first and last masked point of every row, NaN without points."""
+    with np.errstate(invalid='ignore'):
+        span = np.where(mask, x, -np.inf).max(axis=1) - np.where(mask, x, np.inf).min(axis=1)
+    return np.where(mask.any(axis=1), span, np.nan)
+
+
+def _masked_fit(x: np.ndarray, values: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Least-squares intercept and slope of every row over its masked points."""
+    m = mask.astype(float)
+    y = np.where(mask, values, 0.0)
+    n = m.sum(axis=1)
+    sx, sy = m @ x, y.sum(axis=1)
+    sxx, sxy = m @ (x * x), y @ x
+    denominator = n * sxx - sx ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.where((n >= 2) & (denominator > 0), (n * sxy - sx * sy) / denominator, np.nan)
+        intercept = np.where(n > 0, (sy - slope * sx) / n, np.nan)
+    return intercept, slope
+
+
+def trend_features(
+    times: np.ndarray,
+    values: np.ndarray,
+    weights: MomentumWeights = DEFAULT_MOMENTUM_WEIGHTS,
+) -> Dict[str, np.ndarray]:
+    """
+    Computes the trend features of all keywords in one vectorized pass.
+
+    - slope_pct: recent slope (last recent_weeks) in % of the keyword's mean per week
+    - yoy_pct: mean of the last compare_weeks against the same weeks a year earlier
+    - seasonality: share (0-1) of the detrended variance explained by the calendar month
+    - peak_month: month (1-12) with the highest mean interest
+    - volatility: standard deviation of point-to-point changes relative to the mean
+    - momentum: weighted slope and year-over-year growth, the ranking score
+
+    Year-over-year growth needs a year of history and seasonality two; missing
+    features are NaN. The slope enters the momentum as the change over the
+    recent window, or over the span of a shorter series, never extrapolated.
+    """
+    mask = ~np.isnan(values)
+    rows, columns = values.shape
+    counts = mask.sum(axis=1)
+    mean = _masked_mean(values, mask)
+    if columns == 0:
+        empty = np.full(rows, np.nan)
+        return {
+            'points': counts, 'mean': empty, 'last': empty, 'slope_pct': empty, 'yoy_pct': empty,
+            'seasonality': empty, 'peak_month': empty, 'volatility': empty, 'momentum': empty,
+        }
+    weeks = (times - times[-1]) / WEEK_SECONDS
+    last_index = columns - 1 - np.argmax(mask[:, ::-1], axis=1)
+    last = np.where(counts > 0, values[np.arange(rows), last_index], np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        recent_mask = mask & (weeks > -weights.recent_weeks)
+        _, recent_slope = _masked_fit(weeks, values, recent_mask)
+        slope_pct = recent_slope / mean * 100
+        # n points cover n intervals: 12 weekly points are 12 weeks, 7 daily points one week.
+        recent_counts = recent_mask.sum(axis=1)
+        covered_weeks = _masked_span(weeks, recent_mask) * recent_counts / np.maximum(recent_counts - 1, 1)
+        slope_weeks = np.minimum(covered_weeks, weights.recent_weeks)
+
+        recent = _masked_mean(values, mask & (weeks > -weights.compare_weeks))
+        year_ago_window = (weeks > -YEAR_WEEKS - weights.compare_weeks) & (weeks <= -YEAR_WEEKS + 0.5)
+        year_ago = _masked_mean(values, mask & year_ago_window)
+        yoy_pct = np.where(year_ago > 0, (recent - year_ago) / year_ago * 100, np.nan)
+
+        # Month of year of every timestamp, as a one-hot timestamps x 12 matrix.
+        months = times.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64) % 12
+        month_onehot = np.eye(12)[months]
+        month_counts = mask.astype(float) @ month_onehot
+        month_means = (np.where(mask, values, 0.0) @ month_onehot) / month_counts
+        peak_month = np.where(
+            counts > 0, np.argmax(np.where(np.isnan(month_means), -np.inf, month_means), axis=1) + 1, np.nan
+        )
+
+        intercept, slope = _masked_fit(weeks, values, mask)
+        residuals = values - (intercept[:, None] + slope[:, None] * weeks)
+        seasonal = ((np.where(mask, residuals, 0.0) @ month_onehot) / month_counts)[:, months]
+        seasonality = np.clip(_masked_var(seasonal, mask) / _masked_var(residuals, mask), 0.0, 1.0)
+        # Within a single year the month means just fit the noise.
+        seasonality = np.where(_masked_span(weeks, mask) >= SEASONALITY_MIN_WEEKS, seasonality, np.nan)
+
+        changes = np.diff(values, axis=1)
+        volatility = np.sqrt(_masked_var(changes, ~np.isnan(changes))) / mean
+
+        has_yoy = ~np.isnan(yoy_pct)
+        momentum = (
+            weights.w_slope * slope_pct * slope_weeks + weights.w_yoy * np.where(has_yoy, yoy_pct, 0.0)
+        ) / (weights.w_slope + weights.w_yoy * has_yoy)
+
+    return {
+        'points': counts,
+        'mean': mean,
+        'last': last,
+        'slope_pct': slope_pct,
+        'yoy_pct': yoy_pct,
+        'seasonality': seasonality,
+        'peak_month': peak_month,
+        'volatility': volatility,
+        'momentum': momentum,
+    }
+
+
+def _value(value: Any, digits: int) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) or np.isinf(value) else round(value, digits)
+
+
+def _feature_row(keyword: str, features: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+    peak_month = features['peak_month'][index]
+    return {
+        'keyword': keyword,
+        'points': int(features['points'][index]),
+        'mean': _value(features['mean'][index], 1),
+        'last': _value(features['last'][index], 1),
+        'slope_pct': _value(features['slope_pct'][index], 2),
+        'yoy_pct': _value(features['yoy_pct'][index], 1),
+        'seasonality': _value(features['seasonality'][index], 2),
+        'peak_month': None if np.isnan(peak_month) else calendar.month_abbr[int(peak_month)],
+        'volatility': _value(features['volatility'][index], 2),
+        'momentum': _value(features['momentum'][index], 1),
+    }
+
+
+def trend_feature_rows(
+    series: Dict[str, List[Dict]],
+    weights: MomentumWeights = DEFAULT_MOMENTUM_WEIGHTS,
+) -> List[Dict[str, Any]]:
+    """Trend features of every keyword, in input order. `series` maps keywords to their trend points."""
+    keywords, times, values = build_trend_matrix(series)
+    features = trend_features(times, values, weights)
+    return [_feature_row(keyword, features, index) for index, keyword in enumerate(keywords)]
+
+
+def momentum_ranking(
+    series: Dict[str, List[Dict]],
+    weights: MomentumWeights = DEFAULT_MOMENTUM_WEIGHTS,
+) -> List[Dict[str, Any]]:
+    """Trend features ranked by momentum, highest first; keywords without a score come last."""
+    keywords, times, values = build_trend_matrix(series)
+    features = trend_features(times, values, weights)
+    score = np.where(np.isnan(features['momentum']), -np.inf, features['momentum'])
+    order = np.lexsort((np.arange(len(keywords)), -score))
+    return [
+        {'rank': rank, **_feature_row(keywords[index], features, index)}
+        for rank, index in enumerate(order, 1)
+    ]
@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def default_env(tmp_path, monkeypatch):
+    """Runs a test in an empty directory with the NICHE_* settings at their defaults."""
+    for name in list(os.environ):
+        if name.startswith('NICHE_'):
+            monkeypatch.delenv(name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
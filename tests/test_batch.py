@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+pytest.importorskip('dotenv')
+
+from niche import batch as batch_module  # noqa: E402
+from niche.batch import STATE_FILENAME, BatchRunner, load_topics, topic_slug, topic_slugs  # noqa: E402
+
+
+@pytest.mark.parametrize('name, content', [
+    ('topics.yaml', "- Desk Setup\n- initial_topic: Home Gym\n  location: uk\n"),
+    ('topics.json', json.dumps(['Desk Setup', {'initial_topic': 'Home Gym', 'location': 'uk'}])),
+    ('topics.jsonl', '"Desk Setup"\n\n{"initial_topic": "Home Gym", "location": "uk"}\n'),
+])
+def test_load_topics_formats(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    assert load_topics(str(path)) == [
+        {'initial_topic': 'Desk Setup'}, {'initial_topic': 'Home Gym', 'location': 'uk'}
+    ]
+
+
+def test_load_topics_from_text_skips_comments_and_blank_lines(tmp_path):
+    path = tmp_path / 'topics.txt'
+    path.write_text("# niches\nDesk Setup\n\n  Home Gym  \n", encoding='utf-8')
+    assert load_topics(str(path)) == [{'initial_topic': 'Desk Setup'}, {'initial_topic': 'Home Gym'}]
+
+
+def test_load_topics_requires_an_initial_topic(tmp_path):
+    path = tmp_path / 'topics.yaml'
+    path.write_text("- location: uk\n", encoding='utf-8')
+    with pytest.raises(ValueError, match='initial_topic'):
+        load_topics(str(path))
+
+
+def test_colliding_slugs_are_disambiguated():
+    topics = [{'initial_topic': t} for t in ('Desk Setup', 'desk-setup', 'Home Gym')]
+    slugs = topic_slugs(topics)
+    assert slugs[2] == 'home-gym'
+    assert len(set(slugs)) == 3
+    assert all(slug.startswith('desk-setup-') for slug in slugs[:2])
+    # Independent of the order of the topics, so resuming finds the same entries.
+    assert topic_slugs(topics[::-1]) == slugs[::-1]
+    assert topic_slug('Désk / Setup!') == 'd-sk-setup'
+
+
+@pytest.fixture
+def runner(default_env, monkeypatch):
+    topics = [{'initial_topic': t} for t in ('Desk Setup', 'desk-setup', 'Home Gym')]
+    runner = BatchRunner(topics, output_dir=str(default_env / 'output'), max_workers=1)
+    runs = []
+
+    def run_topic(inputs, slug):
+        # Home Gym fails on its first attempt.
+        ok = slug != 'home-gym' or slug in runs
+        runs.append(slug)
+        runner._record({'slug': slug, 'topic': inputs['initial_topic'], 'status': 'completed' if ok else 'failed'})
+        return ok
+
+    monkeypatch.setattr(runner, '_run_topic', run_topic)
+    monkeypatch.setattr(batch_module.get_metrics(), 'write', lambda *args: ('metrics.json', 'metrics.prom'))
+    return runner, runs
+
+
+def test_resume_skips_completed_topics(runner):
+    runner, runs = runner
+    assert runner.run()['topics_succeeded'] == 2
+    assert runs == runner.slugs
+    assert runner.completed_topics() == set(runner.slugs[:2])
+
+    assert runner.run()['topics_run'] == 1
+    assert runs[3:] == ['home-gym']
+    with open(runner.state_path, encoding='utf-8') as f:
+        assert [json.loads(line)['status'] for line in f] == ['completed', 'completed', 'failed', 'completed']
+    assert runner.state_path.endswith(STATE_FILENAME)
@@ -0,0 +1,69 @@
+import pytest
+
+from niche.tools import cache as cache_module
+from niche.tools.cache import ResponseCache
+
+KEYWORDS = 'keywords_data/google_ads/keywords_for_keywords/live'
+TRENDS = 'keywords_data/google_trends/explore/live'
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    return now
+
+
+def test_ttl_uses_the_longest_matching_prefix():
+    cache = ResponseCache(path='', ttls={'a/': 10, 'a/b/': 20}, default_ttl=5)
+    assert cache.ttl_for('a/b/c') == 20
+    assert cache.ttl_for('a/c') == 10
+    assert cache.ttl_for('x') == 5
+
+
+def test_entries_expire_per_endpoint(clock, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'cache.sqlite3'))
+    cache.set(KEYWORDS, {'q': 1}, 'keywords')
+    cache.set(TRENDS, {'q': 1}, 'trends')
+    clock[0] += 2 * DAY
+    assert cache.get(KEYWORDS, {'q': 1}) == 'keywords'
+    assert cache.get(TRENDS, {'q': 1}) is None
+    clock[0] += 6 * DAY
+    assert cache.get(KEYWORDS, {'q': 1}) is None
+
+
+def test_payload_key_order_does_not_matter():
+    cache = ResponseCache(path='')
+    cache.set(KEYWORDS, {'a': 1, 'b': 2}, 'value')
+    assert cache.get(KEYWORDS, {'b': 2, 'a': 1}) == 'value'
+
+
+def test_memory_tier_evicts_the_least_recently_used():
+    cache = ResponseCache(path='', max_memory_entries=2)
+    cache.set(KEYWORDS, 'a', 1)
+    cache.set(KEYWORDS, 'b', 2)
+    assert cache.get(KEYWORDS, 'a') == 1
+    cache.set(KEYWORDS, 'c', 3)
+    assert cache.get(KEYWORDS, 'b') is None
+    assert cache.get(KEYWORDS, 'a') == 1
+    assert cache.get(KEYWORDS, 'c') == 3
+
+
+def test_prune_drops_expired_and_least_recently_used_rows(clock, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'cache.sqlite3'), max_disk_entries=10)
+    cache.set(TRENDS, 'old', 'expired')
+    clock[0] += 2 * DAY
+    for i in range(99):
+        clock[0] += 1
+        cache.set(KEYWORDS, i, i)
+    rows = {row[0] for row in cache._db.execute('SELECT value FROM responses')}
+    assert rows == {str(i) for i in range(89, 99)}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    ResponseCache(path=path).set(KEYWORDS, {'q': 1}, {'rows': [1, 2]})
+    restarted = ResponseCache(path=path)
+    assert restarted.get(KEYWORDS, {'q': 1}) == {'rows': [1, 2]}
+    assert restarted.stats()['disk_hits'] == 1
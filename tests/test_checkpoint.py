@@ -0,0 +1,74 @@
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('crewai')
+
+from niche.checkpoint import TaskCheckpointer  # noqa: E402
+from niche.crew import REPORT_TASK, BlogContentResearchCrew  # noqa: E402
+from niche.instrumentation import UNASSIGNED_TASK  # noqa: E402
+
+INPUTS = {'initial_topic': 'Desk Setup'}
+TASK = 'generate_initial_keywords'
+
+
+def _key(research: BlogContentResearchCrew) -> str:
+    return research.checkpointer(INPUTS).key(TASK, [])
+
+
+def test_fresh_crews_produce_the_same_key(default_env):
+    assert _key(BlogContentResearchCrew()) == _key(BlogContentResearchCrew())
+
+
+def test_agent_config_change_invalidates_the_key(default_env):
+    research = BlogContentResearchCrew()
+    checkpointer = research.checkpointer(INPUTS)
+    agents = copy.deepcopy(research.agent_specs)
+    agent = research.task_specs[TASK]['agent']
+    agents[agent]['goal'] += ' Prefer long-tail keywords.'
+    changed = TaskCheckpointer(checkpointer.store, research.task_specs, agents, inputs=INPUTS)
+    assert changed.key(TASK, []) != checkpointer.key(TASK, [])
+
+
+def test_refresh_after_does_not_change_the_key(default_env):
+    research = BlogContentResearchCrew()
+    checkpointer = research.checkpointer(INPUTS)
+    tasks = copy.deepcopy(research.task_specs)
+    tasks[TASK]['refresh_after'] = 1
+    changed = TaskCheckpointer(checkpointer.store, tasks, research.agent_specs, inputs=INPUTS)
+    assert changed.key(TASK, []) == checkpointer.key(TASK, [])
+
+
+def _stub_task(name):
+    return SimpleNamespace(name=name, description=name, expected_output=name, output_file=None,
+                           output=None, context=None, callback=None)
+
+
+def test_tracker_moves_only_between_tasks_that_run(default_env, monkeypatch):
+    monkeypatch.setenv('NICHE_STREAM_REPORT', 'off')
+    research = BlogContentResearchCrew()
+    names = list(research.tasks_config)
+    checkpointer = research.checkpointer(INPUTS)
+    dependencies = research.task_dependencies()
+    # Ideas runs again while trends, listed after it, is restored.
+    running = ['generate_blog_content_ideas', REPORT_TASK]
+    restored = [name for name in names if name not in running]
+    for name in restored:
+        upstream = [f'{dependency} output' for dependency in dependencies[name]]
+        checkpointer.save(name, upstream, SimpleNamespace(agent='agent', raw=f'{name} output'))
+    active = []
+
+    def kickoff(inputs):
+        for crew_task in research_crew.tasks:
+            active.append(research.task_tracker.task_for('agent'))
+            crew_task.output = SimpleNamespace(name=crew_task.name, agent='agent', raw=f'{crew_task.name} output')
+            crew_task.callback(crew_task.output)
+        active.append(research.task_tracker.task_for('agent'))
+
+    research_crew = SimpleNamespace(tasks=[_stub_task(name) for name in names], kickoff=kickoff)
+    monkeypatch.setattr(research, 'crew', lambda: research_crew)
+    research.task_tracker.task_names = names
+    research._kickoff(INPUTS)
+    assert active[:-1] == running
+    assert active[-1] == UNASSIGNED_TASK
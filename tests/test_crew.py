@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip('crewai')
+
+from niche.crew import AGENT_TOOLS, REPORT_TASK, BlogContentResearchCrew  # noqa: E402
+
+
+def test_crew_constructs_with_default_env(default_env):
+    research = BlogContentResearchCrew()
+    assert research.report_stream is not None
+    assert research.report_stream.path == research.task_specs[REPORT_TASK]['output_file']
+    assert isinstance(research.tasks_config, dict)
+
+
+def test_report_path_overrides_output_file(default_env):
+    research = BlogContentResearchCrew(report_path=str(default_env / 'report.md'))
+    assert research.report_stream.path == str(default_env / 'report.md')
+
+
+def test_streaming_can_be_turned_off(default_env, monkeypatch):
+    monkeypatch.setenv('NICHE_STREAM_REPORT', 'off')
+    assert BlogContentResearchCrew().report_stream is None
+
+
+def test_tools_are_built_with_the_crew(default_env, monkeypatch):
+    pytest.importorskip('crewai_tools')
+    for name in ('DATAFORSEO_LOGIN', 'DATAFORSEO_PASSWORD', 'SERPER_API_KEY', 'TAVILY_API_KEY'):
+        monkeypatch.setenv(name, 'test')
+    research = BlogContentResearchCrew()
+    assert research._tools == {}
+    research.crew()
+    for agent_name, tool_names in AGENT_TOOLS.items():
+        assert [tool.name for tool in getattr(research, agent_name)().tools] == list(tool_names)
@@ -0,0 +1,127 @@
+import pytest
+import requests
+
+from niche.tools import dataforseo_queue as queue_module
+from niche.tools.cache import ResponseCache
+from niche.tools.dataforseo_client import DataForSEOClient
+from niche.tools.dataforseo_queue import DataForSEOQueue
+from niche.tools.keyword_store import KeywordStore
+
+MARKETS = [(2840, 'en')]
+
+
+class QueueClient(DataForSEOClient):
+    """Answers the queue endpoints locally; posted tasks finish while `finishing` is set."""
+
+    def __init__(self, failing_polls: int = 0):
+        super().__init__(cache=ResponseCache(path=''), max_concurrency=2)
+        self.finishing = True
+        self.failing_polls = failing_polls
+        self.tasks = {}
+        self.ready = set()
+        self.posts = 0
+
+    def send(self, method, endpoint, payload=None, idempotent=True):
+        if endpoint.endswith('/task_post'):
+            self.posts += 1
+            ids = []
+            for task in payload:
+                ids.append(f"task-{len(self.tasks)}")
+                self.tasks[ids[-1]] = task
+            self.finish()
+            return {'status_code': 20000, 'tasks': [{'status_code': 20100, 'id': task_id} for task_id in ids]}
+        if endpoint.endswith('/tasks_ready'):
+            if self.failing_polls:
+                self.failing_polls -= 1
+                raise requests.exceptions.ConnectionError('connection reset')
+            return {'status_code': 20000, 'tasks': [{'result': [{'id': task_id} for task_id in self.ready]}]}
+        task_id = endpoint.rsplit('/', 1)[-1]
+        if task_id not in self.ready:
+            return {'status_code': 20000, 'tasks': [{'status_code': 40602, 'status_message': 'Task In Queue.'}]}
+        self.ready.discard(task_id)
+        result = [{'keyword': f"{seed} ideas", 'search_volume': 10} for seed in self.tasks[task_id]['keywords']]
+        return {'status_code': 20000, 'tasks': [{'status_code': 20000, 'result': result}]}
+
+    def finish(self):
+        if self.finishing:
+            self.ready |= set(self.tasks)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(queue_module.time, 'sleep', lambda seconds: None)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KeywordStore(str(tmp_path / 'keywords.sqlite3'))
+
+
+def _run(client, store, seeds, **options):
+    queue = DataForSEOQueue(client, store=store, **options)
+    return queue.run(queue.keyword_jobs(seeds, MARKETS))
+
+
+def test_finished_tasks_are_stored_and_forgotten(store):
+    client = QueueClient()
+    [job] = _run(client, store, ['desk'])
+    assert job.error is None and job.result is not None
+    assert [row.keyword for row in store.fresh_keywords_for_seeds(['desk'])] == ['desk ideas']
+    assert store.pending_queue_tasks() == []
+    assert client.posts == 1
+
+
+def test_timed_out_tasks_are_resumed_instead_of_posted_again(store):
+    client = QueueClient()
+    client.finishing = False
+    [job] = _run(client, store, ['desk'], timeout=0)
+    assert job.error.startswith('not ready')
+    assert [task_id for task_id, _, _ in store.pending_queue_tasks()] == [job.task_id]
+
+    client.finishing = True
+    client.finish()
+    [job] = _run(client, store, ['desk'])
+    assert job.result is not None
+    assert client.posts == 1
+    assert store.pending_queue_tasks() == []
+
+
+def test_unfinished_resumed_tasks_wait_for_tasks_ready(store, monkeypatch):
+    client = QueueClient()
+    client.finishing = False
+    _run(client, store, ['desk'], timeout=0)
+    # The task finishes only after the first poll.
+    ready_ids = DataForSEOQueue._ready_ids
+
+    def poll(queue, endpoint):
+        client.finishing = True
+        client.finish()
+        return ready_ids(queue, endpoint)
+
+    monkeypatch.setattr(DataForSEOQueue, '_ready_ids', poll)
+    [job] = _run(client, store, ['desk'])
+    assert job.result is not None
+    assert client.posts == 1
+
+
+def test_tasks_left_by_another_sweep_are_fetched_too(store):
+    client = QueueClient()
+    client.finishing = False
+    _run(client, store, ['lamp'], timeout=0)
+    client.finishing = True
+    [job] = _run(client, store, ['desk'])
+    assert job.result is not None
+    assert sorted(row.keyword for row in store.fresh_keywords_for_seeds(['desk', 'lamp'])) == ['desk ideas', 'lamp ideas']
+    assert store.pending_queue_tasks() == []
+
+
+def test_failed_polls_are_retried(store):
+    client = QueueClient(failing_polls=2)
+    [job] = _run(client, store, ['desk'])
+    assert job.error is None and job.result is not None
+    assert client.failing_polls == 0
+
+
+def test_queue_without_a_store_still_runs():
+    [job] = _run(QueueClient(), None, ['desk'])
+    assert job.result is not None
@@ -0,0 +1,105 @@
+import pytest
+
+from niche.tools import governor as governor_module
+from niche.tools.governor import Budget, BudgetGovernor, governed_tool_call
+
+TOOL = 'KeywordExpansionTool'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(governor_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _governor(**run) -> BudgetGovernor:
+    return BudgetGovernor(
+        run_budget=Budget(**run),
+        tool_budgets={TOOL: Budget(max_calls=2, cost_per_call=0.10), 'AIWebSearch': Budget(cost_per_call=0.02)},
+    )
+
+
+def test_calls_are_admitted_until_the_tool_budget_is_used():
+    governor = _governor()
+    assert governor.acquire(TOOL) is None
+    assert governor.acquire(TOOL) is None
+    assert governor.acquire(TOOL) == f"{TOOL} budget exhausted: all 2 calls used"
+    usage = governor.usage()
+    assert usage[TOOL]['calls'] == 2
+    assert usage[TOOL]['refused'] == 1
+    assert usage['run']['spend'] == 0.2
+
+
+def test_run_spend_limit_covers_all_tools():
+    governor = _governor(max_spend=0.05)
+    assert governor.acquire('AIWebSearch') is None
+    assert governor.acquire('AIWebSearch') is None
+    assert governor.acquire('AIWebSearch') == "run budget exhausted: spend limit of $0.05 reached"
+    assert governor.acquire(TOOL) == "run budget exhausted: spend limit of $0.05 reached"
+
+
+def test_run_time_limit(clock):
+    governor = _governor(max_seconds=60)
+    assert governor.acquire(TOOL) is None
+    clock[0] += 61
+    assert governor.acquire(TOOL) == "run budget exhausted: time limit of 60s reached"
+
+
+def test_remaining_budget(clock):
+    governor = _governor(max_calls=10, max_seconds=100)
+    governor.acquire(TOOL)
+    governor.release(TOOL, 4.0)
+    clock[0] += 30
+    remaining = governor.remaining()
+    assert remaining['run'] == {'calls': 9, 'spend': None, 'seconds': 70.0}
+    assert remaining[TOOL] == {'calls': 1, 'spend': None, 'seconds': None}
+    assert governor.remaining_text(TOOL) == f"# Budget left: {TOOL} 1 calls; run 9 calls, 70s"
+
+
+def test_refund_returns_the_call_and_its_cost():
+    governor = _governor()
+    governor.acquire(TOOL)
+    governor.acquire(TOOL)
+    governor.refund(TOOL)
+    assert governor.usage()[TOOL]['calls'] == 1
+    assert governor.usage()['run']['spend'] == 0.1
+    assert governor.acquire(TOOL) is None
+
+
+class Tool:
+    name = TOOL
+
+    def __init__(self, governor, api_calls_per_run=1):
+        self._governor = governor
+        self.api_calls = 0
+        self.api_calls_per_run = api_calls_per_run
+
+    def _api_call_count(self):
+        return self.api_calls
+
+    @governed_tool_call
+    def _run(self, query):
+        self.api_calls += self.api_calls_per_run
+        return f"result for {query}"
+
+
+def test_governed_call_appends_the_remaining_budget():
+    tool = Tool(_governor())
+    assert tool._run('desk') == f"result for desk\n# Budget left: {TOOL} 1 calls; run unlimited"
+
+
+def test_governed_call_is_refused_once_the_budget_is_used():
+    tool = Tool(_governor())
+    tool._run('a')
+    tool._run('b')
+    assert tool._run('c').startswith(f"Budget exhausted: {TOOL} was not called")
+    assert tool.api_calls == 2
+
+
+def test_calls_served_without_upstream_requests_are_not_charged():
+    tool = Tool(_governor(), api_calls_per_run=0)
+    for query in 'abc':
+        assert tool._run(query).startswith('result')
+    assert tool._governor.usage()[TOOL]['calls'] == 0
+    assert tool._governor.usage()['run']['spend'] == 0.0
@@ -0,0 +1,75 @@
+import pytest
+
+from niche.tools.keyword_clustering import cluster_keyword_rows, cluster_keywords, normalize_keyword
+
+
+def _same_cluster(*keywords: str) -> bool:
+    return len(set(cluster_keywords(list(keywords)))) == 1
+
+
+@pytest.mark.parametrize('keywords', [
+    ('gaming mouse', 'gaming mouse pad'),
+    ('standing desk', 'standing desk mat', 'standing desk chair'),
+    ('monitor arm', 'dual monitor arm'),
+    ('red standing desk', 'white standing desk'),
+    ('desk mat', 'desk map'),
+])
+def test_different_intents_stay_separate(keywords):
+    ids = cluster_keywords(list(keywords))
+    assert len(set(ids)) == len(keywords)
+
+
+@pytest.mark.parametrize('keywords', [
+    ('desk lamp', 'desk lamps'),
+    ('standing desk', 'desk standing'),
+    ('gaming desk', 'desk for gaming', 'the gaming desk'),
+    ('standing desk', 'standng desk'),
+    ('mechanical keyboard', 'mechanical keybaord'),
+])
+def test_near_variants_are_merged(keywords):
+    assert _same_cluster(*keywords)
+
+
+def test_words_ending_in_s_that_are_not_plurals():
+    assert normalize_keyword('news') == 'news'
+    assert normalize_keyword('glass desk') == 'desk glass'
+    assert normalize_keyword('camera lens') == 'camera lens'
+    assert normalize_keyword('monitor stands') == 'monitor stand'
+
+
+def test_members_are_not_chained():
+    # Each keyword is one typo from its neighbour, but the ends are two apart.
+    ids = cluster_keywords(['standing desk', 'standng desk', 'stndng desk'])
+    assert ids[0] == ids[1]
+    assert ids[2] != ids[0]
+
+
+def test_highest_volume_keyword_represents_the_cluster():
+    rows = [
+        {'keyword': 'standing desks', 'search_volume': 100, 'competition_index': 20, 'cpc': 1.0, 'seeds': ['a']},
+        {'keyword': 'standing desk', 'search_volume': 300, 'competition_index': 40, 'cpc': 2.0, 'seeds': ['b']},
+        {'keyword': 'standing desk mat', 'search_volume': 50, 'competition_index': 10, 'cpc': 0.5, 'seeds': ['a']},
+    ]
+    clustered = {row['keyword']: row for row in cluster_keyword_rows(rows)}
+    assert set(clustered) == {'standing desk', 'standing desk mat'}
+    desk = clustered['standing desk']
+    # Google Ads gives plurals the volume of the shared form, so it is not added twice.
+    assert desk['search_volume'] == 300
+    assert desk['cluster_size'] == 2
+    assert desk['variants'] == ['standing desks']
+    assert desk['seeds'] == ['b', 'a']
+    assert desk['competition_index'] == 35.0
+
+
+def test_typo_variant_volumes_are_summed_once_per_form():
+    rows = [
+        {'keyword': 'standing desk', 'search_volume': 300},
+        {'keyword': 'standing desks', 'search_volume': 300},
+        {'keyword': 'desk standing', 'search_volume': 300},
+        {'keyword': 'standng desk', 'search_volume': 20},
+        {'keyword': 'standng desks', 'search_volume': 20},
+        {'keyword': 'stnding desk', 'search_volume': None},
+    ]
+    [desk] = cluster_keyword_rows(rows)
+    assert desk['cluster_size'] == 6
+    assert desk['search_volume'] == 320
@@ -0,0 +1,127 @@
+import sqlite3
+
+import pytest
+
+from niche.tools import keyword_store as keyword_store_module
+from niche.tools.keyword_store import KeywordRow, KeywordStore, attribute_seeds
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KeywordStore(str(tmp_path / 'keywords.sqlite3'))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(keyword_store_module.time, 'time', lambda: now[0])
+    return now
+
+
+def test_attribute_seeds_by_shared_word():
+    assert attribute_seeds('standing desk mat', ['standing desk', 'office chair']) == ['standing desk']
+    assert attribute_seeds('ergonomics', ['standing desk', 'office chair']) == ['standing desk', 'office chair']
+
+
+def test_fresh_keywords_match_seed_market_and_age(store, clock):
+    store.upsert_keywords([
+        KeywordRow('standing desk mat', 'Standing Desk', comps=40.0),
+        KeywordRow('standing desk mat', 'standing desk', location_code=2826, comps=41.0),
+    ])
+    clock[0] += DAY
+    store.upsert_keywords([KeywordRow('office chair', 'office chair', comps=30.0)])
+    rows = store.fresh_keywords_for_seeds(['standing desk', 'office chair'], max_age=2 * DAY)
+    assert sorted((row.keyword, row.location_code) for row in rows) == [
+        ('office chair', 2840), ('standing desk mat', 2840)
+    ]
+    rows = store.fresh_keywords_for_seeds(['standing desk', 'office chair'], max_age=DAY / 2)
+    assert [row.keyword for row in rows] == ['office chair']
+
+
+def test_upsert_replaces_the_row_of_a_seed(store):
+    store.upsert_keywords([KeywordRow('desk lamp', 'desk', search_volume=10, comps=1.0)])
+    store.upsert_keywords([KeywordRow('desk lamp', 'desk', search_volume=20, comps=2.0)])
+    rows = store.fresh_keywords_for_seeds(['desk'])
+    assert [(row.search_volume, row.comps) for row in rows] == [(20, 2.0)]
+
+
+def test_top_by_comps_keeps_the_best_row_per_keyword(store):
+    store.upsert_keywords([
+        KeywordRow('desk lamp', 'desk', topic='office', comps=10.0),
+        KeywordRow('desk lamp', 'lamp', topic='office', comps=30.0),
+        KeywordRow('desk mat', 'desk', topic='office', comps=20.0),
+        KeywordRow('gaming chair', 'chair', topic='gaming', comps=90.0),
+    ])
+    rows = store.top_by_comps(5, topic='office')
+    assert [(row.keyword, row.seed, row.comps) for row in rows] == [('desk lamp', 'lamp', 30.0), ('desk mat', 'desk', 20.0)]
+    assert [row.keyword for row in store.top_by_comps(1)] == ['gaming chair']
+
+
+def test_seeds_without_rows_are_remembered(store, clock):
+    store.mark_seeds_fetched(['Obscure Seed', 'desk'])
+    assert store.fresh_seeds(['obscure seed', 'desk', 'lamp']) == {'obscure seed', 'desk'}
+    assert store.fresh_seeds(['obscure seed'], location_code=2826) == set()
+    clock[0] += 8 * DAY
+    assert store.fresh_seeds(['obscure seed']) == set()
+
+
+def test_trends_round_trip(store, clock):
+    store.upsert_trends({'desk lamp': {'points': [1, 2]}})
+    assert store.fresh_trends(['Desk Lamp', 'desk mat']) == {'desk lamp': {'points': [1, 2]}}
+    clock[0] += 2 * DAY
+    assert store.fresh_trends(['desk lamp']) == {}
+
+
+def test_trends_are_kept_per_time_range(store):
+    store.upsert_trends({'desk lamp': {'points': [1]}})
+    store.upsert_trends({'desk lamp': {'points': [1, 2, 3]}}, time_range='past_5_years')
+    assert store.fresh_trends(['desk lamp']) == {'desk lamp': {'points': [1]}}
+    assert store.fresh_trends(['desk lamp'], time_range='past_5_years') == {'desk lamp': {'points': [1, 2, 3]}}
+    assert store.fresh_trends(['desk lamp'], time_range='past_12_months') == {}
+
+
+def test_trends_table_without_time_range_is_replaced(tmp_path):
+    path = str(tmp_path / 'keywords.sqlite3')
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE trends (keyword TEXT, location_code INTEGER, language_code TEXT, '
+               'result TEXT, fetched_at REAL, PRIMARY KEY (keyword, location_code, language_code))')
+    db.commit()
+    db.close()
+    store = KeywordStore(path)
+    store.upsert_trends({'desk lamp': {'points': [1]}}, time_range='past_5_years')
+    assert store.fresh_trends(['desk lamp'], time_range='past_5_years') == {'desk lamp': {'points': [1]}}
+
+
+def test_store_persists_across_connections(tmp_path):
+    path = str(tmp_path / 'keywords.sqlite3')
+    KeywordStore(path).upsert_keywords([KeywordRow('desk lamp', 'desk')])
+    assert [row.keyword for row in KeywordStore(path).fresh_keywords_for_seeds(['desk'])] == ['desk lamp']
+
+
+class StubClient:
+    location_code = 2840
+    language_code = 'en'
+
+    def __init__(self):
+        self.requested = []
+
+    def get_keywords_for_keywords_bulk(self, seeds, max_workers=None):
+        self.requested.append(list(seeds))
+        return [(seeds, {'status_code': 20000, 'tasks': [{'status_code': 20000, 'result': None}]})] if seeds else []
+
+    @staticmethod
+    def is_successful(data):
+        return data.get('status_code') == 20000
+
+
+def test_expansion_does_not_refetch_seeds_without_results(store):
+    pytest.importorskip('crewai_tools')
+    from niche.tools.DataForSEOTools import KeywordExpansionTool
+
+    client = StubClient()
+    tool = KeywordExpansionTool(client=client, store=store)
+    tool._run('obscure seed')
+    tool._run('obscure seed')
+    assert client.requested == [['obscure seed'], []]
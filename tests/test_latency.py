@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from niche.tools.governor import Budget, BudgetGovernor
+from niche.tools.latency import LatencyController, LatencySLO
+
+TOOL = 'SerperDevScraper'
+
+
+class SlowRequest:
+    """Records every send and answers after `delay` seconds."""
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, timeout, max_retries=None):
+        with self._lock:
+            self.calls.append(max_retries)
+        time.sleep(self.delay)
+        return 'ok'
+
+
+def _controller(**slo) -> LatencyController:
+    slo = {'target_seconds': 0.05, 'max_seconds': 5, **slo}
+    return LatencyController({TOOL: LatencySLO(**slo)})
+
+
+def test_slow_request_is_hedged_without_transport_retries():
+    request = SlowRequest()
+    assert _controller().call(TOOL, 'search', request) == 'ok'
+    assert request.calls == [0, 0]
+
+
+def test_batches_are_not_duplicated():
+    request = SlowRequest()
+    assert _controller().call(TOOL, 'batch', request, duplicate=False) == 'ok'
+    assert request.calls == [None]
+
+
+def test_hedges_are_charged_to_the_governor():
+    governor = BudgetGovernor(tool_budgets={TOOL: Budget(max_spend=0.01, cost_per_call=0.004)})
+    request = SlowRequest()
+    _controller().call(TOOL, 'search', request, governor=governor)
+    assert governor.usage()[TOOL]['spend'] == 0.004
+    assert governor.usage()[TOOL]['calls'] == 0
+
+
+def test_hedge_is_skipped_when_the_budget_cannot_pay():
+    governor = BudgetGovernor(tool_budgets={TOOL: Budget(max_spend=0.01, cost_per_call=0.004)})
+    request = SlowRequest()
+    assert _controller(hedge_cost=0.02).call(TOOL, 'search', request, governor=governor) == 'ok'
+    assert request.calls == [0]
+    assert governor.usage()[TOOL]['spend'] == 0.0
+
+
+class FailingOnce(SlowRequest):
+    """Fails its first send with `status`, then answers at once."""
+
+    def __init__(self, status: int):
+        super().__init__(delay=0.0)
+        self.status = status
+
+    def __call__(self, timeout, max_retries=None):
+        super().__call__(timeout, max_retries)
+        if len(self.calls) == 1:
+            response = requests.Response()
+            response.status_code = self.status
+            raise requests.exceptions.HTTPError(f"{self.status} error", response=response)
+        return 'ok'
+
+
+def test_retryable_status_starts_the_hedge_at_once():
+    request = FailingOnce(503)
+    # The hedge delay is far longer than the test would wait for.
+    assert _controller(target_seconds=30, max_seconds=60).call(TOOL, 'search', request) == 'ok'
+    assert request.calls == [0, 0]
+
+
+def test_client_errors_are_not_hedged():
+    request = FailingOnce(404)
+    with pytest.raises(requests.exceptions.HTTPError):
+        _controller().call(TOOL, 'search', request)
+    assert request.calls == [0]
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('langchain_core')
+
+from langchain_core.outputs import Generation  # noqa: E402
+
+from niche.llm_cache import CompletionCache  # noqa: E402
+
+PROMPT = '[{"role": "user", "content": "Suggest blog topics"}]'
+LLM = 'gpt-4o-mini temperature=0'
+
+
+def _cache(tmp_path, mode=None):
+    return CompletionCache(mode=mode, path=str(tmp_path / 'llm.sqlite3'))
+
+
+def test_default_mode_is_bypass(default_env):
+    cache = CompletionCache(path=str(default_env / 'llm.sqlite3'))
+    assert cache.mode == 'bypass'
+    cache.update(PROMPT, LLM, [Generation(text='stored')])
+    assert cache.lookup(PROMPT, LLM) is None
+    assert not (default_env / 'llm.sqlite3').exists()
+
+
+def test_read_write_stores_and_serves_across_instances(tmp_path):
+    _cache(tmp_path, 'read_write').update(PROMPT, LLM, [Generation(text='stored')])
+    cache = _cache(tmp_path, 'read_write')
+    assert [generation.text for generation in cache.lookup(PROMPT, LLM)] == ['stored']
+    assert cache.lookup(PROMPT, 'gpt-4o temperature=0') is None
+
+
+def test_read_only_serves_but_never_stores(tmp_path):
+    _cache(tmp_path, 'read_write').update(PROMPT, LLM, [Generation(text='stored')])
+    cache = _cache(tmp_path, 'read_only')
+    cache.update('other prompt', LLM, [Generation(text='new')])
+    assert [generation.text for generation in cache.lookup(PROMPT, LLM)] == ['stored']
+    assert cache.lookup('other prompt', LLM) is None
+
+
+def test_mode_comes_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('NICHE_LLM_CACHE', 'read_only')
+    assert _cache(tmp_path).mode == 'read_only'
+    monkeypatch.setenv('NICHE_LLM_CACHE', 'sometimes')
+    with pytest.raises(ValueError, match='Unknown LLM cache mode'):
+        _cache(tmp_path)
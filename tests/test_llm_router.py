@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('langchain_openai')
+
+import httpx  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, LLMResult  # noqa: E402
+from openai import APIConnectionError  # noqa: E402
+
+from niche.instrumentation import TaskTracker  # noqa: E402
+from niche.llm_router import ModelRouter, ModelTier  # noqa: E402
+
+MESSAGES = [HumanMessage(content='hi')]
+
+
+class StubModel:
+    """Answers with the tier name, or raises APIConnectionError when `down`."""
+
+    def __init__(self, name, down=False, delay=0.0):
+        self.name = name
+        self.down = down
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate(self, batches, stop=None, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.down:
+                raise APIConnectionError(request=httpx.Request('POST', 'http://localhost:11434/v1'))
+            return LLMResult(generations=[[ChatGeneration(message=AIMessage(content=self.name))]], llm_output={})
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _router(models=None, tracker=None, **local):
+    tiers = {
+        'remote': ModelTier('remote', 'gpt', max_concurrency=2),
+        'local': ModelTier('local', 'mistral', **{'max_concurrency': 1, 'timeout': 0.05, 'fallback': 'remote', **local}),
+    }
+    router = ModelRouter(tiers, 'remote', task_tiers={'write_report': 'remote', 'draft_ideas': 'local'},
+                         tracker=tracker)
+    models = models or {name: StubModel(name) for name in tiers}
+    router.model = models.__getitem__
+    return router, models
+
+
+def _answer(router, tier):
+    return router.generate(tier, MESSAGES).generations[0].message.content
+
+
+def test_task_tier_overrides_the_agent_tier():
+    tracker = TaskTracker()
+    router, _ = _router(tracker=tracker)
+    assert router.tier_for('writer', 'local') == 'local'
+    tracker.start('write_report')
+    assert router.tier_for('writer', 'local') == 'remote'
+    tracker.start('draft_ideas')
+    assert router.tier_for('writer') == 'local'
+    tracker.start('unrouted_task')
+    assert router.tier_for('writer') == 'remote'
+
+
+def test_manager_keeps_its_own_tier():
+    tracker = TaskTracker()
+    router, _ = _router(tracker=tracker)
+    tracker.start('write_report')
+    assert router.tier_for('manager', 'local', follow_task=False) == 'local'
+
+
+def test_routing_off_uses_the_default_tier():
+    router, _ = _router()
+    router.enabled = False
+    assert router.tier_for('writer', 'local') == 'remote'
+    router.enabled = True
+    with pytest.raises(ValueError, match='Unknown model tier'):
+        router.tier_for('writer', 'missing')
+
+
+def test_connection_errors_fall_back():
+    router, models = _router(models={'local': StubModel('local', down=True), 'remote': StubModel('remote')})
+    assert _answer(router, 'local') == 'remote'
+    # Without a fallback the error reaches the caller.
+    models['remote'].down = True
+    with pytest.raises(APIConnectionError):
+        router.generate('remote', MESSAGES)
+
+
+def test_no_free_slot_falls_back():
+    router, _ = _router()
+    router.tiers['local'].semaphore.acquire()
+    assert _answer(router, 'local') == 'remote'
+    router.tiers['local'].semaphore.release()
+    assert _answer(router, 'local') == 'local'
+
+
+def test_concurrent_calls_are_capped_per_tier():
+    router, models = _router(models={'local': StubModel('local'), 'remote': StubModel('remote', delay=0.02)})
+    threads = [threading.Thread(target=router.generate, args=('remote', MESSAGES)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert models['remote'].max_active == 2
+
+
+@pytest.mark.parametrize('fallbacks, message', [
+    ({'local': 'remote', 'remote': 'local'}, 'cycle: remote -> local -> remote'),
+    ({'local': 'local'}, 'cycle: local -> local'),
+    ({'local': 'missing'}, 'Unknown fallback model tier of local: missing'),
+])
+def test_invalid_fallbacks_are_rejected(tmp_path, fallbacks, message):
+    lines = ['default_tier: remote', 'tiers:']
+    for name in ('remote', 'local'):
+        lines += [f'  {name}:', '    model: m']
+        if name in fallbacks:
+            lines.append(f'    fallback: {fallbacks[name]}')
+    path = tmp_path / 'models.yaml'
+    path.write_text('\n'.join(lines) + '\n')
+    with pytest.raises(ValueError, match=message):
+        ModelRouter.from_config(str(path))
+
+
+def test_default_config_loads(default_env):
+    router = ModelRouter.from_config()
+    assert router.tiers['local'].fallback == 'remote'
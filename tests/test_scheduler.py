@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('crewai')
+
+from niche.scheduler import DagScheduler, TaskTiming, topological_order, usage_metrics  # noqa: E402
+
+DEPENDENCIES = {
+    'keywords': [],
+    'expand': ['keywords'],
+    'deep_dive': ['expand'],
+    'ideas': ['expand'],
+    'trends': ['expand'],
+    'report': ['deep_dive', 'ideas', 'trends'],
+}
+
+
+def test_dependencies_come_first():
+    order = topological_order(DEPENDENCIES)
+    assert sorted(order) == sorted(DEPENDENCIES)
+    for name, upstream in DEPENDENCIES.items():
+        assert all(order.index(dependency) < order.index(name) for dependency in upstream)
+
+
+def test_independent_tasks_keep_their_config_order():
+    assert topological_order({'b': [], 'a': [], 'c': ['a']}) == ['b', 'a', 'c']
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError, match='cycle'):
+        topological_order({'a': ['c'], 'b': ['a'], 'c': ['b'], 'd': []})
+
+
+def test_unknown_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="unknown task 'missing'"):
+        topological_order({'a': ['missing']})
+
+
+def _scheduler(durations):
+    crew = SimpleNamespace(tasks=[SimpleNamespace(name=name) for name in DEPENDENCIES], agents=[])
+    scheduler = DagScheduler(crew, DEPENDENCIES)
+    start = 0.0
+    for name, duration in durations.items():
+        scheduler.timings[name] = TaskTiming(name, start, start + duration)
+    return scheduler
+
+
+def test_critical_path_follows_the_slowest_branch():
+    scheduler = _scheduler({'keywords': 1, 'expand': 2, 'deep_dive': 10, 'ideas': 3, 'trends': 4, 'report': 1})
+    assert scheduler.critical_path() == ['keywords', 'expand', 'deep_dive', 'report']
+
+
+def test_critical_path_counts_restored_tasks_as_instant():
+    scheduler = _scheduler({'ideas': 3, 'trends': 4, 'report': 1})
+    assert scheduler.critical_path() == ['keywords', 'expand', 'trends', 'report']
+
+
+class _TokenProcess:
+    def __init__(self, **summary):
+        self.summary = summary
+
+    def get_summary(self):
+        return self.summary
+
+
+def _agent(**summary):
+    return SimpleNamespace(_token_process=_TokenProcess(**summary))
+
+
+def test_usage_metrics_sums_agents_and_manager_without_calculate_usage_metrics():
+    crew = SimpleNamespace(
+        agents=[_agent(total_tokens=10, successful_requests=1), _agent(total_tokens=5, successful_requests=2),
+                SimpleNamespace()],
+        manager_agent=_agent(total_tokens=100, successful_requests=3),
+    )
+    assert usage_metrics(crew) == {'total_tokens': 115, 'successful_requests': 6}
+
+
+def test_usage_metrics_prefers_calculate_usage_metrics():
+    crew = SimpleNamespace(agents=[_agent(total_tokens=10)], manager_agent=None,
+                           calculate_usage_metrics=lambda: 'from crewai')
+    assert usage_metrics(crew) == 'from crewai'
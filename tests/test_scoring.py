@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from niche.tools.scoring import CompSWeights, calculate_comps, calculate_comps_array, top_n_indices
+
+
+def _scalar(search_volume, competition_index, cpc, weights=CompSWeights()):
+    return [calculate_comps(*row, weights) for row in zip(search_volume, competition_index, cpc)]
+
+
+def _maybe_none(rng, values, share=0.1):
+    return [None if rng.random() < share else value for value in values]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_array_matches_the_scalar_implementation(seed):
+    rng = np.random.default_rng(seed)
+    size = 5000
+    search_volume = _maybe_none(rng, rng.choice([0, 10, 50, 90, 12.5, 1000, 250000], size).tolist()
+                                + rng.integers(0, 200000, size).tolist())
+    competition_index = _maybe_none(rng, rng.integers(0, 101, 2 * size).tolist())
+    cpc = _maybe_none(rng, np.round(rng.uniform(0, 20, 2 * size), 3).tolist())
+    expected = _scalar(search_volume, competition_index, cpc)
+    assert calculate_comps_array(search_volume, competition_index, cpc).tolist() == expected
+
+
+def test_ties_round_like_python():
+    # Raw scores that sit on a half-cent tie: 0.005, 0.015, ... after weighting.
+    search_volume = [12.5, 37.5, 62.5, 112.5, 1287.5, 2512.5]
+    competition_index = [None] * len(search_volume)
+    cpc = [0.0125, 0.0375, None, 0.1125, 0.0625, None]
+    expected = _scalar(search_volume, competition_index, cpc)
+    assert calculate_comps_array(search_volume, competition_index, cpc).tolist() == expected
+
+
+def test_custom_weights_match():
+    weights = CompSWeights(w_sv=0.5, w_ics=0.3, w_ms=0.2, sv_divisor=500, cap=80)
+    rows = ([100, None, 90000, 0], [10, 100, None, 55], [1.5, 0, 12.0, None])
+    assert calculate_comps_array(*rows, weights).tolist() == _scalar(*rows, weights)
+
+
+@pytest.mark.parametrize('n', [0, 1, 3, 10, 50])
+def test_top_n_matches_a_stable_sort(n):
+    rng = np.random.default_rng(n)
+    scores = rng.integers(0, 5, 40).astype(float)
+    expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:n]
+    assert top_n_indices(scores, n).tolist() == expected
+
+
+def test_top_n_keeps_ties_in_input_order():
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 3.0, 2.0])
+    assert top_n_indices(scores, 2).tolist() == [1, 3]
+    assert top_n_indices(scores, 4).tolist() == [1, 3, 4, 2]
+    assert top_n_indices(np.array([]), 3).tolist() == []
@@ -0,0 +1,98 @@
+import pytest
+import requests
+
+from niche.tools import transport as transport_module
+from niche.tools.transport import HttpTransport
+
+URL = 'https://api.example.com/search'
+
+
+def _response(status: int, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{}'
+    response.headers.update(headers or {})
+    return response
+
+
+class StubSession:
+    """Answers requests from a list of responses or exceptions, in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(transport_module.time, 'sleep', slept.append)
+    return slept
+
+
+def _transport(*outcomes, **options) -> HttpTransport:
+    transport = HttpTransport(timeout=1, **options)
+    transport.session = StubSession(*outcomes)
+    return transport
+
+
+@pytest.mark.parametrize('status', sorted(transport_module.RETRY_STATUSES))
+def test_retryable_statuses_are_retried(sleeps, status):
+    transport = _transport(_response(status), _response(200))
+    assert transport.get(URL).status_code == 200
+    assert transport.session.calls == 2
+    assert len(sleeps) == 1
+
+
+def test_gives_up_after_max_retries(sleeps):
+    transport = _transport(*[_response(503)] * 4, max_retries=3)
+    assert transport.get(URL).status_code == 503
+    assert transport.session.calls == 4
+    assert transport.stats()['api.example.com']['retries'] == 3
+
+
+def test_client_errors_are_not_retried(sleeps):
+    transport = _transport(_response(404))
+    assert transport.get(URL).status_code == 404
+    assert transport.session.calls == 1
+
+
+def test_retry_after_is_honoured_and_capped(sleeps):
+    transport = _transport(
+        _response(429, {'Retry-After': '3'}), _response(429, {'Retry-After': '120'}), _response(200),
+        backoff_max=8.0,
+    )
+    assert transport.get(URL).status_code == 200
+    assert sleeps == [3.0, 8.0]
+
+
+def test_connection_errors_are_retried(sleeps):
+    transport = _transport(requests.exceptions.ConnectionError(), _response(200))
+    assert transport.get(URL).status_code == 200
+    assert transport.session.calls == 2
+
+
+def test_non_idempotent_requests_are_not_retried(sleeps):
+    transport = _transport(_response(503), _response(200))
+    assert transport.post(URL, json={}).status_code == 503
+    with pytest.raises(requests.exceptions.Timeout):
+        _transport(requests.exceptions.Timeout(), _response(200)).post(URL, json={})
+    assert sleeps == []
+
+
+def test_idempotent_post_is_retried(sleeps):
+    transport = _transport(_response(502), _response(200))
+    assert transport.post(URL, json={}, idempotent=True).status_code == 200
+
+
+def test_max_retries_can_be_overridden_per_request(sleeps):
+    transport = _transport(_response(503), _response(200))
+    assert transport.get(URL, max_retries=0).status_code == 503
+    assert transport.session.calls == 1
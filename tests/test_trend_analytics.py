@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from niche.tools.trend_analytics import (
+    WEEK_SECONDS, build_trend_matrix, momentum_ranking, trend_feature_rows, trend_features
+)
+
+START = np.datetime64('2021-01-03T00:00:00')
+
+
+def _series(values, start=START, step=WEEK_SECONDS):
+    """Trend points from `start`, one every `step` seconds."""
+    start = int(start.astype('datetime64[s]').astype(np.int64))
+    return [{'timestamp': start + i * step, 'value': value} for i, value in enumerate(values)]
+
+
+def _features(series):
+    _, times, values = build_trend_matrix(series)
+    return trend_features(times, values)
+
+
+def _rows(series):
+    return {row['keyword']: row for row in trend_feature_rows(series)}
+
+
+def test_slope_follows_the_recent_direction():
+    rows = _rows({
+        'rising': _series([50] * 40 + list(range(50, 74, 2))),
+        'falling': _series([50] * 40 + list(range(74, 50, -2))),
+        'flat': _series([50] * 52),
+    })
+    assert rows['rising']['slope_pct'] > 0
+    assert rows['falling']['slope_pct'] < 0
+    assert rows['flat']['slope_pct'] == 0
+
+
+def test_year_over_year_growth():
+    values = [40] * 52 + [50] * 52
+    values[48:52] = [40] * 4
+    values[-4:] = [60] * 4
+    assert _rows({'desk': _series(values)})['desk']['yoy_pct'] == 50.0
+    assert _rows({'desk': _series([50] * 52)})['desk']['yoy_pct'] is None
+
+
+def test_peak_month_and_seasonality_over_several_years():
+    weeks = np.arange(3 * 52)
+    # Interest peaks every July.
+    days = (START + weeks * np.timedelta64(7, 'D')).astype('datetime64[M]').astype(np.int64) % 12
+    values = (50 + 40 * (days == 6)).tolist()
+    row = _rows({'pool': _series(values)})['pool']
+    assert row['peak_month'] == 'Jul'
+    assert row['seasonality'] > 0.9
+
+
+def test_seasonality_needs_two_years():
+    noise = np.random.default_rng(0).uniform(20, 80, 2 * 52).round().tolist()
+    assert _rows({'noise': _series(noise[:52])})['noise']['seasonality'] is None
+    assert 0 <= _rows({'noise': _series(noise)})['noise']['seasonality'] < 0.5
+
+
+def test_short_series_slope_is_not_extrapolated():
+    features = _features({'week': _series([10, 20, 30, 40, 50, 60, 70], step=WEEK_SECONDS // 7)})
+    # Seven daily points cover one week, so the momentum is the change over that week.
+    assert features['momentum'][0] == pytest.approx(features['slope_pct'][0])
+    twelve_weeks = _features({'quarter': _series(list(range(10, 130, 10)))})
+    assert twelve_weeks['momentum'][0] == pytest.approx(twelve_weeks['slope_pct'][0] * 12)
+
+
+def test_missing_points_become_nan():
+    series = _series([50, None, 60, 70])
+    series.append({'value': 10})
+    rows = _rows({'gappy': series, 'empty': [], 'none': None})
+    assert rows['gappy']['points'] == 3
+    assert rows['gappy']['last'] == 70.0
+    for keyword in ('empty', 'none'):
+        assert rows[keyword]['points'] == 0
+        assert all(rows[keyword][column] is None for column in ('mean', 'slope_pct', 'momentum', 'peak_month'))
+    assert trend_feature_rows({}) == []
+
+
+def test_ranking_orders_by_momentum_and_keeps_ties_in_input_order():
+    ranking = momentum_ranking({
+        'flat': _series([50] * 52),
+        'empty': [],
+        'rising': _series([50] * 40 + list(range(50, 74, 2))),
+        'also flat': _series([30] * 52),
+        'falling': _series([50] * 40 + list(range(74, 50, -2))),
+    })
+    assert [row['keyword'] for row in ranking] == ['rising', 'flat', 'also flat', 'falling', 'empty']
+    assert [row['rank'] for row in ranking] == [1, 2, 3, 4, 5]